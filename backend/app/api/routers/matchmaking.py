@@ -0,0 +1,53 @@
+import asyncio
+import uuid
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+
+from app.api.routers.websocket import HEARTBEAT_INTERVAL, HEARTBEAT_TIMEOUT
+from app.core.redis import redis_budget
+from app.schemas.game import MatchmakingRequest, MatchmakingTicketSchema
+from app.schemas.socket import PongMessage
+from app.services import matchmaking
+from app.services.game_service import matchmaker
+
+# Mounted without a prefix: the socket route has to be matched before the room sockets'
+# /ws/{room_id}/{client_id}.
+router = APIRouter()
+
+
+@router.post("/api/matchmaking", response_model=MatchmakingTicketSchema)
+@redis_budget(1)
+async def join_queue(request: MatchmakingRequest):
+    """Queue for quick play. Queueing again keeps the player's place."""
+    return await matchmaking.enqueue(request.player_id or str(uuid.uuid4()), request.nickname)
+
+
+@router.delete("/api/matchmaking/{player_id}")
+@redis_budget(1)
+async def leave_queue(player_id: str):
+    if not await matchmaking.leave(player_id):
+        raise HTTPException(status_code=404, detail="Not in the quick-play queue")
+    return {"status": "left"}
+
+
+@router.websocket("/ws/matchmaking/{player_id}")
+@redis_budget(1)  # Round trips before the first QUEUE_STATUS frame
+async def matchmaking_socket(websocket: WebSocket, player_id: str):
+    """Pushes QUEUE_STATUS every matchmaker tick, then MATCH_FOUND and closes."""
+    await websocket.accept()
+    if not await matchmaker.watch(player_id, websocket):
+        await websocket.close()
+        return
+    try:
+        timeout = HEARTBEAT_INTERVAL + HEARTBEAT_TIMEOUT
+        while True:
+            try:
+                data = await asyncio.wait_for(websocket.receive_json(), timeout=timeout)
+            except TimeoutError:
+                break
+            if data.get("type") == "PING":
+                await websocket.send_text(PongMessage().model_dump_json())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        matchmaker.unwatch(player_id, websocket)
@@ -1,44 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
+from app.core.exceptions import RoomUnavailableError
+from app.core.redis import redis_budget
 from app.schemas.game import (
     ActionRequest,
+    AddBotsRequest,
+    BalancePredictionRequest,
+    BalancePredictionResponse,
     CreateRoomRequest,
     GameSettingsSchema,
     GameStateSchema,
     JoinRoomRequest,
     KickPlayerRequest,
+    LobbyPageSchema,
     PlayerIdRequest,
     StartGameRequest,
     VoteRequest,
 )
 from app.services.game_service import GameService, get_game_service
-from app.services.websocket_manager import manager as websocket_manager
+from app.services.lobby import LobbySort, list_open_rooms
 
+# Player-filtered state is pushed to sockets by the ConnectionManager when the save
+# publishes ROOM_CHANGED, so routes only return the caller's own view.
+# @redis_budget is the most Redis round trips one call may make with warm script caches;
+# tests/test_redis_budgets.py enforces it. A mutation costs lock, load, save and unlock, and
+# one more write to the lobby index when it can change the room's listing.
 router = APIRouter()
 
 
-async def broadcast_filtered_states(room_id: str, service: GameService):
-    """Helper to broadcast player-specific filtered game states."""
-    game = await service.get_game(room_id)
-    if not game:
-        return
-
-    # Fetch presence for all players once
-    presence_map = await service.get_all_player_presence(room_id, list(game.players.keys()))
-
-    async def get_view(player_id: str):
-        return await service.get_player_view(game, player_id, presence_map)
-
-    await websocket_manager.broadcast_filtered_game_states(room_id, get_view)
-
-
 @router.post("/rooms", response_model=GameStateSchema)
+@redis_budget(2)
 async def create_room(request: CreateRoomRequest, service: GameService = Depends(get_game_service)):
     settings = request.settings or GameSettingsSchema()
     return await service.create_room(settings)
 
 
+@router.get("/lobby", response_model=LobbyPageSchema)
+@redis_budget(1)
+async def list_lobby(
+    sort: LobbySort = "players",
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=100),
+):
+    """Rooms waiting for players, most players or most recently active first."""
+    return await list_open_rooms(sort, offset, limit)
+
+
 @router.get("/rooms/{room_id}", response_model=GameStateSchema)
+@redis_budget(2)
 async def get_room(
     room_id: str,
     player_id: str | None = None,
@@ -53,6 +62,7 @@ async def get_room(
 
 
 @router.post("/rooms/{room_id}/join", response_model=GameStateSchema)
+@redis_budget(5)
 async def join_room(
     room_id: str,
     request: JoinRoomRequest,
@@ -62,15 +72,30 @@ async def join_room(
         result = await service.join_room(room_id, request.nickname, request.player_id)
         if not result:
             raise HTTPException(status_code=404, detail="Room not found")
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
-        # Broadcast filtered state to all players
-        await broadcast_filtered_states(room_id, service)
+
+@router.post("/rooms/{room_id}/bots", response_model=GameStateSchema)
+@redis_budget(5)
+async def add_bots(
+    room_id: str,
+    request: AddBotsRequest,
+    service: GameService = Depends(get_game_service),
+):
+    """Fill seats with server-side bots; only the admin can, and only before the start."""
+    try:
+        result = await service.add_bots(room_id, request.player_id, request.count)
+        if not result:
+            raise HTTPException(status_code=404, detail="Room not found")
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.post("/rooms/{room_id}/settings", response_model=GameStateSchema)
+@redis_budget(4)
 async def update_settings(
     room_id: str,
     settings: GameSettingsSchema,
@@ -81,15 +106,13 @@ async def update_settings(
         result = await service.update_settings(room_id, player_id, settings)
         if not result:
             raise HTTPException(status_code=404, detail="Room not found")
-
-        # Broadcast filtered state
-        await broadcast_filtered_states(room_id, service)
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.post("/rooms/{room_id}/start", response_model=GameStateSchema)
+@redis_budget(7)
 async def start_game(
     room_id: str,
     request: StartGameRequest,
@@ -100,19 +123,19 @@ async def start_game(
         if not result:
             raise HTTPException(status_code=404, detail="Room not found")
 
-        # Broadcast filtered state to each player (each sees their own role only)
-        await broadcast_filtered_states(room_id, service)
-
         # Return filtered view for the admin
         game = await service.get_game(room_id)
         if game:
             return await service.get_player_view(game, request.player_id)
         return result
+    except RoomUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.post("/rooms/{room_id}/action", response_model=GameStateSchema)
+@redis_budget(6)
 async def submit_action(
     room_id: str,
     request: ActionRequest,
@@ -130,9 +153,6 @@ async def submit_action(
         if not result:
             raise HTTPException(status_code=404, detail="Room not found")
 
-        # Broadcast filtered state (includes phase transitions, reveals)
-        await broadcast_filtered_states(room_id, service)
-
         # Return the player's own filtered view
         game = await service.get_game(room_id)
         if game:
@@ -143,6 +163,7 @@ async def submit_action(
 
 
 @router.post("/rooms/{room_id}/vote", response_model=GameStateSchema)
+@redis_budget(6)
 async def submit_vote(
     room_id: str,
     request: VoteRequest,
@@ -154,9 +175,6 @@ async def submit_vote(
         if not result:
             raise HTTPException(status_code=404, detail="Room not found")
 
-        # Broadcast filtered state
-        await broadcast_filtered_states(room_id, service)
-
         game = await service.get_game(room_id)
         if game:
             return await service.get_player_view(game, player_id)
@@ -166,6 +184,7 @@ async def submit_vote(
 
 
 @router.post("/rooms/{room_id}/end", response_model=GameStateSchema)
+@redis_budget(5)
 async def end_game(
     room_id: str,
     request: PlayerIdRequest,
@@ -175,15 +194,15 @@ async def end_game(
         game_state = await service.end_game(room_id, request.player_id)
         if not game_state:
             raise HTTPException(status_code=404, detail="Room not found")
-
-        # Broadcast filtered state
-        await broadcast_filtered_states(room_id, service)
         return game_state
+    except RoomUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.post("/rooms/{room_id}/restart", response_model=GameStateSchema)
+@redis_budget(5)
 async def restart_game(
     room_id: str,
     request: PlayerIdRequest,
@@ -193,15 +212,15 @@ async def restart_game(
         game_state = await service.restart_game(room_id, request.player_id)
         if not game_state:
             raise HTTPException(status_code=404, detail="Room not found")
-
-        # Broadcast filtered state
-        await broadcast_filtered_states(room_id, service)
         return game_state
+    except RoomUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.post("/rooms/{room_id}/kick", response_model=GameStateSchema)
+@redis_budget(5)
 async def kick_player(
     room_id: str,
     request: KickPlayerRequest,
@@ -211,15 +230,15 @@ async def kick_player(
         game_state = await service.kick_player(room_id, request.player_id, request.target_id)
         if not game_state:
             raise HTTPException(status_code=404, detail="Room not found")
-
-        # Broadcast filtered state
-        await broadcast_filtered_states(room_id, service)
         return game_state
+    except RoomUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.get("/roles")
+@redis_budget(0)
 async def get_roles():
     """Get metadata for all roles including descriptions."""
     from app.models.roles import get_role_instance
@@ -230,3 +249,25 @@ async def get_roles():
         instance = get_role_instance(role_type)
         roles.append({"type": role_type, "description": instance.get_description()})
     return roles
+
+
+@router.post("/balance/predict", response_model=BalancePredictionResponse)
+@redis_budget(0)
+async def predict_balance(request: BalancePredictionRequest):
+    """Predicted villager win probability of a role distribution, from the balance table."""
+    from app.models.balance import balance_table
+    from app.schemas.game import RoleType
+
+    table = balance_table()
+    if table is None:
+        raise HTTPException(status_code=503, detail="Balance table unavailable")
+    players = request.players
+    if players is None:
+        players = sum(n for r, n in request.role_distribution.items() if r != RoleType.SPECTATOR)
+    try:
+        prediction = table.predict_villager_win(players, request.role_distribution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return BalancePredictionResponse(
+        players=players, villager_win=prediction.villager_win, source=prediction.source
+    )
@@ -1,23 +1,32 @@
 import asyncio
 import contextlib
 import logging
+import time
+from collections.abc import AsyncIterator
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, Header, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 
-from app.core.redis import RedisClient
+from app.core.keys import presence_key
+from app.core.metrics import WS_HANDSHAKE, WS_RESUMES, track_tasks
+from app.core.redis import RedisClient, TrafficClass, redis_budget
+from app.core.tracing import span
 from app.schemas.socket import PingMessage, PongMessage, StateUpdateMessage
 from app.services.game_service import GameService, get_game_service
-from app.services.websocket_manager import DISCONNECT_GRACE_PERIOD, manager
+from app.services.sse import SSEConnection, parse_event_id, retry_event
+from app.services.websocket_manager import DISCONNECT_GRACE_PERIOD, RoomSnapshot, manager
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 HEARTBEAT_INTERVAL = 30  # seconds between PINGs
 HEARTBEAT_TIMEOUT = 120  # extra seconds to wait for a PONG before giving up
+TRY_AGAIN_LATER = 1013  # Close code when over the handshake limit or draining; reason = retry ms
 
 # Strong refs to fire-and-forget background tasks (RUF006).
 _background_tasks: set[asyncio.Task] = set()
 _heartbeat_task: asyncio.Task | None = None
+track_tasks("disconnect_checks", lambda: len(_background_tasks))
 
 
 def _spawn(coro) -> asyncio.Task:
@@ -27,31 +36,85 @@ def _spawn(coro) -> asyncio.Task:
     return task
 
 
+@router.websocket("/ws/spectate/{room_id}")
+@redis_budget(1)  # Round trips before the first STATE_UPDATE frame; 0 once the room is watched
+async def spectator_endpoint(websocket: WebSocket, room_id: str):
+    """Spectator socket: the room's shared public view, SPECTATOR_DELAY_SECONDS late.
+
+    Spectators are not players, so they skip presence and the handshake admission limit; a
+    room's spectators on this node all wait on the same load.
+    """
+    if manager.draining:
+        await websocket.accept()
+        await websocket.close(TRY_AGAIN_LATER, str(manager.admission.retry_after_ms()))
+        return
+    if not await manager.connect_spectator(room_id, websocket):
+        await websocket.close(code=4000)
+        return
+
+    try:
+        timeout = HEARTBEAT_INTERVAL + HEARTBEAT_TIMEOUT
+        while True:
+            try:
+                data = await asyncio.wait_for(websocket.receive_json(), timeout=timeout)
+            except TimeoutError:
+                break
+            if data.get("type") == "PING":
+                await websocket.send_text(PongMessage(room_id=room_id).model_dump_json())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await manager.disconnect_spectator(room_id, websocket)
+
+
 @router.websocket("/ws/{room_id}/{client_id}")
+@redis_budget(1)  # Round trips before the first STATE_UPDATE frame
 async def websocket_endpoint(
     websocket: WebSocket,
     room_id: str,
     client_id: str,
+    seq: int | None = None,
+    version: int | None = None,
     service: GameService = Depends(get_game_service),
 ):
-    game = await service.get_game(room_id)
-    if not game:
+    """Player socket. A client resuming after a drop passes the last event ``seq`` and state
+    ``version`` it saw, and is sent only what it missed when the room still buffers it."""
+    if manager.draining or not manager.admission.try_acquire():
+        # Accepted first so the client sees the close code rather than a failed upgrade.
+        await websocket.accept()
+        await websocket.close(TRY_AGAIN_LATER, str(manager.admission.retry_after_ms()))
+        return
+
+    start = time.perf_counter()
+    try:
+        with span("ws.handshake") as handshake:
+            # State, presence check-and-set and the room's presence in one round trip, shared
+            # with the room's other sockets connecting at the same time.
+            connected = await manager.connect(room_id, client_id, websocket, seq is not None)
+            if connected is not None:
+                snapshot, was_online = connected
+                handshake.set(
+                    players=len(snapshot.game.players),
+                    phase=snapshot.game.phase.value,
+                    reconnect=was_online,
+                )
+    finally:
+        manager.admission.release()
+    if connected is None:
         await websocket.close(code=4000)
         return
 
-    player = game.players.get(client_id)
+    player = snapshot.game.players.get(client_id)
     nickname = player.nickname if player else "Unknown"
 
-    was_online = await manager.connect(room_id, client_id, websocket)
-
-    # Rising-edge reconnection: only fire if the player was previously offline.
-    if player and not was_online:
-        await manager.broadcast_reconnect(room_id, client_id, nickname)
-
     try:
-        filtered_state = await service.get_player_view(game, client_id)
-        msg = StateUpdateMessage(room_id=room_id, payload=filtered_state)
-        await websocket.send_text(msg.model_dump_json())
+        for frame in await _catch_up(service, snapshot, client_id, seq, version):
+            await websocket.send_text(frame)
+        WS_HANDSHAKE.labels(str(was_online).lower()).observe(time.perf_counter() - start)
+
+        # Rising-edge reconnection: only announce the player if they were previously offline.
+        if player and not was_online:
+            manager.queue_reconnect(room_id, client_id, nickname)
 
         timeout = HEARTBEAT_INTERVAL + HEARTBEAT_TIMEOUT
         while True:
@@ -76,20 +139,108 @@ async def websocket_endpoint(
         _spawn(_verify_disconnect(room_id, client_id, nickname))
 
 
+@router.get("/api/rooms/{room_id}/events")
+@redis_budget(1)  # Round trips before the first event
+async def event_stream(
+    room_id: str,
+    player_id: str,
+    seq: int | None = None,
+    version: int | None = None,
+    last_event_id: str | None = Header(None),
+    service: GameService = Depends(get_game_service),
+):
+    """Server-Sent Events fallback for the player socket, for clients that can't open one.
+
+    The same frames as the socket, one ``data`` event each, from the same fan-out. Resumes
+    from ``Last-Event-ID``, which the browser sends when it reconnects on its own, or from
+    ``seq`` and ``version`` as on the socket. Staying connected keeps the player online.
+    """
+    if (cursor := parse_event_id(last_event_id)) is not None:
+        seq, version = cursor
+    if manager.draining or not manager.admission.try_acquire():
+        # The browser reconnects by itself once the stream ends, after the given delay.
+        retry = retry_event(manager.admission.retry_after_ms())
+        return StreamingResponse(iter([retry]), media_type="text/event-stream")
+
+    connection = SSEConnection()
+    try:
+        connected = await manager.connect(room_id, player_id, connection, seq is not None)
+    finally:
+        manager.admission.release()
+    if connected is None:
+        raise HTTPException(status_code=404, detail="Room not found")
+    snapshot, was_online = connected
+    connection.seq, connection.version = snapshot.seq, snapshot.version
+
+    player = snapshot.game.players.get(player_id)
+    nickname = player.nickname if player else "Unknown"
+    try:
+        first = await _catch_up(service, snapshot, player_id, seq, version)
+    except Exception:
+        await manager.disconnect(room_id, player_id)
+        raise
+    if player and not was_online:
+        manager.queue_reconnect(room_id, player_id, nickname)
+
+    async def events() -> AsyncIterator[str]:
+        refreshed = time.monotonic()
+        try:
+            for frame in first:
+                yield connection.event(frame)
+            async for event in connection.events(keepalive=HEARTBEAT_INTERVAL):
+                yield event
+                if time.monotonic() - refreshed >= HEARTBEAT_INTERVAL:
+                    refreshed = time.monotonic()
+                    await manager.update_presence(room_id, player_id)
+        finally:
+            if manager.active_connections.get(room_id, {}).get(player_id) is connection:
+                await manager.disconnect(room_id, player_id)
+                _spawn(_verify_disconnect(room_id, player_id, nickname))
+
+    # Not buffered by nginx or intermediaries, so each event goes out as it is written.
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+
+async def _catch_up(
+    service: GameService,
+    snapshot: RoomSnapshot,
+    client_id: str,
+    seq: int | None,
+    version: int | None,
+) -> list[str]:
+    """The first frames for a client that saw up to ``seq`` and ``version``: the events it
+    missed when the room still buffers them, then its state unless that is current."""
+    missed = None if seq is None else snapshot.events_after(seq)
+    if seq is not None:
+        WS_RESUMES.labels("snapshot" if missed is None else "replay").inc()
+    frames = list(missed or ())
+    if missed is None or version != snapshot.version:
+        filtered_state = await service.get_player_view(snapshot.game, client_id, snapshot.presence)
+        msg = StateUpdateMessage(
+            room_id=snapshot.game.room_id,
+            payload=filtered_state,
+            version=snapshot.version,
+            seq=snapshot.seq,
+        )
+        frames.append(msg.model_dump_json())
+    return frames
+
+
 async def _verify_disconnect(room_id: str, client_id: str, nickname: str) -> None:
     """After the grace period, broadcast disconnect if the client hasn't reconnected."""
     await asyncio.sleep(DISCONNECT_GRACE_PERIOD)
 
-    redis = RedisClient.get_client()
-    presence_key = f"presence:{room_id}:{client_id}"
-    ttl = await redis.ttl(presence_key)
+    redis = RedisClient.for_room(room_id, TrafficClass.PRESENCE)
+    key = presence_key(room_id, client_id)
+    ttl = await redis.ttl(key)
 
     # ttl == -2  → key gone; ttl == -1 → no expiry (shouldn't happen for presence);
     # otherwise, a fresh reconnect bumps TTL to PRESENCE_TTL (90s), so a value below
     # the grace period means they never came back.
     if ttl == -2 or (ttl != -1 and ttl <= DISCONNECT_GRACE_PERIOD):
         if ttl != -2:
-            await redis.delete(presence_key)
+            await redis.delete(key)
         await manager.broadcast_disconnect(room_id, client_id, nickname)
 
 
@@ -102,6 +253,10 @@ async def _heartbeat_loop() -> None:
             for _client_id, ws in list(connections.items()):
                 with contextlib.suppress(Exception):
                     await ws.send_text(ping)
+            stream = manager.spectator_streams.get(room_id)
+            for ws in list(stream.sockets if stream else ()):
+                with contextlib.suppress(Exception):
+                    await ws.send_text(ping)
 
 
 def start_heartbeat_loop() -> None:
@@ -1,5 +1,7 @@
 import subprocess
+from typing import Literal
 
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,13 +16,104 @@ def _git_output(*args: str) -> str | None:
         return None
 
 
+class RedisPoolSettings(BaseModel):
+    """Connection pool limits for one Redis traffic class."""
+
+    max_connections: int = 20
+    timeout: float = 2.0  # Seconds to wait for a free connection before failing
+    socket_timeout: float | None = 5.0
+    health_check_interval: int = 30
+
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Werewolf Game"
     REDIS_URL: str = "redis://redis:6379/0"
+    # Rooms are consistent-hashed across these URLs when set; REDIS_URL stays the primary for
+    # node-wide keys. REDIS_PREVIOUS_SHARD_URLS holds the ring before a reshard so rooms can
+    # be moved online. Set REDIS_CLUSTER to treat REDIS_URL as a Redis Cluster entry point.
+    REDIS_SHARD_URLS: list[str] = []
+    REDIS_PREVIOUS_SHARD_URLS: list[str] = []
+    REDIS_CLUSTER: bool = False
+    # Each traffic class (state, locks, presence, pubsub) gets its own pool per Redis URL, so
+    # a heartbeat or lock-polling burst can't queue in front of state writes. Pub/sub holds a
+    # connection per subscribed shard for the lifetime of the node.
+    REDIS_POOLS: dict[str, RedisPoolSettings] = {
+        "state": RedisPoolSettings(max_connections=50, timeout=5.0),
+        "locks": RedisPoolSettings(max_connections=20, timeout=1.0),
+        "presence": RedisPoolSettings(max_connections=20, timeout=1.0),
+        "pubsub": RedisPoolSettings(max_connections=10, timeout=5.0, socket_timeout=None),
+    }
     BACKEND_CORS_ORIGINS: list[str] = ["http://localhost:5173", "http://localhost:3000"]
 
     # Game defaults
     DEFAULT_PHASE_DURATION: int = 60
+    GAME_TTL_SECONDS: int = 3600
+
+    # Mutations queued for a room while its previous write is in flight are committed together.
+    MUTATION_BATCH_MAX_SIZE: int = 256
+
+    # Room ownership: one node leases each room, keeps its Game in memory and applies
+    # mutations through a mailbox. Other nodes forward commands to the owner over Redis.
+    ROOM_OWNERSHIP_ENABLED: bool = False
+    NODE_ID: str = ""  # Generated at startup when empty
+    ROOM_LEASE_TTL_MS: int = 10_000
+    ROOM_FORWARD_TIMEOUT: float = 5.0
+    ROOM_ACTOR_IDLE_SECONDS: int = 600
+
+    # Tracing: every request is traced in memory; a trace is logged when its root span is
+    # slower than TRACE_SLOW_MS or lands in the TRACE_SAMPLE_RATE random sample.
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 0.01
+    TRACE_SLOW_MS: float = 250.0
+
+    # Logging: "production" samples hot-path events (per-action and per-broadcast logs) at
+    # LOG_HOT_PATH_SAMPLE_RATE, records callsites for warnings only and renders off-thread.
+    LOG_PROFILE: Literal["dev", "production"] = "dev"
+    LOG_HOT_PATH_SAMPLE_RATE: float = 0.01
+
+    # Reconnect storms: at most WS_HANDSHAKE_CONCURRENCY sockets per node wait on their room's
+    # load at once. The rest are closed with 1013 (Try Again Later) and a retry delay, jittered
+    # between WS_RETRY_AFTER_SECONDS and twice that, in milliseconds as the close reason.
+    # Reconnects to a room within WS_PRESENCE_DIGEST_SECONDS go out as one PRESENCE_DIGEST.
+    WS_HANDSHAKE_CONCURRENCY: int = 64
+    WS_RETRY_AFTER_SECONDS: float = 1.0
+    WS_PRESENCE_DIGEST_SECONDS: float = 0.5
+
+    # Spectators of a room share one public view per node, sent SPECTATOR_DELAY_SECONDS
+    # after the players see it. Raising it past a phase's length stops a player from reading
+    # dead players' roles off the spectator stream in a second tab.
+    SPECTATOR_DELAY_SECONDS: float = 0.0
+
+    # On SIGTERM, sockets are asked to reconnect elsewhere at random points over this many
+    # seconds before the server shuts down; keep it under the platform's kill timeout (10s on
+    # Cloud Run).
+    SHUTDOWN_DRAIN_SECONDS: float = 8.0
+
+    # Socket events (presence, digests) kept per room so a client that reconnects with the
+    # last seq it saw gets only what it missed; older gaps fall back to a full state.
+    ROOM_EVENT_BUFFER_SIZE: int = 64
+
+    # Server-side bots: one scheduler loop per node plays the bots of every room it sees
+    # committed, each move after a think delay drawn from [BOT_THINK_MIN_SECONDS,
+    # BOT_THINK_MAX_SECONDS]. At most BOT_MAX_CONCURRENT_MOVES bot moves are in flight per
+    # node, so bot-filled rooms wait on each other rather than on human rooms' commits.
+    BOT_THINK_MIN_SECONDS: float = 1.0
+    BOT_THINK_MAX_SECONDS: float = 4.0
+    BOT_MAX_CONCURRENT_MOVES: int = 16
+
+    # Quick play: every node's matchmaker takes full rooms of MATCHMAKING_ROOM_SIZE players off
+    # the shared queue each MATCHMAKING_TICK_SECONDS, at most MATCHMAKING_MAX_ROOMS_PER_TICK
+    # rooms at a time. Once the oldest player has waited MATCHMAKING_MAX_WAIT_SECONDS, a smaller
+    # room of everyone waiting is made if that is at least MATCHMAKING_MIN_ROOM_SIZE.
+    MATCHMAKING_ROOM_SIZE: int = 8
+    MATCHMAKING_MIN_ROOM_SIZE: int = 5
+    MATCHMAKING_MAX_WAIT_SECONDS: float = 30.0
+    MATCHMAKING_TICK_SECONDS: float = 1.0
+    MATCHMAKING_MAX_ROOMS_PER_TICK: int = 100
+
+    # Log every room's initial state and mutations as JSON lines that python -m app.sim.replay
+    # can rebuild the game from. Costs a state digest per mutation; off by default.
+    ACTION_LOG_ENABLED: bool = False
 
     # Version info — overridable via env, with a git fallback for local dev.
     VERSION: str = "0.0.0"
@@ -14,3 +14,9 @@ class PhaseError(GameLogicError):
     """Raised when an action is attempted in the wrong phase."""
 
     pass
+
+
+class RoomUnavailableError(Exception):
+    """Raised when the node owning a room cannot be reached and its lease has not expired."""
+
+    pass
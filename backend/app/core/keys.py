@@ -0,0 +1,92 @@
+"""Redis key and channel names.
+
+Every key and shard channel that belongs to a room wraps the room id in a ``{...}`` hash
+tag, so Redis Cluster places all of a room's keys in one slot. That keeps multi-key
+commands (``MGET`` of presence) and Lua scripts that touch several room keys legal, and the
+consistent-hash ring in ``RedisClient`` routes on the same room id.
+"""
+
+
+def game_key(room_id: str) -> str:
+    return f"game:{{{room_id}}}"
+
+
+def lock_key(room_id: str) -> str:
+    return f"game:{{{room_id}}}:lock"
+
+
+def version_key(room_id: str) -> str:
+    return f"game:{{{room_id}}}:version"
+
+
+def events_key(room_id: str) -> str:
+    """Ring buffer of the room's latest socket events, for clients resuming a session."""
+    return f"game:{{{room_id}}}:events"
+
+
+def event_seq_key(room_id: str) -> str:
+    """Sequence number of the room's latest socket event."""
+    return f"game:{{{room_id}}}:events:seq"
+
+
+def owner_key(room_id: str) -> str:
+    return f"game:{{{room_id}}}:owner"
+
+
+def moved_key(room_id: str) -> str:
+    """Marker left on a shard a room has been moved off; saves there are refused."""
+    return f"game:{{{room_id}}}:moved"
+
+
+def presence_key(room_id: str, player_id: str) -> str:
+    return f"presence:{{{room_id}}}:{player_id}"
+
+
+def room_channel(room_id: str) -> str:
+    """Sharded pub/sub channel carrying a room's events (``SPUBLISH``/``SSUBSCRIBE``)."""
+    return f"room:{{{room_id}}}"
+
+
+def room_changes_channel(room_id: str) -> str:
+    """Internal channel carrying ``ROOM_CHANGED`` events with the full, unfiltered state.
+
+    Kept apart from ``room_channel`` so nothing that relays room messages to sockets, on
+    this release or an older one, ever sees it.
+    """
+    return f"room:{{{room_id}}}:changed"
+
+
+def lobby_key(index: str) -> str:
+    """Global lobby index on the primary; every part shares the ``{lobby}`` hash tag."""
+    return f"lobby:{{lobby}}:{index}"
+
+
+def matchmaking_key(part: str) -> str:
+    """Global quick-play queue on the primary; every part shares the ``{matchmaking}`` tag."""
+    return f"matchmaking:{{matchmaking}}:{part}"
+
+
+def node_channel(node_id: str) -> str:
+    return f"node:{node_id}"
+
+
+def legacy_game_key(room_id: str) -> str:
+    """State key used before keys were hash-tagged; read once and moved on first access."""
+    return f"game:{room_id}"
+
+
+def legacy_version_key(room_id: str) -> str:
+    return f"game:{room_id}:version"
+
+
+def legacy_moved_key(room_id: str) -> str:
+    return f"game:{room_id}:moved"
+
+
+def room_id_from_tagged(name: str) -> str | None:
+    """Extract the room id from any room-scoped key or channel name."""
+    start = name.find("{")
+    end = name.find("}", start + 1)
+    if start == -1 or end == -1:
+        return None
+    return name[start + 1 : end]
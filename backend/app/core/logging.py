@@ -1,9 +1,22 @@
+import atexit
+import contextvars
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+from typing import TextIO
 
 import structlog
 from asgi_correlation_id import correlation_id
 
+from app.core.config import settings
+
+# Rendering thread for the production profile; None when logging synchronously.
+_listener: logging.handlers.QueueListener | None = None
+_hot_path_sample_rate = 1.0
+_CALLSITE_LEVELS = frozenset({"warning", "error", "critical"})
+
 
 def add_correlation(_logger, _log_method, event_dict):
     """Add request correlation ID to log event."""
@@ -12,8 +25,73 @@ def add_correlation(_logger, _log_method, event_dict):
     return event_dict
 
 
-def setup_logging():
-    """Configure structured logging for the application."""
+class WarningCallsiteAdder(structlog.processors.CallsiteParameterAdder):
+    """Callsite capture for WARNING and above only; it walks stack frames on every call."""
+
+    def __call__(self, logger, name, event_dict):
+        if event_dict.get("level") not in _CALLSITE_LEVELS:
+            return event_dict
+        return super().__call__(logger, name, event_dict)
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread untouched, with the caller's context attached.
+
+    The stock ``prepare`` formats the message in the calling thread, which is exactly the
+    work this handler exists to move. Processors that read context variables (correlation
+    id, ``merge_contextvars``) run in the listener under the captured context instead.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.log_context = contextvars.copy_context()
+        return record
+
+
+class ContextStreamHandler(logging.StreamHandler):
+    def emit(self, record: logging.LogRecord) -> None:
+        context = getattr(record, "log_context", None)
+        if context is None:
+            super().emit(record)
+        else:
+            context.run(super().emit, record)
+
+
+def sample_hot_path(logger: logging.Logger) -> bool:
+    """Whether to log this occurrence of a per-action or per-broadcast event.
+
+    Call it before building the message so dropped events cost one random draw:
+    ``if sample_hot_path(logger): logger.info(...)``.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return False
+    return _hot_path_sample_rate >= 1.0 or random.random() < _hot_path_sample_rate
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the rendering thread, if any."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging(profile: str | None = None, stream: TextIO | None = None):
+    """Configure structured logging for the application.
+
+    ``profile`` defaults to ``LOG_PROFILE``. ``production`` samples hot-path events at
+    ``LOG_HOT_PATH_SAMPLE_RATE``, captures callsites for warnings only and renders records on
+    a background thread behind a queue; ``dev`` logs everything synchronously.
+    """
+    global _listener, _hot_path_sample_rate
+    profile = profile or settings.LOG_PROFILE
+    production = profile == "production"
+    stream = stream or sys.stdout
+    shutdown_logging()
+
+    callsite_adder = (
+        WarningCallsiteAdder if production else structlog.processors.CallsiteParameterAdder
+    )
+    _hot_path_sample_rate = settings.LOG_HOT_PATH_SAMPLE_RATE if production else 1.0
 
     # Processors applied to all logs (structlog + stdlib)
     shared_processors = [
@@ -23,7 +101,7 @@ def setup_logging():
         structlog.stdlib.add_log_level,
         structlog.stdlib.PositionalArgumentsFormatter(),
         structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.CallsiteParameterAdder(
+        callsite_adder(
             {
                 structlog.processors.CallsiteParameter.FILENAME,
                 structlog.processors.CallsiteParameter.FUNC_NAME,
@@ -33,10 +111,11 @@ def setup_logging():
         structlog.processors.StackInfoRenderer(),
     ]
 
-    # Processors strictly for structlog (creating the event dict)
+    # Processors strictly for structlog (creating the event dict). The level filter goes
+    # first so disabled calls don't pay for timestamps and callsites.
     structlog_processors = [
-        *shared_processors,
         structlog.stdlib.filter_by_level,
+        *shared_processors,
         structlog.processors.UnicodeDecoder(),
         structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
     ]
@@ -67,8 +146,18 @@ def setup_logging():
         ],
     )
 
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(formatter)
+    output = ContextStreamHandler(stream)
+    output.setFormatter(formatter)
+
+    handler: logging.Handler = output
+    if production:
+        # The caller only enqueues; formatting and the write to stdout happen off-thread.
+        log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        handler = ContextQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, output)
+        _listener.start()
+    # Thread and process names are never rendered; skip collecting them per record.
+    logging.logThreads = logging.logProcesses = logging.logMultiprocessing = not production
 
     # Clean up existing handlers
     root_logger = logging.getLogger()
@@ -83,5 +172,6 @@ def setup_logging():
         logger.propagate = True
 
 
+atexit.register(shutdown_logging)
 setup_logging()
 logger = structlog.get_logger()
@@ -0,0 +1,143 @@
+"""Prometheus metrics for the HTTP, WebSocket and Redis hot paths.
+
+Everything is recorded in-process on the default ``prometheus_client`` registry and scraped
+from ``GET /metrics``. Observing a histogram is a lock-protected float add, cheap enough for
+per-command and per-(de)serialisation timing; gauges whose value already lives somewhere
+(connection maps, task sets, pool stats) are read at scrape time rather than tracked.
+"""
+
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import Metric
+from prometheus_client.registry import REGISTRY, Collector
+
+# Sub-millisecond resolution at the bottom for Redis commands and (de)serialisation.
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "werewolf_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+LOCK_WAIT = Histogram(
+    "werewolf_room_lock_wait_seconds",
+    "Time GameService waits to acquire a room lock.",
+    buckets=FAST_BUCKETS,
+)
+GAME_SERIALIZATION = Histogram(
+    "werewolf_game_serialization_seconds",
+    "Game.from_json / Game.to_json duration.",
+    ["op"],
+    buckets=FAST_BUCKETS,
+)
+BROADCAST_RENDER = Histogram(
+    "werewolf_broadcast_render_seconds",
+    "Time to build one player's filtered view for a broadcast.",
+    buckets=FAST_BUCKETS,
+)
+BROADCAST_SEND = Histogram(
+    "werewolf_broadcast_send_seconds",
+    "Time to write one broadcast frame to a socket.",
+    buckets=FAST_BUCKETS,
+)
+REDIS_COMMAND_DURATION = Histogram(
+    "werewolf_redis_command_seconds",
+    "Redis command round-trip latency by command.",
+    ["command"],
+    buckets=FAST_BUCKETS,
+)
+REDIS_POOL_WAIT = Histogram(
+    "werewolf_redis_pool_wait_seconds",
+    "Time spent waiting for a pooled Redis connection.",
+    ["traffic"],
+    buckets=FAST_BUCKETS,
+)
+WS_HANDSHAKE = Histogram(
+    "werewolf_ws_handshake_seconds",
+    "Socket connect to first STATE_UPDATE sent; reconnect=true when presence was still live.",
+    ["reconnect"],
+)
+WS_RESUMES = Counter(
+    "werewolf_ws_resumes_total",
+    "Sockets resuming a session: 'replay' when only missed events were sent, else 'snapshot'.",
+    ["outcome"],
+)
+WS_HANDSHAKE_REJECTED = Counter(
+    "werewolf_ws_handshakes_rejected_total",
+    "Sockets told to retry later because this node was at its handshake limit.",
+)
+DRAIN_RECONNECT_HINTS = Counter(
+    "werewolf_drain_reconnect_hints_total",
+    "RECONNECT messages sent to sockets while this node drains.",
+)
+DRAIN_FORCED_CLOSES = Counter(
+    "werewolf_drain_forced_closes_total",
+    "Sockets still open after their RECONNECT delay, closed by the draining node.",
+)
+BOT_MOVES = Counter(
+    "werewolf_bot_moves_total",
+    "Server-side bot moves by outcome: played, stale (the phase moved on), rejected, failed.",
+    ["outcome"],
+)
+BOT_MOVE_LAG = Histogram(
+    "werewolf_bot_move_lag_seconds",
+    "How late bot moves start after their think delay; grows when the scheduler is saturated.",
+    buckets=FAST_BUCKETS,
+)
+MATCHMAKING_ROOMS = Counter(
+    "werewolf_matchmaking_rooms_total",
+    "Rooms created by this node's matchmaker from the quick-play queue.",
+)
+MATCHMAKING_WAIT = Histogram(
+    "werewolf_matchmaking_wait_seconds",
+    "Time players spent in the quick-play queue before being placed in a room.",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0),
+)
+BACKGROUND_TASKS = Gauge(
+    "werewolf_background_tasks",
+    "Background asyncio tasks tracked by each component.",
+    ["kind"],
+)
+
+
+@contextmanager
+def timed(histogram: Histogram) -> Iterator[None]:
+    """Observe the duration of the block; cheaper than ``Histogram.time`` on hot paths."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+
+def track_tasks(kind: str, count: Callable[[], int]) -> None:
+    """Report ``count()`` as the number of ``kind`` background tasks at scrape time."""
+    BACKGROUND_TASKS.labels(kind).set_function(count)
+
+
+class ScrapeCollector(Collector):
+    """Builds metric families from a callback each time ``/metrics`` is scraped."""
+
+    def __init__(self, collect: Callable[[], Iterable[Metric]]):
+        self._collect = collect
+
+    def collect(self) -> Iterable[Metric]:
+        return self._collect()
+
+
+def register_scrape_collector(collect: Callable[[], Iterable[Metric]]) -> None:
+    REGISTRY.register(ScrapeCollector(collect))
+
+
+def render_latest() -> tuple[bytes, str]:
+    """The exposition payload and its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
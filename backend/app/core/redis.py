@@ -1,29 +1,323 @@
-from collections.abc import Awaitable
-from typing import cast
+import asyncio
+import bisect
+import hashlib
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, ClassVar, TypeVar, cast
 
-from redis.asyncio import Redis, from_url
+from prometheus_client.core import GaugeMetricFamily, Metric
+from redis.asyncio import BlockingConnectionPool, Redis, RedisCluster
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import NoScriptError
+
+from app.core.config import RedisPoolSettings, settings
+from app.core.metrics import REDIS_COMMAND_DURATION, REDIS_POOL_WAIT, register_scrape_collector
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class HashRing:
+    """Consistent-hash ring mapping room ids to shard names.
+
+    Each shard is placed at many virtual points so rooms spread evenly, and adding or
+    removing a shard only moves the rooms whose points change owner.
+    """
+
+    def __init__(self, shards: Sequence[str], replicas: int = 160):
+        if not shards:
+            raise ValueError("HashRing needs at least one shard")
+        points = sorted(
+            (self._hash(f"{shard}#{i}"), shard) for shard in shards for i in range(replicas)
+        )
+        self._hashes = [h for h, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+    def get(self, key: str) -> str:
+        index = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._shards[index]
+
+
+class TrafficClass(str, Enum):
+    """Kinds of Redis traffic that get their own connection pool.
+
+    A burst in one class (heartbeats refreshing presence, lock polling) then waits for its
+    own connections instead of queueing in front of latency-critical state writes.
+    """
+
+    STATE = "state"  # Game state loads/saves and room migration
+    LOCKS = "locks"  # Room locks and ownership leases
+    PRESENCE = "presence"  # Presence keys: heartbeats, reconnect checks, disconnect TTLs
+    PUBSUB = "pubsub"  # Subscriber connections and publishes
+
+
+@dataclass
+class PoolStats:
+    """Connection checkout statistics for one pool."""
+
+    acquired: int = 0
+    timeouts: int = 0
+    in_use: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """Blocking pool that records how long callers wait for a connection."""
+
+    def __init__(self, *args: Any, traffic: str = "", **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.traffic = traffic
+        self.stats = PoolStats()
+        self._wait = REDIS_POOL_WAIT.labels(traffic)
+
+    async def get_connection(self, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            connection = await super().get_connection(*args, **kwargs)
+        except RedisConnectionError:
+            self.stats.timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+        self._wait.observe(waited)
+        self.stats.acquired += 1
+        self.stats.in_use += 1
+        self.stats.wait_seconds_total += waited
+        self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, waited)
+        return connection
+
+    async def release(self, connection: Any) -> None:
+        self.stats.in_use = max(0, self.stats.in_use - 1)
+        await super().release(connection)
+
+
+# Commands issued in the current context while ``count_round_trips`` is active.
+_round_trips: ContextVar[list[str] | None] = ContextVar("redis_round_trips", default=None)
+
+
+@contextmanager
+def count_round_trips() -> Iterator[list[str]]:
+    """Record every round trip made by instrumented clients inside the block.
+
+    Each entry is a command name; a pipeline is one entry, ``PIPELINE(<commands>)``. Tasks
+    started inside the block share the list. Used by the Redis budget checks.
+    """
+    commands: list[str] = []
+    token = _round_trips.set(commands)
+    try:
+        yield commands
+    finally:
+        _round_trips.reset(token)
+
+
+def redis_budget(round_trips: int) -> Callable[[F], F]:
+    """Declare how many Redis round trips one call of a route may make.
+
+    The budget is checked by ``tests/test_redis_budgets.py``; it has no effect at runtime.
+    """
+
+    def decorate(endpoint: F) -> F:
+        endpoint.redis_budget = round_trips  # type: ignore[attr-defined]
+        return endpoint
+
+    return decorate
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        if (log := _round_trips.get()) is not None and self.command_stack:
+            names = ",".join(str(args[0]).upper() for args, _ in self.command_stack)
+            log.append(f"PIPELINE({names})")
+        return await super().execute(raise_on_error)
+
+
+class InstrumentedRedis(Redis):
+    """Redis client that records per-command latency.
+
+    Pipelines and pub/sub reads bypass ``execute_command`` and are not timed.
+    """
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        command = str(args[0]).upper()
+        if (log := _round_trips.get()) is not None:
+            log.append(command)
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_DURATION.labels(command).observe(time.perf_counter() - start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Any = None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+def _pool_settings(traffic: TrafficClass) -> RedisPoolSettings:
+    return settings.REDIS_POOLS.get(traffic.value, RedisPoolSettings())
+
+
+def _connect_pool(url: str, traffic: TrafficClass) -> Redis:
+    pool_settings = _pool_settings(traffic)
+    pool = InstrumentedConnectionPool.from_url(
+        url,
+        max_connections=pool_settings.max_connections,
+        timeout=pool_settings.timeout,
+        socket_timeout=pool_settings.socket_timeout,
+        health_check_interval=pool_settings.health_check_interval,
+        encoding="utf-8",
+        decode_responses=True,
+        traffic=traffic.value,
+    )
+    return InstrumentedRedis.from_pool(pool)
+
+
+def _connect_cluster(url: str, traffic: TrafficClass) -> Redis:
+    # The cluster client keeps a pool per node; a client per class keeps those pools apart.
+    pool_settings = _pool_settings(traffic)
+    client = RedisCluster.from_url(
+        url,
+        max_connections=pool_settings.max_connections,
+        socket_timeout=pool_settings.socket_timeout,
+        health_check_interval=pool_settings.health_check_interval,
+        decode_responses=True,
+    )
+    # The cluster client exposes the same command API; it is typed separately upstream.
+    return cast(Redis, client)
 
 
 class RedisClient:
-    """Singleton wrapper around the async Redis client used across the app."""
+    """Singleton wrapper around the async Redis clients used across the app.
 
-    _client: Redis | None = None
+    Every Redis URL gets one client per ``TrafficClass``, each on its own connection pool.
+    Keys that don't belong to a room (node channels, global indexes) live on the primary
+    URL. Room keys go through ``for_room``: with a list of shard URLs the room id is
+    consistent-hashed onto one of them; with Redis Cluster the cluster client routes on the
+    ``{room_id}`` hash tag by itself.
+    """
+
+    _clients: ClassVar[dict[TrafficClass, Redis]] = {}
+    _shards: ClassVar[dict[str, dict[TrafficClass, Redis]]] = {}
+    _ring: HashRing | None = None
+    _previous_ring: HashRing | None = None
 
     @classmethod
-    def get_client(cls) -> Redis:
-        if cls._client is None:
+    def get_client(cls, traffic: TrafficClass = TrafficClass.STATE) -> Redis:
+        if not cls._clients:
             raise RuntimeError("Redis client not initialized; call RedisClient.connect first")
-        return cls._client
+        return cls._clients[traffic]
+
+    @classmethod
+    def for_room(cls, room_id: str, traffic: TrafficClass = TrafficClass.STATE) -> Redis:
+        """Client holding the room's keys and shard channel."""
+        if cls._ring is None:
+            return cls.get_client(traffic)
+        return cls._shards[cls._ring.get(room_id)][traffic]
 
     @classmethod
-    async def connect(cls, url: str) -> None:
-        client = from_url(url, encoding="utf-8", decode_responses=True)
+    def previous_for_room(cls, room_id: str) -> Redis | None:
+        """State client the room lived on before the last reshard, if it has moved since."""
+        if cls._ring is None or cls._previous_ring is None:
+            return None
+        previous = cls._previous_ring.get(room_id)
+        if previous == cls._ring.get(room_id):
+            return None
+        return cls._shards[previous][TrafficClass.STATE]
+
+    @classmethod
+    def shard_clients(cls) -> list[Redis]:
+        """Every distinct state client, for work that must visit all shards."""
+        if not cls._shards:
+            return [cls.get_client()]
+        return [clients[TrafficClass.STATE] for clients in cls._shards.values()]
+
+    @classmethod
+    def pool_stats(cls) -> dict[str, dict[str, PoolStats]]:
+        """Checkout statistics per traffic class, keyed by Redis server within each class."""
+        stats: dict[str, dict[str, PoolStats]] = {}
+        for clients in [cls._clients, *cls._shards.values()]:
+            for traffic, client in clients.items():
+                pool = getattr(client, "connection_pool", None)
+                if isinstance(pool, InstrumentedConnectionPool):
+                    kwargs = pool.connection_kwargs
+                    # Host and db only: the URL may carry a password.
+                    name = f"{kwargs.get('host')}:{kwargs.get('port')}/{kwargs.get('db', 0)}"
+                    stats.setdefault(traffic.value, {})[name] = pool.stats
+        return stats
+
+    @classmethod
+    async def connect(
+        cls,
+        url: str,
+        shard_urls: Sequence[str] = (),
+        previous_shard_urls: Sequence[str] = (),
+        cluster: bool = False,
+    ) -> None:
+        connect = _connect_cluster if cluster else _connect_pool
+        clients = {traffic: connect(url, traffic) for traffic in TrafficClass}
         # redis-py's sync/async stubs collapse ping() to bool; the runtime value is a coroutine.
-        await cast(Awaitable[bool], client.ping())
-        cls._client = client
+        await asyncio.gather(*(cast(Awaitable[bool], c.ping()) for c in clients.values()))
+        cls._clients = clients
+
+        if shard_urls and not cluster:
+            shards: dict[str, dict[TrafficClass, Redis]] = {}
+            for shard_url in dict.fromkeys([*shard_urls, *previous_shard_urls]):
+                if shard_url == url:
+                    shards[shard_url] = clients
+                    continue
+                shard = {traffic: _connect_pool(shard_url, traffic) for traffic in TrafficClass}
+                await cast(Awaitable[bool], shard[TrafficClass.STATE].ping())
+                shards[shard_url] = shard
+            cls._shards = shards
+            cls._ring = HashRing(shard_urls)
+            cls._previous_ring = HashRing(previous_shard_urls) if previous_shard_urls else None
 
     @classmethod
     async def close(cls) -> None:
-        if cls._client is not None:
-            await cls._client.aclose()
-            cls._client = None
+        unique = {
+            id(c): c for group in [cls._clients, *cls._shards.values()] for c in group.values()
+        }
+        for client in unique.values():
+            await client.aclose()
+        cls._clients = {}
+        cls._shards = {}
+        cls._ring = cls._previous_ring = None
+
+
+def _collect_pool_gauges() -> Iterable[Metric]:
+    in_use = GaugeMetricFamily(
+        "werewolf_redis_pool_in_use",
+        "Connections checked out of each Redis pool.",
+        labels=["traffic", "server"],
+    )
+    for traffic, pools in RedisClient.pool_stats().items():
+        for server, stats in pools.items():
+            in_use.add_metric([traffic, server], stats.in_use)
+    yield in_use
+
+
+register_scrape_collector(_collect_pool_gauges)
+
+
+class LuaScript:
+    """Server-side Lua script, invoked by SHA and only uploaded on a script-cache miss."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.sha = hashlib.sha1(source.encode()).hexdigest()
+
+    async def __call__(
+        self, client: Redis, keys: Sequence[str] = (), args: Sequence[Any] = ()
+    ) -> Any:
+        try:
+            return await cast(Awaitable[Any], client.evalsha(self.sha, len(keys), *keys, *args))
+        except NoScriptError:
+            return await cast(Awaitable[Any], client.eval(self.source, len(keys), *keys, *args))
@@ -0,0 +1,132 @@
+"""Lightweight span tracing tied to the request correlation id.
+
+``span(name, **attributes)`` opens a span nested under the current one (tracked in a
+context variable, so it follows the request through awaits and into tasks it spawns). The
+outermost span on a node is the local root: its trace id is the asgi-correlation-id of the
+request when there is one. When the root closes, the whole span tree is kept in memory and
+then exported as one structured log line if the trace was slow (``TRACE_SLOW_MS``) or falls
+in the random sample (``TRACE_SAMPLE_RATE``), so tail-latency outliers are always logged.
+Work that happens later on behalf of a request, like the broadcast after a save, starts its
+own root with the request's trace id so both lines can be joined in the log store.
+"""
+
+import random
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import structlog
+from asgi_correlation_id import correlation_id
+
+from app.core.config import settings
+
+logger = structlog.get_logger("app.tracing")
+
+
+class Span:
+    __slots__ = ("attributes", "end", "name", "parent", "span_id", "start", "trace")
+
+    def __init__(self, name: str, trace: "Trace", parent: "Span | None", attributes: dict):
+        self.name = name
+        self.trace = trace
+        self.parent = parent
+        self.span_id = uuid.uuid4().hex[:16]
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.end: float | None = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self, origin: float) -> dict[str, Any]:
+        end = self.end if self.end is not None else time.perf_counter()
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round((end - self.start) * 1000, 3),
+            **self.attributes,
+        }
+
+
+class Trace:
+    """Spans recorded on this node under one local root."""
+
+    __slots__ = ("spans", "trace_id")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: list[Span] = []
+
+
+class _NoopSpan:
+    trace_id = ""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def current_trace_id() -> str:
+    current = _current.get()
+    return current.trace_id if current else (correlation_id.get() or "")
+
+
+@contextmanager
+def span(
+    name: str, parent: Span | None = None, trace_id: str | None = None, **attributes: Any
+) -> Iterator[Span | _NoopSpan]:
+    """Record a span around the block. ``parent`` overrides the current span."""
+    if not settings.TRACING_ENABLED:
+        yield _NOOP
+        return
+
+    parent = parent or _current.get()
+    if parent is not None:
+        trace = parent.trace
+    else:
+        trace = Trace(trace_id or correlation_id.get() or uuid.uuid4().hex)
+    current = Span(name, trace, parent, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current.reset(token)
+        trace.spans.append(current)
+        if parent is None:
+            _maybe_export(current)
+
+
+def _maybe_export(root: Span) -> None:
+    assert root.end is not None
+    duration_ms = (root.end - root.start) * 1000
+    slow = duration_ms >= settings.TRACE_SLOW_MS
+    if not slow and random.random() >= settings.TRACE_SAMPLE_RATE:
+        return
+    logger.info(
+        "trace",
+        trace_id=root.trace_id,
+        root=root.name,
+        duration_ms=round(duration_ms, 3),
+        slow=slow,
+        spans=[s.to_dict(root.start) for s in root.trace.spans],
+    )
@@ -1,34 +1,139 @@
+import asyncio
+import contextlib
+import signal
+import threading
+import time
+from collections.abc import Callable
 from contextlib import asynccontextmanager
+from dataclasses import asdict
 
 from asgi_correlation_id import CorrelationIdMiddleware
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.api.routers import rooms, websocket
+from app.api.routers import matchmaking, rooms, websocket
 from app.api.routers.websocket import start_heartbeat_loop, stop_heartbeat_loop
 from app.core.config import settings
-from app.core.exceptions import GameLogicError
+from app.core.exceptions import GameLogicError, RoomUnavailableError
 from app.core.logging import logger
+from app.core.metrics import HTTP_REQUEST_DURATION, render_latest
 from app.core.redis import RedisClient
+from app.core.tracing import span
+from app.services.game_service import bot_scheduler, matchmaker, mutation_batcher
+from app.services.game_store import rebalance_rooms
+from app.services.room_ownership import room_ownership
+from app.services.websocket_manager import manager
+
+# Seconds the shutdown waits for queued broadcasts after the sockets have drained.
+BROADCAST_FLUSH_TIMEOUT = 2.0
+
+
+async def _rebalance_shards() -> None:
+    moved = await rebalance_rooms()
+    logger.info("Shard rebalance finished", rooms_moved=moved)
+
+
+def _drain_on_sigterm() -> Callable[[], None]:
+    """Drain the sockets on SIGTERM before passing the signal on to the server.
+
+    The server's handler stops accepting connections and closes the sockets at once, so it
+    only sees the signal once ``manager.drain`` has spread the sockets out over
+    ``SHUTDOWN_DRAIN_SECONDS``. Returns a function that puts the previous handler back.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None  # Signal handlers can only be set from the main thread
+
+    loop = asyncio.get_running_loop()
+    previous = signal.getsignal(signal.SIGTERM)
+    drain_tasks: list[asyncio.Task] = []
+
+    async def drain_then_exit() -> None:
+        await manager.drain(settings.SHUTDOWN_DRAIN_SECONDS)
+        logger.info("Sockets drained, shutting down")
+        signal.signal(signal.SIGTERM, previous)
+        signal.raise_signal(signal.SIGTERM)
+
+    def start_drain() -> None:
+        if not drain_tasks:
+            drain_tasks.append(asyncio.create_task(drain_then_exit()))
+
+    def on_sigterm(_signum: int, _frame: object) -> None:
+        loop.call_soon_threadsafe(start_drain)
+
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+    def restore() -> None:
+        if signal.getsignal(signal.SIGTERM) is on_sigterm:
+            signal.signal(signal.SIGTERM, previous)
+
+    return restore
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     logger.info("Starting up...")
-    await RedisClient.connect(settings.REDIS_URL)
+    await RedisClient.connect(
+        settings.REDIS_URL,
+        shard_urls=settings.REDIS_SHARD_URLS,
+        previous_shard_urls=settings.REDIS_PREVIOUS_SHARD_URLS,
+        cluster=settings.REDIS_CLUSTER,
+    )
     logger.info("Redis connected.")
+    if settings.ROOM_OWNERSHIP_ENABLED:
+        await room_ownership.start()
     start_heartbeat_loop()
+    bot_scheduler.start()
+    matchmaker.start()
+    restore_sigterm = _drain_on_sigterm()
+    # Rooms left on their pre-reshard shard are moved in the background; reads that hit
+    # one before then migrate it on the spot.
+    rebalance_task = (
+        asyncio.create_task(_rebalance_shards()) if settings.REDIS_PREVIOUS_SHARD_URLS else None
+    )
     try:
         yield
     finally:
         logger.info("Shutting down...")
+        restore_sigterm()
+        if rebalance_task is not None:
+            rebalance_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await rebalance_task
+        await matchmaker.stop()
+        await bot_scheduler.stop()
+        # Mutations still in flight are committed and their broadcasts sent before Redis goes.
+        await mutation_batcher.flush()
+        await manager.flush(BROADCAST_FLUSH_TIMEOUT)
         await stop_heartbeat_loop()
+        if settings.ROOM_OWNERSHIP_ENABLED:
+            await room_ownership.stop()
         await RedisClient.close()
 
 
+async def observe_request(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    with span("http.request", method=request.method) as root:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Label by route template, not raw path, to keep room ids out of the label set.
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            root.set(route=route, status=status)
+            HTTP_REQUEST_DURATION.labels(request.method, route, str(status)).observe(
+                time.perf_counter() - start
+            )
+
+
 app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
+# Added before the correlation middleware so it runs inside it and sees the request's id.
+app.add_middleware(BaseHTTPMiddleware, dispatch=observe_request)
+
 # Correlation ID must be the first middleware
 app.add_middleware(CorrelationIdMiddleware)
 
@@ -42,6 +147,7 @@ app.add_middleware(
 
 
 app.include_router(rooms.router, prefix="/api", tags=["rooms"])
+app.include_router(matchmaking.router, tags=["matchmaking"])
 app.include_router(websocket.router, tags=["websocket"])
 
 
@@ -50,6 +156,28 @@ async def game_logic_exception_handler(_request: Request, exc: GameLogicError) -
     return JSONResponse(status_code=400, content={"detail": str(exc)})
 
 
+@app.exception_handler(RoomUnavailableError)
+async def room_unavailable_exception_handler(
+    _request: Request, exc: RoomUnavailableError
+) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    payload, content_type = render_latest()
+    return Response(content=payload, media_type=content_type)
+
+
+@app.get("/api/redis/pools")
+async def redis_pool_stats() -> dict[str, dict[str, dict[str, float]]]:
+    """Connection checkout stats per traffic class and Redis server."""
+    return {
+        traffic: {server: asdict(stats) for server, stats in pools.items()}
+        for traffic, pools in RedisClient.pool_stats().items()
+    }
+
+
 @app.get("/api/version")
 async def version_info() -> dict[str, str]:
     return {"version": settings.VERSION, "commit_sha": settings.COMMIT_SHA}
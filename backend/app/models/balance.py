@@ -0,0 +1,139 @@
+"""Role balance lookup table and villager win prediction.
+
+``balance_table.json`` is generated offline by ``python -m app.sim.balance``. It holds the
+simulated best role distribution for each player count it covers, and the weights of a
+logistic model fitted on every distribution the pipeline played. ``auto_balance_roles``
+reads the first; ``predict_villager_win`` uses both. Neither needs NumPy.
+"""
+
+import json
+import logging
+import math
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from app.schemas.game import RoleType
+
+logger = logging.getLogger(__name__)
+
+BALANCE_TABLE_PATH = Path(__file__).with_name("balance_table.json")
+# Bump when the table layout or the features below change, and regenerate the table.
+BALANCE_TABLE_VERSION = 1
+
+SPECIAL_ROLES = (
+    RoleType.SEER,
+    RoleType.DOCTOR,
+    RoleType.CUPID,
+    RoleType.WITCH,
+    RoleType.TANNER,
+    RoleType.HUNTER,
+    RoleType.LYCAN,
+    RoleType.BODYGUARD,
+)
+FEATURES = (
+    "bias",
+    "inverse_players",
+    "wolf_share",
+    "wolf_share_squared",
+    *(role.value.lower() for role in SPECIAL_ROLES),
+    *(f"{role.value.lower()}_share" for role in SPECIAL_ROLES),
+)
+
+
+def balance_features(players: int, roles: dict[RoleType, int]) -> list[float]:
+    """Model inputs for a distribution of ``players`` seats, in ``FEATURES`` order."""
+    wolf_share = roles.get(RoleType.WEREWOLF, 0) / players
+    counts = [float(roles.get(role, 0)) for role in SPECIAL_ROLES]
+    return [
+        1.0,
+        1 / players,
+        wolf_share,
+        wolf_share * wolf_share,
+        *counts,
+        *(count / players for count in counts),
+    ]
+
+
+@dataclass(frozen=True)
+class BalanceEntry:
+    roles: dict[RoleType, int]  # Every role, villagers included, summing to the player count
+    villager_win: float
+    werewolf_win: float
+
+
+@dataclass(frozen=True)
+class BalancePrediction:
+    villager_win: float
+    source: str  # "table" for a simulated distribution, "model" otherwise
+
+
+class BalanceTable:
+    def __init__(self, data: dict[str, Any]):
+        self.version: int = data["version"]
+        self.entries = {
+            int(players): BalanceEntry(
+                roles={role: 0 for role in RoleType}
+                | {RoleType(role): count for role, count in entry["roles"].items()},
+                villager_win=entry["villager_win"],
+                werewolf_win=entry["werewolf_win"],
+            )
+            for players, entry in data["players"].items()
+        }
+        self.weights: list[float] = data["model"]["weights"]
+        if tuple(data["model"]["features"]) != FEATURES:
+            raise ValueError("balance model features do not match this release")
+
+    def roles_for(self, players: int) -> dict[RoleType, int] | None:
+        """The simulated best distribution for ``players``, or None outside the table."""
+        entry = self.entries.get(players)
+        return dict(entry.roles) if entry else None
+
+    def predict_villager_win(
+        self, players: int, role_distribution: dict[RoleType, int]
+    ) -> BalancePrediction:
+        roles = normalize_distribution(players, role_distribution)
+        entry = self.entries.get(players)
+        if entry and entry.roles == roles:
+            return BalancePrediction(entry.villager_win, "table")
+        logit = sum(
+            w * x for w, x in zip(self.weights, balance_features(players, roles), strict=True)
+        )
+        return BalancePrediction(1 / (1 + math.exp(-logit)), "model")
+
+
+def normalize_distribution(
+    players: int, role_distribution: dict[RoleType, int]
+) -> dict[RoleType, int]:
+    """Every role's count with villagers filling the remaining seats, as ``assign_roles``
+    deals them. Raises ValueError when the distribution cannot be dealt or played."""
+    roles = {role: 0 for role in RoleType}
+    for role, count in role_distribution.items():
+        if count < 0:
+            raise ValueError(f"Negative count for {role.value}")
+        if role not in (RoleType.VILLAGER, RoleType.SPECTATOR):
+            roles[role] = count
+    dealt = sum(roles.values())
+    if players < 3:
+        raise ValueError("At least 3 players are needed")
+    if dealt > players:
+        raise ValueError(f"{dealt} special roles do not fit {players} players")
+    if not 0 < roles[RoleType.WEREWOLF] < players - roles[RoleType.WEREWOLF]:
+        raise ValueError("Werewolves must be fewer than the other players")
+    roles[RoleType.VILLAGER] = players - dealt
+    return roles
+
+
+@cache
+def balance_table() -> BalanceTable | None:
+    """The shipped table, loaded once. None when it is missing or from another version, in
+    which case ``auto_balance_roles`` keeps its built-in thresholds."""
+    try:
+        data = json.loads(BALANCE_TABLE_PATH.read_text())
+        if data.get("version") != BALANCE_TABLE_VERSION:
+            raise ValueError(f"version {data.get('version')}, expected {BALANCE_TABLE_VERSION}")
+        return BalanceTable(data)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Balance table unavailable (%s); using built-in role thresholds", e)
+        return None
@@ -5,13 +5,18 @@ The Game class is the main domain object that holds game state.
 It uses Pydantic models internally for serialization to Redis.
 """
 
+import hashlib
 import logging
 import random
+import secrets
 import time
 from typing import Any
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
+from app.core.logging import sample_hot_path
+from app.core.metrics import GAME_SERIALIZATION, timed
+from app.models.balance import balance_table
 from app.models.phases import get_phase_state
 from app.models.roles import Role, RoleType, get_role_instance
 from app.schemas.game import GamePhase, GameSettingsSchema, GameStateSchema, PlayerSchema
@@ -19,6 +24,10 @@ from app.schemas.game import GamePhase, GameSettingsSchema, GameStateSchema, Pla
 logger = logging.getLogger(__name__)
 
 
+_FROM_JSON = GAME_SERIALIZATION.labels("from_json")
+_TO_JSON = GAME_SERIALIZATION.labels("to_json")
+
+
 class PlayerState(BaseModel):
     """Pydantic model for player state - used for persistence."""
 
@@ -27,6 +36,7 @@ class PlayerState(BaseModel):
     role: RoleType | None = None
     is_alive: bool = True
     is_admin: bool = False
+    is_bot: bool = False  # Played by the node's BotScheduler
 
     # Role specific state
     witch_has_heal: bool = True
@@ -68,6 +78,12 @@ class GameState(BaseModel):
     lovers: list[str] = []
     voted_out_this_round: str | None = None
     phase_start_time: float | None = None
+    # Every random decision is drawn from rng_seed and the number of draws so far, so the
+    # same mutations replayed on the same initial state give the same game. Never sent to
+    # clients: the seed determines the role deal. 53 bits, so the Lua scripts' cjson, which
+    # reads numbers as doubles, round-trips it exactly.
+    rng_seed: int = Field(default_factory=lambda: secrets.randbits(53))
+    rng_draws: int = 0
 
     model_config = ConfigDict(extra="ignore")
 
@@ -82,21 +98,49 @@ class Game:
 
     def __init__(self, state: GameState):
         self._state = state
+        # Lower-cased nickname -> player id, built on first lookup and kept up to date by
+        # add_player/remove_player.
+        self._nicknames: dict[str, str] | None = None
 
     @classmethod
-    def create(cls, room_id: str, settings: GameSettingsSchema | None = None) -> "Game":
-        """Create a new game with default state."""
-        return cls(GameState(room_id=room_id, settings=settings or GameSettingsSchema()))
+    def create(
+        cls, room_id: str, settings: GameSettingsSchema | None = None, seed: int | None = None
+    ) -> "Game":
+        """Create a new game with default state, and a random RNG seed unless given."""
+        state = GameState(room_id=room_id, settings=settings or GameSettingsSchema())
+        if seed is not None:
+            state.rng_seed = seed
+        return cls(state)
 
     @classmethod
     def from_json(cls, json_data: str | bytes) -> "Game":
         """Deserialize game from JSON (Redis)."""
-        state = GameState.model_validate_json(json_data)
+        with timed(_FROM_JSON):
+            state = GameState.model_validate_json(json_data)
         return cls(state)
 
     def to_json(self) -> str:
         """Serialize game to JSON (Redis)."""
-        return self._state.model_dump_json()
+        with timed(_TO_JSON):
+            return self._state.model_dump_json()
+
+    def copy(self) -> "Game":
+        """Independent deep copy, cheaper than a JSON round trip."""
+        game = Game(self._state.model_copy(deep=True))
+        if self._nicknames is not None:
+            game._nicknames = dict(self._nicknames)
+        return game
+
+    def digest(self) -> str:
+        """Hash of the state without wall-clock fields; equal games have equal digests."""
+        data = self._state.model_dump_json(exclude={"phase_start_time"})
+        return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+    def rng(self) -> random.Random:
+        """Generator for the game's next random decision, seeded from the room's seed and
+        a draw counter kept in the state."""
+        self._state.rng_draws += 1
+        return random.Random(f"{self._state.rng_seed}:{self._state.rng_draws}")
 
     def resolve_lovers_pact(self, dead_player_ids: set[str]) -> set[str]:
         """Check for Lovers Suicide Pact and return any additional deaths."""
@@ -126,6 +170,7 @@ class Game:
                 role=p.role,
                 is_alive=p.is_alive,
                 is_admin=p.is_admin,
+                is_bot=p.is_bot,
                 witch_has_heal=p.witch_has_heal,
                 witch_has_poison=p.witch_has_poison,
                 hunter_revenge_target=p.hunter_revenge_target,
@@ -152,7 +197,11 @@ class Game:
         )
 
     # ===== View Logic =====
-    def get_view_for_player(self, viewer_id: str) -> GameStateSchema:
+    def get_spectator_view(self) -> GameStateSchema:
+        """The public view shared by everyone watching the room from outside the game."""
+        return self.get_view_for_player("", spectating=True)
+
+    def get_view_for_player(self, viewer_id: str, spectating: bool = False) -> GameStateSchema:
         """
         Create a filtered view of the game state for a specific player.
         Hides roles and actions based on game rules.
@@ -161,7 +210,9 @@ class Game:
         is_game_over = full_schema.phase == GamePhase.GAME_OVER
 
         viewer = self.players.get(viewer_id)
-        is_spectator = viewer and (viewer.role == RoleType.SPECTATOR or not viewer.is_alive)
+        is_spectator = spectating or (
+            viewer and (viewer.role == RoleType.SPECTATOR or not viewer.is_alive)
+        )
 
         # Viewer specific context
         revealed_to_viewer = set()
@@ -237,6 +288,7 @@ class Game:
                 role=role_to_show,
                 is_alive=p.is_alive,
                 is_admin=p.is_admin,
+                is_bot=p.is_bot,
                 is_spectator=p.role == RoleType.SPECTATOR,
                 # is_online is merged later by service layer
                 is_online=True,
@@ -270,9 +322,19 @@ class Game:
         return full_schema
 
     def auto_balance_roles(self):
-        """Automatically set default role distribution based on player count."""
+        """Automatically set default role distribution based on player count.
+
+        Player counts in the shipped balance table get its simulated distribution; others
+        fall back to the progressive thresholds below.
+        """
         active_players = len([p for p in self.players.values() if p.role != RoleType.SPECTATOR])
 
+        table = balance_table()
+        simulated = table.roles_for(active_players) if table else None
+        if simulated is not None:
+            self.settings.role_distribution = simulated
+            return
+
         # Base config: 1 Wolf, 1 Seer, rest Villagers
         defaults = {
             RoleType.WEREWOLF: 1,
@@ -374,7 +436,18 @@ class Game:
         self._state.voted_out_this_round = value
 
     # ===== Game logic methods =====
-    def add_player(self, player_id: str, nickname: str, is_admin: bool = False):
+    def nickname_owner(self, nickname: str) -> str | None:
+        """Id of the player using ``nickname``, compared case-insensitively."""
+        if self._nicknames is None:
+            self._nicknames = {p.nickname.lower(): pid for pid, p in self.players.items()}
+        return self._nicknames.get(nickname.lower())
+
+    def add_player(
+        self, player_id: str, nickname: str, is_admin: bool = False, is_bot: bool = False
+    ):
+        if self._nicknames is not None:
+            self._forget_nickname(player_id)
+            self._nicknames[nickname.lower()] = player_id
         if self.phase != GamePhase.WAITING:
             self._state.players[player_id] = PlayerState(
                 id=player_id,
@@ -385,12 +458,20 @@ class Game:
             return
 
         self._state.players[player_id] = PlayerState(
-            id=player_id, nickname=nickname, is_admin=is_admin
+            id=player_id, nickname=nickname, is_admin=is_admin, is_bot=is_bot
         )
 
     def remove_player(self, player_id: str):
+        if self._nicknames is not None:
+            self._forget_nickname(player_id)
         self._state.players.pop(player_id, None)
 
+    def _forget_nickname(self, player_id: str) -> None:
+        assert self._nicknames is not None
+        player = self.players.get(player_id)
+        if player is not None and self._nicknames.get(player.nickname.lower()) == player_id:
+            del self._nicknames[player.nickname.lower()]
+
     def start_game(self):
         """Start the game by assigning roles and transitioning to night."""
         self.assign_roles()
@@ -414,7 +495,7 @@ class Game:
             roles_to_assign.remove(RoleType.VILLAGER)
         roles_to_assign = roles_to_assign[: len(player_ids)]
 
-        random.shuffle(roles_to_assign)
+        self.rng().shuffle(roles_to_assign)
 
         for i, pid in enumerate(player_ids):
             player = self._state.players[pid]
@@ -446,15 +527,24 @@ class Game:
         """Check if current phase is complete and advance if so."""
         state = get_phase_state(self.phase)
         is_complete = state.check_completion(self)
-        logger.info(f"Phase {self.phase}: check_completion={is_complete}")
-
-        if self.phase == GamePhase.NIGHT:
-            for pid, player in self.players.items():
-                if player.is_alive and player.can_act_at_night():
-                    logger.info(
-                        f"  Player {pid} ({player.role}): "
-                        f"night_action_target={player.night_action_target}"
-                    )
+
+        # Runs after every action; sampled so busy nights don't log once per player.
+        if sample_hot_path(logger):
+            night_targets = (
+                {
+                    pid: player.night_action_target
+                    for pid, player in self.players.items()
+                    if player.is_alive and player.can_act_at_night()
+                }
+                if self.phase == GamePhase.NIGHT
+                else None
+            )
+            logger.info(
+                "Phase %s: check_completion=%s night_targets=%s",
+                self.phase,
+                is_complete,
+                night_targets,
+            )
 
         if is_complete:
             next_phase = state.resolve(self)
@@ -1,6 +1,6 @@
 from enum import Enum
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class RoleType(str, Enum):
@@ -51,6 +51,7 @@ class PlayerSchema(BaseModel):
     role_description: str | None = None  # UI-ready description
     is_alive: bool = True
     is_admin: bool = False
+    is_bot: bool = False
     is_spectator: bool = False
     is_online: bool = True
 
@@ -136,3 +137,44 @@ class PlayerIdRequest(BaseModel):
 class KickPlayerRequest(BaseModel):
     player_id: str
     target_id: str
+
+
+class AddBotsRequest(BaseModel):
+    player_id: str
+    count: int = Field(default=1, ge=1, le=20)
+
+
+class BalancePredictionRequest(BaseModel):
+    role_distribution: dict[RoleType, int]
+    players: int | None = None  # Defaults to the distribution's total; villagers fill the rest
+
+
+class BalancePredictionResponse(BaseModel):
+    players: int
+    villager_win: float
+    source: str  # "table" for a simulated distribution, "model" otherwise
+
+
+class LobbyRoomSchema(BaseModel):
+    room_id: str
+    player_count: int
+    host: str | None = None  # The admin's nickname
+    updated_at: float  # Unix time of the room's last change while open
+
+
+class LobbyPageSchema(BaseModel):
+    rooms: list[LobbyRoomSchema]
+    total: int  # Open rooms in the index, for paging
+    offset: int
+    limit: int
+
+
+class MatchmakingRequest(BaseModel):
+    nickname: str
+    player_id: str | None = None
+
+
+class MatchmakingTicketSchema(BaseModel):
+    player_id: str
+    position: int
+    queued: int
@@ -12,8 +12,12 @@ class MessageType(str, Enum):
     CHAT = "CHAT"
     PLAYER_DISCONNECTED = "PLAYER_DISCONNECTED"
     PLAYER_RECONNECTED = "PLAYER_RECONNECTED"
+    PRESENCE_DIGEST = "PRESENCE_DIGEST"
+    RECONNECT = "RECONNECT"
     PING = "PING"
     PONG = "PONG"
+    QUEUE_STATUS = "QUEUE_STATUS"
+    MATCH_FOUND = "MATCH_FOUND"
 
 
 class ErrorPayload(BaseModel):
@@ -32,13 +36,36 @@ class PresencePayload(BaseModel):
     nickname: str
 
 
+class PresenceDigestPayload(BaseModel):
+    reconnected: list[PresencePayload]
+
+
+class ReconnectPayload(BaseModel):
+    delay_ms: int
+
+
+class QueueStatusPayload(BaseModel):
+    position: int  # 0 = next to be placed
+    queued: int
+    eta_seconds: float | None = None  # From the recent matching rate; None until known
+
+
+class MatchFoundPayload(BaseModel):
+    room_id: str
+
+
 class WSBaseMessage(BaseModel):
     room_id: str | None = None
+    # Position in the room's event stream, stamped on room events when they are published.
+    seq: int | None = None
 
 
 class StateUpdateMessage(WSBaseMessage):
     type: Literal[MessageType.STATE_UPDATE] = MessageType.STATE_UPDATE
     payload: GameStateSchema
+    # Version of the state, and on the handshake also the seq of the room's latest event, so
+    # a client can resume from both after reconnecting.
+    version: int | None = None
 
 
 class ErrorMessage(WSBaseMessage):
@@ -58,6 +85,20 @@ class PresenceMessage(WSBaseMessage):
     payload: PresencePayload
 
 
+class PresenceDigestMessage(WSBaseMessage):
+    """Players that reconnected to the room within one digest window."""
+
+    type: Literal[MessageType.PRESENCE_DIGEST] = MessageType.PRESENCE_DIGEST
+    payload: PresenceDigestPayload
+
+
+class ReconnectMessage(WSBaseMessage):
+    """Sent while the node drains: reconnect (to another node) after ``delay_ms``."""
+
+    type: Literal[MessageType.RECONNECT] = MessageType.RECONNECT
+    payload: ReconnectPayload
+
+
 class PingMessage(WSBaseMessage):
     type: Literal[MessageType.PING] = MessageType.PING
 
@@ -66,9 +107,32 @@ class PongMessage(WSBaseMessage):
     type: Literal[MessageType.PONG] = MessageType.PONG
 
 
+class QueueStatusMessage(WSBaseMessage):
+    """Sent to a player waiting in the quick-play queue each matchmaker tick."""
+
+    type: Literal[MessageType.QUEUE_STATUS] = MessageType.QUEUE_STATUS
+    payload: QueueStatusPayload
+
+
+class MatchFoundMessage(WSBaseMessage):
+    """The player has been placed in ``payload.room_id``; the socket is closed after it."""
+
+    type: Literal[MessageType.MATCH_FOUND] = MessageType.MATCH_FOUND
+    payload: MatchFoundPayload
+
+
 # Discriminated union for all socket messages
 SocketMessage = (
-    StateUpdateMessage | ErrorMessage | ChatMessage | PresenceMessage | PingMessage | PongMessage
+    StateUpdateMessage
+    | ErrorMessage
+    | ChatMessage
+    | PresenceMessage
+    | PresenceDigestMessage
+    | ReconnectMessage
+    | PingMessage
+    | PongMessage
+    | QueueStatusMessage
+    | MatchFoundMessage
 )
 
 
@@ -0,0 +1,40 @@
+"""Opt-in recording of every room's mutations, for replay with ``app.sim.replay``.
+
+With ``ACTION_LOG_ENABLED`` each room created on a node logs its initial state, and every
+mutation applied to any room logs its name, arguments and outcome, plus the state digest
+after it when accepted. Games are deterministic given those (see ``GameState.rng_seed``),
+so the JSON log lines of a room are enough to rebuild it exactly. Nothing is written to
+Redis; the log store keeps the trace.
+"""
+
+from typing import Any
+
+import structlog
+
+from app.core.config import settings
+from app.models.game import Game
+
+logger = structlog.get_logger("app.action_log")
+
+ROOM_CREATED = "room_created"
+ROOM_MUTATION = "room_mutation"
+
+
+def record_created(game: Game) -> None:
+    if settings.ACTION_LOG_ENABLED:
+        logger.info(ROOM_CREATED, room_id=game.room_id, state=game.to_json())
+
+
+def record_mutation(game: Game, op: str, args: dict[str, Any], error: Exception | None) -> None:
+    """Log a mutation of ``game``; ``error`` is what rejected it, if it was rejected."""
+    if not settings.ACTION_LOG_ENABLED:
+        return
+    logger.info(
+        ROOM_MUTATION,
+        room_id=game.room_id,
+        op=op,
+        args=args,
+        accepted=error is None,
+        error=str(error) if error else None,
+        digest=game.digest() if error is None else None,
+    )
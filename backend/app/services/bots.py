@@ -0,0 +1,231 @@
+"""Server-side bot players.
+
+Bots are ordinary players flagged ``is_bot`` and never hold a socket. Each node runs one
+``BotScheduler``: a single loop over a heap of due moves rather than a task per bot. Every
+state ``GameService`` commits on this node is shown to the scheduler. It then plans a move,
+after a random think delay, for each bot that has something to do in the new phase. Moves
+are chosen by the simulator's ``HeuristicPolicy`` and submitted through ``GameService``
+like a human's, so they take the same batching, locking and broadcast path.
+
+At most ``BOT_MAX_CONCURRENT_MOVES`` moves are in flight per node. A node full of
+bot-filled rooms then queues its bots behind each other, not in front of human requests.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import logging
+import random
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from app.core.config import settings
+from app.core.exceptions import GameLogicError, RoomUnavailableError
+from app.core.metrics import BOT_MOVE_LAG, BOT_MOVES
+from app.models.game import Game, GameState, PlayerState
+from app.schemas.game import (
+    GamePhase,
+    GameStateSchema,
+    NightActionType,
+    PlayerSchema,
+    RoleType,
+)
+from app.sim.policies import HeuristicPolicy
+
+if TYPE_CHECKING:
+    from app.services.game_service import GameService
+
+logger = logging.getLogger(__name__)
+
+_PLAYING = (GamePhase.NIGHT, GamePhase.DAY, GamePhase.HUNTER_REVENGE)
+
+
+@dataclass(order=True)
+class BotMove:
+    due: float  # time.monotonic() at which the bot acts
+    room_id: str = field(compare=False)
+    player_id: str = field(compare=False)
+    turn: tuple[GamePhase, int] = field(compare=False)  # Phase and turn it was planned for
+
+
+class BotPolicy(HeuristicPolicy):
+    """``HeuristicPolicy`` that follows the human werewolves' victim, since the pack only
+    kills on consensus."""
+
+    def victim(self, game: Game, wolf: PlayerState) -> str | None:
+        return _human_pack_target(game.players.values()) or super().victim(game, wolf)
+
+
+@dataclass
+class _BotRoom:
+    state: GameStateSchema
+    policy: BotPolicy
+    game: Game | None = None  # Built from ``state`` on the first move that needs it
+
+
+class BotScheduler:
+    def __init__(self, service: Callable[[], "GameService"]):
+        self._service = service
+        self._rooms: dict[str, _BotRoom] = {}
+        self._moves: list[BotMove] = []
+        self._planned: set[tuple[str, str, GamePhase, int]] = set()
+        self._playing: set[asyncio.Task] = set()
+        self._task: asyncio.Task | None = None
+        # Bound to the running loop in start().
+        self._wake: asyncio.Event | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._playing)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._wake = asyncio.Event()
+            self._slots = asyncio.Semaphore(settings.BOT_MAX_CONCURRENT_MOVES)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop planning and wait for the moves already being submitted."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._playing:
+            await asyncio.gather(*self._playing, return_exceptions=True)
+        self._rooms.clear()
+        self._moves.clear()
+        self._planned.clear()
+
+    def observe(self, state: GameStateSchema) -> None:
+        """Plan moves for the bots of a room that was just committed."""
+        if not self.running:
+            return
+        bots = [p.id for p in state.players.values() if p.is_bot]
+        if not bots or state.phase not in _PLAYING:
+            self._forget(state.room_id)
+            return
+
+        room = self._rooms.get(state.room_id)
+        if room is None:
+            room = self._rooms[state.room_id] = _BotRoom(state, BotPolicy(random.Random()))
+        room.state, room.game = state, None
+
+        now = time.monotonic()
+        earliest = self._moves[0].due if self._moves else None
+        for player_id in bots:
+            key = (state.room_id, player_id, state.phase, state.turn_count)
+            if key in self._planned or not _has_move(state, state.players[player_id]):
+                continue
+            self._planned.add(key)
+            delay = random.uniform(settings.BOT_THINK_MIN_SECONDS, settings.BOT_THINK_MAX_SECONDS)
+            move = BotMove(now + delay, state.room_id, player_id, (state.phase, state.turn_count))
+            heapq.heappush(self._moves, move)
+        if self._wake and self._moves and (earliest is None or self._moves[0].due < earliest):
+            self._wake.set()
+
+    def _forget(self, room_id: str) -> None:
+        if self._rooms.pop(room_id, None) is not None:
+            # Their moves stay in the heap and are dropped as stale when they come due.
+            self._planned = {key for key in self._planned if key[0] != room_id}
+
+    async def _run(self) -> None:
+        assert self._wake is not None and self._slots is not None
+        while True:
+            self._wake.clear()
+            timeout = self._moves[0].due - time.monotonic() if self._moves else None
+            if timeout is None or timeout > 0:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                continue
+
+            move = heapq.heappop(self._moves)
+            await self._slots.acquire()
+            task = asyncio.create_task(self._play(move))
+            self._playing.add(task)
+            task.add_done_callback(self._playing.discard)
+
+    async def _play(self, move: BotMove) -> None:
+        assert self._slots is not None
+        try:
+            BOT_MOVE_LAG.observe(time.monotonic() - move.due)
+            outcome = await self._submit(move)
+        except (ValueError, GameLogicError, RoomUnavailableError) as e:
+            logger.info(f"Bot {move.player_id} in room {move.room_id} was refused: {e}")
+            outcome = "rejected"
+        except Exception:
+            logger.exception(f"Bot {move.player_id} in room {move.room_id} failed to move")
+            outcome = "failed"
+        finally:
+            self._slots.release()
+            # A refused bot is planned again on the room's next commit.
+            self._planned.discard((move.room_id, move.player_id, *move.turn))
+        BOT_MOVES.labels(outcome).inc()
+
+    async def _submit(self, move: BotMove) -> str:
+        room = self._rooms.get(move.room_id)
+        if room is None or (room.state.phase, room.state.turn_count) != move.turn:
+            return "stale"
+        if room.game is None:
+            room.game = Game(GameState.model_validate(room.state.model_dump()))
+        game, policy = room.game, room.policy
+        player = game.players.get(move.player_id)
+        if player is None or not _has_move(room.state, player):
+            return "stale"
+
+        service = self._service()
+        if game.phase == GamePhase.NIGHT:
+            action = policy.night_action(game, player)
+            if action is None:
+                return "stale"
+            await service.submit_action(
+                move.room_id, player.id, action["action_type"], action["target_id"] or "SKIP"
+            )
+        elif game.phase == GamePhase.DAY:
+            target = policy.choose_vote(game, player)
+            if target is None:
+                return "stale"
+            await service.submit_vote(move.room_id, player.id, target)
+        else:
+            target = policy.choose_revenge(game, player)
+            if target is None:
+                return "stale"
+            await service.submit_action(
+                move.room_id, player.id, NightActionType.REVENGE.value, target
+            )
+        return "played"
+
+
+def _has_move(state: GameStateSchema, player: PlayerSchema | PlayerState) -> bool:
+    """Whether ``player`` still has to act in ``state``'s phase."""
+    if state.phase == GamePhase.HUNTER_REVENGE:
+        return state.voted_out_this_round == player.id
+    if not player.is_alive:
+        return False
+    if state.phase == GamePhase.NIGHT:
+        if player.role == RoleType.WEREWOLF:
+            lead = _human_pack_target(state.players.values())
+            if lead is not None:
+                return player.night_action_target != lead  # Re-vote to join the pack
+        return player.night_action_target is None
+    return state.phase == GamePhase.DAY and player.vote_target is None
+
+
+def _human_pack_target(players: Iterable[PlayerSchema | PlayerState]) -> str | None:
+    """The victim chosen by the first living human werewolf that has chosen, if any."""
+    return next(
+        (
+            p.night_action_target
+            for p in players
+            if p.role == RoleType.WEREWOLF and p.is_alive and not p.is_bot
+            if p.night_action_target is not None
+        ),
+        None,
+    )
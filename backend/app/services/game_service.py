@@ -1,27 +1,45 @@
+import itertools
 import logging
+import time
 import uuid
+from typing import Any
 
-from app.core.redis import RedisClient
+from app.core.config import settings as app_settings
+from app.core.keys import lock_key, presence_key
+from app.core.metrics import LOCK_WAIT, track_tasks
+from app.core.redis import RedisClient, TrafficClass
+from app.core.tracing import span
 from app.models.game import Game
 from app.schemas.game import (
-    GamePhase,
     GameSettingsSchema,
     GameStateSchema,
 )
+from app.services.action_log import record_created
+from app.services.bots import BotScheduler
+from app.services.game_store import load_game_state, save_and_publish
+from app.services.lobby import LOBBY_OPS, update_listing
+from app.services.matchmaking import Matchmaker
+from app.services.mutation_batcher import MutationBatcher, PendingMutation, apply_batch
+from app.services.room_ownership import room_ownership
 
 logger = logging.getLogger(__name__)
 
 
 class GameService:
-    async def _save_game(self, game: Game):
-        redis = RedisClient.get_client()
-        key = f"game:{game.room_id}"
-        await redis.set(key, game.to_json(), ex=3600)  # Expire in 1 hour
+    async def _save_game(self, game: Game) -> int:
+        """Persist the game and publish ROOM_CHANGED in one round trip; returns the version."""
+        redis = RedisClient.for_room(game.room_id)
+        with span("room.save", players=len(game.players), phase=game.phase.value) as save_span:
+            state = game.to_json()
+            version = await save_and_publish(redis, game.room_id, state)
+            save_span.set(bytes=len(state), version=version)
+        return version
 
     async def get_game(self, room_id: str) -> Game | None:
-        redis = RedisClient.get_client()
-        key = f"game:{room_id}"
-        data = await redis.get(key)
+        if app_settings.ROOM_OWNERSHIP_ENABLED and (game := room_ownership.local_game(room_id)):
+            return game
+
+        data = await load_game_state(room_id)
         if not data:
             return None
         return Game.from_json(data)
@@ -31,12 +49,24 @@ class GameService:
         if not player_ids:
             return {}
 
-        redis = RedisClient.get_client()
-        presence_keys = [f"presence:{room_id}:{pid}" for pid in player_ids]
+        redis = RedisClient.for_room(room_id, TrafficClass.PRESENCE)
+        presence_keys = [presence_key(room_id, pid) for pid in player_ids]
         presence_results = await redis.mget(presence_keys)
 
         return {pid: presence_results[i] is not None for i, pid in enumerate(player_ids)}
 
+    async def get_spectator_view(
+        self, game: Game, presence_map: dict[str, bool], delay: float = 0.0
+    ) -> GameStateSchema:
+        """The room's public view, for spectators seeing it ``delay`` seconds late."""
+        view = game.get_spectator_view()
+        for pid, player in view.players.items():
+            player.is_online = presence_map.get(pid, False) or player.is_bot
+        if view.phase_start_time is not None:
+            # Their phase timer runs as late as the view does.
+            view.phase_start_time += delay
+        return view
+
     async def get_player_view(
         self, game: Game, player_id: str, presence_map: dict[str, bool] | None = None
     ) -> GameStateSchema:
@@ -51,20 +81,22 @@ class GameService:
 
         if presence_map is None:
             # Check presence in Redis for all players
-            redis = RedisClient.get_client()
-            presence_keys = [f"presence:{game.room_id}:{pid}" for pid in player_ids]
+            redis = RedisClient.for_room(game.room_id, TrafficClass.PRESENCE)
+            presence_keys = [presence_key(game.room_id, pid) for pid in player_ids]
             presence_results = await redis.mget(presence_keys)
 
             # Update is_online status
             for i, pid in enumerate(player_ids):
                 is_online = presence_results[i] is not None
                 if pid in view.players:
-                    view.players[pid].is_online = is_online
+                    view.players[pid].is_online = is_online or view.players[pid].is_bot
         else:
             # Use provided presence map
             for pid in player_ids:
                 if pid in view.players:
-                    view.players[pid].is_online = presence_map.get(pid, False)
+                    view.players[pid].is_online = (
+                        presence_map.get(pid, False) or view.players[pid].is_bot
+                    )
 
         return view
 
@@ -73,71 +105,111 @@ class GameService:
         game = Game.create(room_id, settings)
         game.auto_balance_roles()
         await self._save_game(game)
-        return game.to_schema()
+        record_created(game)
+        state = game.to_schema()
+        await update_listing(state)
+        return state
+
+    async def create_matched_room(self, players: list[tuple[str, str]]) -> GameStateSchema:
+        """Create a room already holding ``players`` (id, nickname), the first as admin, with
+        auto-balanced roles. One write, instead of a locked join per player."""
+        game = Game.create(str(uuid.uuid4())[:8])
+        for i, (player_id, nickname) in enumerate(players):
+            name = nickname
+            for n in itertools.count(2):
+                if game.nickname_owner(name) is None:
+                    break
+                name = f"{nickname} {n}"
+            game.add_player(player_id, name, is_admin=i == 0)
+        game.auto_balance_roles()
+        await self._save_game(game)
+        record_created(game)
+        state = game.to_schema()
+        await update_listing(state)
+        return state
+
+    async def _execute(self, room_id: str, op: str, **args: Any) -> GameStateSchema | None:
+        """Apply a named mutation to the room and persist it.
+
+        Returns None when the room does not exist. With room ownership enabled the mutation
+        runs on the node that leases the room; otherwise it is group-committed here under
+        the Redis lock together with any other mutations queued for the room.
+        """
+        if app_settings.ROOM_OWNERSHIP_ENABLED:
+            return await room_ownership.execute(room_id, op, args)
+        return await mutation_batcher.submit(room_id, op, args)
+
+    async def _after_commit(self, state: GameStateSchema, ops: list[str]) -> None:
+        """Once per committed batch, however many callers it answers: show the state to
+        the bot scheduler and, after mutations in ``LOBBY_OPS``, refresh the lobby listing."""
+        bot_scheduler.observe(state)
+        if LOBBY_OPS.isdisjoint(ops):
+            return
+        try:
+            await update_listing(state)
+        except Exception:
+            # The mutations are saved; the listing catches up on the room's next change.
+            logger.exception(f"Could not refresh the lobby listing of room {state.room_id}")
+
+    async def _commit_batch(self, room_id: str, batch: list[PendingMutation]) -> None:
+        """Load the room once, apply every queued mutation, save once."""
+        redis = RedisClient.for_room(room_id, TrafficClass.LOCKS)
+        with span("room.commit", parent=batch[0].span, room_id=room_id, batch_size=len(batch)):
+            start = time.perf_counter()
+            with span("room.lock"):
+                lock = redis.lock(lock_key(room_id), timeout=5)
+                await lock.acquire()
+            LOCK_WAIT.observe(time.perf_counter() - start)
+            try:
+                with span("room.load") as load_span:
+                    data = await load_game_state(room_id)
+                    load_span.set(bytes=len(data or ""))
+                if not data:
+                    for mutation in batch:
+                        mutation.future.set_result(None)
+                    return
+
+                game, applied = apply_batch(Game.from_json(data), batch)
+                if not applied:
+                    return
+                await self._save_game(game)
+            finally:
+                await lock.release()
+
+        state = game.to_schema()
+        await self._after_commit(state, [mutation.op for mutation in applied])
+        for mutation in applied:
+            mutation.future.set_result(state)
 
     async def join_room(
         self, room_id: str, nickname: str, player_id: str | None = None
     ) -> GameStateSchema | None:
-        async with RedisClient.get_client().lock(f"game:{room_id}:lock", timeout=5):
-            game = await self.get_game(room_id)
-            if not game:
-                return None
-
-            # Check for duplicate nickname
-            for p in game.players.values():
-                if p.nickname.lower() == nickname.lower():
-                    raise ValueError("Nickname already taken")
-
-            pid = player_id or str(uuid.uuid4())
-            is_admin = len(game.players) == 0
-            game.add_player(pid, nickname, is_admin)
+        pid = player_id or str(uuid.uuid4())
+        return await self._execute(room_id, "join", player_id=pid, nickname=nickname)
 
-            if game.phase == GamePhase.WAITING:
-                game.auto_balance_roles()
-
-            await self._save_game(game)
-            return game.to_schema()
+    async def add_bots(self, room_id: str, player_id: str, count: int) -> GameStateSchema | None:
+        bot_ids = [f"bot-{uuid.uuid4().hex[:12]}" for _ in range(count)]
+        return await self._execute(room_id, "add_bots", player_id=player_id, bot_ids=bot_ids)
 
     async def update_settings(
         self, room_id: str, player_id: str, settings: GameSettingsSchema
     ) -> GameStateSchema | None:
-        async with RedisClient.get_client().lock(f"game:{room_id}:lock", timeout=5):
-            game = await self.get_game(room_id)
-            if not game:
-                return None
-
-            player = game.players.get(player_id)
-            if not player or not player.is_admin:
-                raise ValueError("Only admin can update settings")
-
-            game.settings = settings
-            await self._save_game(game)
-            return game.to_schema()
+        return await self._execute(
+            room_id,
+            "update_settings",
+            player_id=player_id,
+            settings=settings.model_dump(mode="json"),
+        )
 
     async def start_game(
         self, room_id: str, player_id: str, settings: GameSettingsSchema | None = None
     ) -> GameStateSchema | None:
-        async with RedisClient.get_client().lock(f"game:{room_id}:lock", timeout=5):
-            game = await self.get_game(room_id)
-            if not game:
-                return None
-
-            player = game.players.get(player_id)
-            if not player or not player.is_admin:
-                raise ValueError("Only admin can start the game")
-
-            if settings:
-                game.settings = settings
-
-            total_roles = sum(game.settings.role_distribution.values())
-            if total_roles != len(game.players):
-                raise ValueError(
-                    f"Role count ({total_roles}) must match player count ({len(game.players)})"
-                )
-
-            game.start_game()
-            await self._save_game(game)
-            return game.to_schema()
+        return await self._execute(
+            room_id,
+            "start_game",
+            player_id=player_id,
+            settings=settings.model_dump(mode="json") if settings else None,
+        )
 
     async def submit_action(
         self,
@@ -148,95 +220,41 @@ class GameService:
         confirmed: bool = True,
     ) -> GameStateSchema | None:
         """Submit a night action (KILL, SAVE, CHECK)."""
-        async with RedisClient.get_client().lock(f"game:{room_id}:lock", timeout=5):
-            game = await self.get_game(room_id)
-            if not game:
-                return None
-
-            if not target_id:
-                raise ValueError("Action requires a target")
-
-            game.process_action(
-                player_id,
-                {"action_type": action_type, "target_id": target_id, "confirmed": confirmed},
-            )
-            game.check_and_advance()
-
-            await self._save_game(game)
-            return game.to_schema()
+        return await self._execute(
+            room_id,
+            "submit_action",
+            player_id=player_id,
+            action_type=action_type,
+            target_id=target_id,
+            confirmed=confirmed,
+        )
 
     async def submit_vote(
         self, room_id: str, player_id: str, target_id: str
     ) -> GameStateSchema | None:
         """Submit a day vote."""
-        async with RedisClient.get_client().lock(f"game:{room_id}:lock", timeout=5):
-            game = await self.get_game(room_id)
-            if not game:
-                return None
-
-            if game.phase != GamePhase.DAY:
-                raise ValueError("Can only vote during day phase")
-
-            game.process_action(player_id, {"target_id": target_id})
-            game.check_and_advance()
-
-            await self._save_game(game)
-            return game.to_schema()
+        return await self._execute(room_id, "submit_vote", player_id=player_id, target_id=target_id)
 
     async def end_game(self, room_id: str, player_id: str) -> GameStateSchema | None:
-        game = await self.get_game(room_id)
-        if not game:
-            return None
-
-        player = game.players.get(player_id)
-        if not player or not player.is_admin:
-            raise ValueError("Only admin can end the game")
-
-        game.winners = "CANCELLED"
-        game.transition_to(GamePhase.GAME_OVER)
-        await self._save_game(game)
-        return game.to_schema()
+        return await self._execute(room_id, "end_game", player_id=player_id)
 
     async def kick_player(
         self, room_id: str, player_id: str, target_id: str
     ) -> GameStateSchema | None:
-        async with RedisClient.get_client().lock(f"game:{room_id}:lock", timeout=5):
-            game = await self.get_game(room_id)
-            if not game:
-                return None
-
-            player = game.players.get(player_id)
-            if not player or not player.is_admin:
-                raise ValueError("Only admin can kick players")
-
-            if game.phase not in [GamePhase.WAITING, GamePhase.GAME_OVER]:
-                raise ValueError("Cannot kick players while game is in progress")
-
-            if target_id not in game.players:
-                raise ValueError("Player not found")
+        return await self._execute(room_id, "kick_player", player_id=player_id, target_id=target_id)
 
-            if target_id == player_id:
-                raise ValueError("Cannot kick yourself")
+    async def restart_game(self, room_id: str, player_id: str) -> GameStateSchema | None:
+        return await self._execute(room_id, "restart_game", player_id=player_id)
 
-            game.remove_player(target_id)
-            if game.phase == GamePhase.WAITING:
-                game.auto_balance_roles()
-            await self._save_game(game)
-            return game.to_schema()
 
-    async def restart_game(self, room_id: str, player_id: str) -> GameStateSchema | None:
-        async with RedisClient.get_client().lock(f"game:{room_id}:lock", timeout=5):
-            game = await self.get_game(room_id)
-            if not game:
-                return None
-
-            player = game.players.get(player_id)
-            if not player or not player.is_admin:
-                raise ValueError("Only admin can restart the game")
-
-            game.restart()
-            await self._save_game(game)
-            return game.to_schema()
+mutation_batcher = MutationBatcher(
+    lambda room_id, batch: GameService()._commit_batch(room_id, batch)
+)
+track_tasks("mutation_drainers", lambda: mutation_batcher.in_flight)
+bot_scheduler = BotScheduler(lambda: GameService())
+track_tasks("bot_moves", lambda: bot_scheduler.in_flight)
+matchmaker = Matchmaker(lambda: GameService())
+room_ownership.on_commit = lambda state, ops: GameService()._after_commit(state, ops)
 
 
 # Dependency for FastAPI
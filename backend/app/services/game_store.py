@@ -0,0 +1,267 @@
+"""Persistence of room state with an atomic change notification (outbox).
+
+Saving a room writes the state, bumps its version, refreshes both TTLs and publishes a
+``ROOM_CHANGED`` event on the room's internal changes channel inside one Lua script, so the stored
+state and the notification can never diverge and a save costs a single round trip.
+"""
+
+import logging
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.exceptions import RoomUnavailableError
+from app.core.keys import (
+    event_seq_key,
+    events_key,
+    game_key,
+    legacy_game_key,
+    legacy_moved_key,
+    legacy_version_key,
+    moved_key,
+    owner_key,
+    presence_key,
+    room_changes_channel,
+    room_channel,
+    room_id_from_tagged,
+    version_key,
+)
+from app.core.redis import LuaScript, RedisClient, TrafficClass
+from app.core.tracing import current_trace_id
+
+logger = logging.getLogger(__name__)
+
+# KEYS: game, version, owner lease, moved marker.
+# ARGV: state, ttl, channel, fencing node id ('' = none), trace id ('' = none).
+# Returns the new version, 0 when fenced out by the lease, -1 when the room has been moved
+# to another shard. The event is published on the changes channel only, as
+# ``<version>:<trace id>:<state>``, so listeners can slice the state out without decoding it
+# and trace the broadcast under the request that caused it.
+_SAVE_AND_PUBLISH_SCRIPT = LuaScript(
+    """
+if ARGV[4] ~= '' and redis.call('GET', KEYS[3]) ~= ARGV[4] then
+    return 0
+end
+if redis.call('EXISTS', KEYS[4]) == 1 then
+    return -1
+end
+local version = redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('SPUBLISH', ARGV[3], version .. ':' .. ARGV[5] .. ':' .. ARGV[1])
+return version
+"""
+)
+
+# KEYS: game, version, moved marker on the source. ARGV: marker TTL (ms) if the state has none.
+# Marks the room as moved and reads it in one step, so every save on the source either
+# landed before the read or is refused by the marker afterwards.
+_MOVE_OUT_SCRIPT = LuaScript(
+    """
+local state = redis.call('GET', KEYS[1])
+if not state then
+    return false
+end
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl <= 0 then
+    ttl = tonumber(ARGV[1])
+end
+redis.call('SET', KEYS[3], '1', 'PX', ttl)
+return {state, ttl, redis.call('GET', KEYS[2]) or false}
+"""
+)
+
+
+# KEYS: game, version, event seq, event buffer, then each connecting client's presence key.
+# ARGV: presence TTL, presence key prefix, '1' to return the event buffer.
+# The socket handshake for a batch of clients in one round trip: reads the state and its
+# version, marks each client online (reporting which already were), lists which players are
+# online and reads the event seq (and buffer, for resuming clients). The other presence keys
+# are derived from the state's player ids; they carry the room's hash tag, so they live in the
+# same slot as the declared keys.
+_HANDSHAKE_SCRIPT = LuaScript(
+    """
+local state = redis.call('GET', KEYS[1])
+if not state then
+    return false
+end
+local was_online = {}
+for i = 5, #KEYS do
+    was_online[i - 4] = redis.call('EXISTS', KEYS[i])
+    redis.call('SET', KEYS[i], '1', 'EX', ARGV[1])
+end
+local online = {}
+for player_id in pairs(cjson.decode(state)['players']) do
+    if redis.call('EXISTS', ARGV[2] .. player_id) == 1 then
+        online[#online + 1] = player_id
+    end
+end
+local version = tonumber(redis.call('GET', KEYS[2]) or '0')
+local seq = tonumber(redis.call('GET', KEYS[3]) or '0')
+local events = {}
+if ARGV[3] == '1' then
+    events = redis.call('LRANGE', KEYS[4], 0, -1)
+end
+return {state, was_online, online, version, seq, events}
+"""
+)
+
+# KEYS: event seq, event buffer. ARGV: channel, message JSON object, buffer size, TTL.
+# Stamps the next seq into the message (spliced in before its closing brace, so the message is
+# never decoded), keeps it in the room's ring buffer and publishes it. Returns the seq.
+_PUBLISH_EVENT_SCRIPT = LuaScript(
+    """
+local seq = redis.call('INCR', KEYS[1])
+local message = string.sub(ARGV[2], 1, -2) .. ',"seq":' .. seq .. '}'
+redis.call('RPUSH', KEYS[2], message)
+redis.call('LTRIM', KEYS[2], -tonumber(ARGV[3]), -1)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+redis.call('SPUBLISH', ARGV[1], message)
+return seq
+"""
+)
+
+
+@dataclass
+class RoomHandshake:
+    state: str
+    was_online: set[str]  # Connecting clients whose presence key was still live (reconnects)
+    online: set[str]  # Players with a live presence key, the connecting clients included
+    version: int  # Version of ``state``
+    seq: int  # Seq of the room's latest socket event
+    events: list[str]  # The buffered events, oldest first and ending at ``seq``, if asked for
+
+
+async def save_and_publish(
+    redis: Redis, room_id: str, state: str, fence_node: str | None = None
+) -> int:
+    """Persist ``state`` and announce it. Returns the new version, or 0 if fenced out."""
+    version = int(
+        await _SAVE_AND_PUBLISH_SCRIPT(
+            redis,
+            keys=[game_key(room_id), version_key(room_id), owner_key(room_id), moved_key(room_id)],
+            args=[
+                state,
+                settings.GAME_TTL_SECONDS,
+                room_changes_channel(room_id),
+                fence_node or "",
+                current_trace_id().replace(":", ""),
+            ],
+        )
+    )
+    if version < 0:
+        raise RoomUnavailableError(f"Room {room_id} moved to another shard; retry")
+    return version
+
+
+def parse_room_changed(data: str) -> tuple[int, str, str]:
+    """Split a ``ROOM_CHANGED`` event into (version, trace id, state JSON)."""
+    version, _, rest = data.partition(":")
+    trace_id, _, state = rest.partition(":")
+    return int(version), trace_id, state
+
+
+async def load_game_state(room_id: str) -> str | None:
+    """Read the room's stored state, first moving it over if a reshard left it behind."""
+    data = await RedisClient.for_room(room_id).get(game_key(room_id))
+    if data is None and await migrate_room(room_id):
+        data = await RedisClient.for_room(room_id).get(game_key(room_id))
+    return data
+
+
+async def publish_room_event(room_id: str, message: str) -> int:
+    """Publish a socket event (a JSON object) to the room with the next seq stamped in."""
+    return int(
+        await _PUBLISH_EVENT_SCRIPT(
+            RedisClient.for_room(room_id, TrafficClass.PUBSUB),
+            keys=[event_seq_key(room_id), events_key(room_id)],
+            args=[
+                room_channel(room_id),
+                message,
+                settings.ROOM_EVENT_BUFFER_SIZE,
+                settings.GAME_TTL_SECONDS,
+            ],
+        )
+    )
+
+
+async def load_for_handshake(
+    room_id: str, client_ids: list[str], presence_ttl: int, with_events: bool = False
+) -> RoomHandshake | None:
+    """Load the room and mark ``client_ids`` online in one round trip; None if no room.
+
+    ``with_events`` also returns the room's event buffer, for clients resuming a session.
+    """
+    keys = [
+        game_key(room_id),
+        version_key(room_id),
+        event_seq_key(room_id),
+        events_key(room_id),
+        *(presence_key(room_id, cid) for cid in client_ids),
+    ]
+    args = [presence_ttl, presence_key(room_id, ""), "1" if with_events else "0"]
+    redis = RedisClient.for_room(room_id)
+    result = await _HANDSHAKE_SCRIPT(redis, keys=keys, args=args)
+    if result is None and await migrate_room(room_id):
+        result = await _HANDSHAKE_SCRIPT(redis, keys=keys, args=args)
+    if result is None:
+        return None
+    state, was_online, online, version, seq, events = result
+    return RoomHandshake(
+        state=state,
+        was_online={cid for cid, live in zip(client_ids, was_online, strict=True) if live},
+        online=set(online),
+        version=version,
+        seq=seq,
+        events=events,
+    )
+
+
+async def migrate_room(room_id: str) -> bool:
+    """Move a room onto its current shard from wherever an older layout left it.
+
+    Two sources are tried: the room's shard on the previous ring, and the un-tagged
+    ``game:<id>`` keys written before keys were hash-tagged. The source is fenced with a
+    moved marker in the same script that reads it, so a node still on the old ring can't
+    save there afterwards; it gets a ``RoomUnavailableError`` and the client retries.
+    Racing movers are harmless since the copy only lands if the target has no state yet.
+    Ephemeral keys (locks, leases, presence) are not moved; they are recreated within
+    seconds.
+    """
+    sources: list[tuple[Redis, list[str]]] = []
+    if previous := RedisClient.previous_for_room(room_id):
+        sources.append((previous, [game_key(room_id), version_key(room_id), moved_key(room_id)]))
+    legacy_keys = [legacy_game_key(room_id), legacy_version_key(room_id)]
+    sources.append((RedisClient.get_client(), [*legacy_keys, legacy_moved_key(room_id)]))
+
+    for source, keys in sources:
+        moved = await _MOVE_OUT_SCRIPT(source, keys=keys, args=[settings.GAME_TTL_SECONDS * 1000])
+        if not moved:
+            continue
+        state, ttl_ms, version = moved
+        target = RedisClient.for_room(room_id)
+        async with target.pipeline(transaction=False) as pipe:
+            pipe.set(game_key(room_id), state, px=ttl_ms, nx=True)
+            pipe.delete(moved_key(room_id))  # Left over if the room once moved off this shard.
+            if version is not None:
+                pipe.set(version_key(room_id), version, px=ttl_ms, nx=True)
+            await pipe.execute()
+        await source.delete(*keys[:2])
+        logger.info(f"Migrated room {room_id} to its new shard")
+        return True
+    return False
+
+
+async def rebalance_rooms(batch_size: int = 500) -> int:
+    """Move every room whose shard changed since the previous ring. Returns rooms moved."""
+    moved = 0
+    for client in RedisClient.shard_clients():
+        async for key in client.scan_iter(match="game:{*}", count=batch_size):
+            room_id = room_id_from_tagged(key)
+            if room_id is None or not key.endswith("}"):
+                continue  # Only the state key; locks/versions travel with it.
+            if RedisClient.previous_for_room(room_id) is client and await migrate_room(room_id):
+                moved += 1
+    return moved
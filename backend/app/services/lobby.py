@@ -0,0 +1,102 @@
+"""Index of open rooms for the lobby browser.
+
+A room is listed while it is ``WAITING``. The index lives on the primary Redis, like other
+global keys, as two sorted sets of room ids (scored by player count and by the time of the
+room's last change) plus a hash of each room's summary. ``GameService`` refreshes a room's
+entry after creating it and after every mutation that can change its listing. A page is a
+rank range of one sorted set and one ``HMGET``, so listing costs O(log N + page size)
+however many rooms are open. Rooms that expire are never told about; entries not updated
+for ``GAME_TTL_SECONDS`` are pruned, a few at a time, whenever the lobby is listed.
+"""
+
+import time
+from typing import Literal
+
+from app.core.config import settings
+from app.core.keys import lobby_key
+from app.core.redis import LuaScript, RedisClient
+from app.schemas.game import GamePhase, GameStateSchema, LobbyPageSchema, LobbyRoomSchema
+
+LobbySort = Literal["players", "recent"]
+
+# Mutations after which a room's listing may have changed: the player count or the phase.
+LOBBY_OPS = frozenset({"join", "add_bots", "kick_player", "start_game", "end_game", "restart_game"})
+# Stale entries dropped per listing call, so one call never walks a large backlog.
+_PRUNE_BATCH = 100
+
+_KEYS = [lobby_key("players"), lobby_key("recent"), lobby_key("rooms")]
+
+# KEYS: by-players index, by-recency index, summaries.
+# ARGV: room id, player count ('' to delist), now, summary JSON.
+_UPDATE_SCRIPT = LuaScript(
+    """
+if ARGV[2] == '' then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    redis.call('ZREM', KEYS[2], ARGV[1])
+    redis.call('HDEL', KEYS[3], ARGV[1])
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+redis.call('ZADD', KEYS[2], ARGV[3], ARGV[1])
+redis.call('HSET', KEYS[3], ARGV[1], ARGV[4])
+return 1
+"""
+)
+
+# KEYS: by-players index, by-recency index, summaries.
+# ARGV: index to page ('players' or 'recent'), offset, limit, expiry cutoff, prune batch.
+# Drops entries older than the cutoff first, then returns the index size and the summaries
+# of one page, highest score first.
+_LIST_SCRIPT = LuaScript(
+    """
+local stale = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[4], 'LIMIT', 0, ARGV[5])
+for _, room_id in ipairs(stale) do
+    redis.call('ZREM', KEYS[1], room_id)
+    redis.call('ZREM', KEYS[2], room_id)
+    redis.call('HDEL', KEYS[3], room_id)
+end
+local index = KEYS[2]
+if ARGV[1] == 'players' then
+    index = KEYS[1]
+end
+local offset = tonumber(ARGV[2])
+local ids = redis.call('ZREVRANGE', index, offset, offset + tonumber(ARGV[3]) - 1)
+local rooms = {}
+if #ids > 0 then
+    rooms = redis.call('HMGET', KEYS[3], unpack(ids))
+end
+return {redis.call('ZCARD', index), rooms}
+"""
+)
+
+
+async def update_listing(state: GameStateSchema) -> None:
+    """List the room if it is waiting for players, otherwise remove it from the lobby."""
+    if state.phase != GamePhase.WAITING:
+        await _UPDATE_SCRIPT(RedisClient.get_client(), keys=_KEYS, args=[state.room_id, "", 0, ""])
+        return
+    host = next((p.nickname for p in state.players.values() if p.is_admin), None)
+    room = LobbyRoomSchema(
+        room_id=state.room_id,
+        player_count=len(state.players),
+        host=host,
+        updated_at=time.time(),
+    )
+    await _UPDATE_SCRIPT(
+        RedisClient.get_client(),
+        keys=_KEYS,
+        args=[room.room_id, room.player_count, room.updated_at, room.model_dump_json()],
+    )
+
+
+async def list_open_rooms(sort: LobbySort, offset: int, limit: int) -> LobbyPageSchema:
+    cutoff = time.time() - settings.GAME_TTL_SECONDS
+    total, rooms = await _LIST_SCRIPT(
+        RedisClient.get_client(), keys=_KEYS, args=[sort, offset, limit, cutoff, _PRUNE_BATCH]
+    )
+    return LobbyPageSchema(
+        rooms=[LobbyRoomSchema.model_validate_json(room) for room in rooms if room],
+        total=total,
+        offset=offset,
+        limit=limit,
+    )
@@ -0,0 +1,308 @@
+"""Quick-play matchmaking.
+
+Players join a queue shared by every node with ``POST /api/matchmaking``, then wait on
+``/ws/matchmaking/{player_id}``. The queue is global, so it lives on the primary Redis: a
+sorted set of player ids by enqueue time, a hash of their nicknames, and a hash of where each
+was placed. Every node runs a ``Matchmaker`` loop. On each tick it:
+
+- pops whole rooms' worth of players off the head of the queue in one atomic script, so two
+  nodes never take the same player. Once the oldest has waited
+  ``MATCHMAKING_MAX_WAIT_SECONDS``, everyone waiting is taken if there are enough for a
+  smaller room;
+- builds each room with ``GameService.create_matched_room``, which saves it once, and then
+  records every placement of the tick in one more round trip;
+- reads the positions of the players waiting on this node's sockets in one round trip, and
+  pushes ``QUEUE_STATUS`` to each, or ``MATCH_FOUND`` once they are placed. Wait estimates
+  divide the position by the rate of the global placed-players counter.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+from app.core.keys import matchmaking_key
+from app.core.metrics import MATCHMAKING_ROOMS, MATCHMAKING_WAIT
+from app.core.redis import LuaScript, RedisClient
+from app.schemas.game import MatchmakingTicketSchema
+from app.schemas.socket import (
+    ErrorMessage,
+    ErrorPayload,
+    MatchFoundMessage,
+    MatchFoundPayload,
+    QueueStatusMessage,
+    QueueStatusPayload,
+)
+
+if TYPE_CHECKING:
+    from app.services.game_service import GameService
+
+logger = logging.getLogger(__name__)
+
+_QUEUE = matchmaking_key("queue")
+_TICKETS = matchmaking_key("tickets")
+_PLACED = matchmaking_key("placed")
+_PLACED_COUNT = matchmaking_key("placed:count")
+# Placements outlive the socket that waited for them, so a reconnecting player finds theirs.
+_PLACED_TTL_SECONDS = 600
+# Weight of the latest tick in the placement rate behind wait estimates.
+_RATE_SMOOTHING = 0.2
+
+# KEYS: queue, tickets, placements. ARGV: player id, nickname, now.
+# Re-enqueueing keeps the original place in the queue. Returns {position, queued}.
+_ENQUEUE_SCRIPT = LuaScript(
+    """
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('ZADD', KEYS[1], 'NX', ARGV[3], ARGV[1])
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+return {redis.call('ZRANK', KEYS[1], ARGV[1]), redis.call('ZCARD', KEYS[1])}
+"""
+)
+
+# KEYS: queue, tickets. ARGV: player id. Returns 1 if the player was waiting.
+_LEAVE_SCRIPT = LuaScript(
+    """
+redis.call('HDEL', KEYS[2], ARGV[1])
+return redis.call('ZREM', KEYS[1], ARGV[1])
+"""
+)
+
+# KEYS: queue, tickets, placements.
+# ARGV: room size, smallest room, enqueue-time cutoff for a smaller room, most players.
+# Pops the players to place this tick and marks them as being placed (an empty placement).
+# Returns {ids, enqueue times, nicknames}, oldest first.
+_TAKE_SCRIPT = LuaScript(
+    """
+local size, smallest = tonumber(ARGV[1]), tonumber(ARGV[2])
+local waiting = redis.call('ZCARD', KEYS[1])
+local take = math.min(waiting - waiting % size, tonumber(ARGV[4]))
+if take == 0 and waiting >= smallest then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    if tonumber(oldest[2]) <= tonumber(ARGV[3]) then
+        take = math.min(waiting, size)
+    end
+end
+if take == 0 then
+    return {{}, {}, {}}
+end
+local popped = redis.call('ZPOPMIN', KEYS[1], take)
+local ids, scores = {}, {}
+for i = 1, #popped, 2 do
+    ids[#ids + 1] = popped[i]
+    scores[#scores + 1] = popped[i + 1]
+    redis.call('HSET', KEYS[3], popped[i], '')
+end
+local names = redis.call('HMGET', KEYS[2], unpack(ids))
+redis.call('HDEL', KEYS[2], unpack(ids))
+return {ids, scores, names}
+"""
+)
+
+# KEYS: placements, placed-players counter. ARGV: placement TTL, then player id, room id pairs.
+_PLACE_SCRIPT = LuaScript(
+    """
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return redis.call('INCRBY', KEYS[2], (#ARGV - 1) / 2)
+"""
+)
+
+# KEYS: queue, tickets, placements. ARGV: player id, enqueue time, nickname triples.
+# Puts back players whose room could not be created, at their original place.
+_REQUEUE_SCRIPT = LuaScript(
+    """
+for i = 1, #ARGV, 3 do
+    redis.call('HDEL', KEYS[3], ARGV[i])
+    redis.call('ZADD', KEYS[1], ARGV[i + 1], ARGV[i])
+    redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 2])
+end
+return #ARGV / 3
+"""
+)
+
+# KEYS: queue, placements, placed-players counter. ARGV: player ids.
+# Returns {queued, placed so far, {{position or -1, room id or '' or false}, ...}}.
+_STATUS_SCRIPT = LuaScript(
+    """
+local players = {}
+for i, player_id in ipairs(ARGV) do
+    players[i] = {
+        redis.call('ZRANK', KEYS[1], player_id) or -1,
+        redis.call('HGET', KEYS[2], player_id) or false,
+    }
+end
+local placed = tonumber(redis.call('GET', KEYS[3]) or '0')
+return {redis.call('ZCARD', KEYS[1]), placed, players}
+"""
+)
+
+
+async def enqueue(player_id: str, nickname: str) -> MatchmakingTicketSchema:
+    position, queued = await _ENQUEUE_SCRIPT(
+        RedisClient.get_client(),
+        keys=[_QUEUE, _TICKETS, _PLACED],
+        args=[player_id, nickname, time.time()],
+    )
+    return MatchmakingTicketSchema(player_id=player_id, position=position, queued=queued)
+
+
+async def leave(player_id: str) -> bool:
+    """Take the player out of the queue; False if they were not waiting."""
+    return bool(
+        await _LEAVE_SCRIPT(RedisClient.get_client(), keys=[_QUEUE, _TICKETS], args=[player_id])
+    )
+
+
+class Matchmaker:
+    """One per node: places queued players into rooms and keeps local waiters informed."""
+
+    def __init__(self, service: Callable[[], "GameService"]):
+        self._service = service
+        self._sockets: dict[str, WebSocket] = {}
+        self._task: asyncio.Task | None = None
+        self._placed: tuple[float, int] | None = None  # (monotonic time, counter) last tick
+        self._rate = 0.0  # Players placed per second, across every node
+
+    @property
+    def waiting(self) -> int:
+        return len(self._sockets)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def watch(self, player_id: str, websocket: WebSocket) -> bool:
+        """Send the player where they stand and, while they are still waiting, keep them
+        informed on ``websocket`` every tick. False when there is nothing left to wait for."""
+        if player_id in await self._notify({player_id: websocket}):
+            return False
+        self._sockets[player_id] = websocket
+        return True
+
+    def unwatch(self, player_id: str, websocket: WebSocket) -> None:
+        if self._sockets.get(player_id) is websocket:
+            del self._sockets[player_id]
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.match()
+                if self._sockets:
+                    for player_id in await self._notify(dict(self._sockets)):
+                        websocket = self._sockets.pop(player_id, None)
+                        if websocket is not None:
+                            with contextlib.suppress(Exception):
+                                await websocket.close()
+            except Exception:
+                logger.exception("Matchmaker tick failed")
+            await asyncio.sleep(settings.MATCHMAKING_TICK_SECONDS)
+
+    async def match(self) -> int:
+        """Place as many queued players as this tick allows. Returns the rooms created."""
+        size = settings.MATCHMAKING_ROOM_SIZE
+        ids, scores, names = await _TAKE_SCRIPT(
+            RedisClient.get_client(),
+            keys=[_QUEUE, _TICKETS, _PLACED],
+            args=[
+                size,
+                settings.MATCHMAKING_MIN_ROOM_SIZE,
+                time.time() - settings.MATCHMAKING_MAX_WAIT_SECONDS,
+                size * settings.MATCHMAKING_MAX_ROOMS_PER_TICK,
+            ],
+        )
+        if not ids:
+            return 0
+
+        service = self._service()
+        placements: list[str] = []
+        rooms = 0
+        now = time.time()
+        for start in range(0, len(ids), size):
+            group = slice(start, start + size)
+            players = list(zip(ids[group], names[group], strict=True))
+            try:
+                state = await service.create_matched_room(players)
+            except Exception:
+                logger.exception(f"Could not create a room for {len(players)} queued players")
+                await _REQUEUE_SCRIPT(
+                    RedisClient.get_client(),
+                    keys=[_QUEUE, _TICKETS, _PLACED],
+                    args=[
+                        value
+                        for player_id, score, name in zip(
+                            ids[group], scores[group], names[group], strict=True
+                        )
+                        for value in (player_id, score, name)
+                    ],
+                )
+                continue
+            rooms += 1
+            for player_id, score in zip(ids[group], scores[group], strict=True):
+                placements += [player_id, state.room_id]
+                MATCHMAKING_WAIT.observe(now - float(score))
+        if placements:
+            await _PLACE_SCRIPT(
+                RedisClient.get_client(),
+                keys=[_PLACED, _PLACED_COUNT],
+                args=[_PLACED_TTL_SECONDS, *placements],
+            )
+        MATCHMAKING_ROOMS.inc(rooms)
+        return rooms
+
+    async def _notify(self, sockets: dict[str, WebSocket]) -> set[str]:
+        """Send each socket its player's status. Returns the players done waiting: placed,
+        no longer queued, or unreachable."""
+        player_ids = list(sockets)
+        queued, placed, statuses = await _STATUS_SCRIPT(
+            RedisClient.get_client(), keys=[_QUEUE, _PLACED, _PLACED_COUNT], args=player_ids
+        )
+        self._update_rate(placed)
+
+        done = set()
+        for player_id, (position, room_id) in zip(player_ids, statuses, strict=True):
+            message: MatchFoundMessage | QueueStatusMessage | ErrorMessage
+            if room_id:
+                message = MatchFoundMessage(payload=MatchFoundPayload(room_id=room_id))
+                done.add(player_id)
+            elif position >= 0:
+                eta = (position + 1) / self._rate if self._rate > 0 else None
+                message = QueueStatusMessage(
+                    payload=QueueStatusPayload(position=position, queued=queued, eta_seconds=eta)
+                )
+            elif room_id is None:
+                message = ErrorMessage(
+                    payload=ErrorPayload(message="Not in the quick-play queue", code="NOT_QUEUED")
+                )
+                done.add(player_id)
+            else:
+                continue  # Popped by a matchmaker that is creating the room right now
+            try:
+                await sockets[player_id].send_text(message.model_dump_json())
+            except Exception:
+                done.add(player_id)
+        return done
+
+    def _update_rate(self, placed: int) -> None:
+        now = time.monotonic()
+        if self._placed is not None:
+            last_time, last_count = self._placed
+            if now > last_time and placed >= last_count:
+                rate = (placed - last_count) / (now - last_time)
+                self._rate += _RATE_SMOOTHING * (rate - self._rate)
+        self._placed = (now, placed)
@@ -0,0 +1,117 @@
+"""Group commit for concurrent mutations of the same room.
+
+Mutations that arrive while a room's previous write is still in flight are queued and then
+applied together to one loaded ``Game``, which is saved once. Every caller still gets its
+own outcome: the resulting state, or the exception its mutation raised.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.config import settings
+from app.core.tracing import Span, current_span, span
+from app.models.game import Game
+from app.services.action_log import record_mutation
+from app.services.mutations import CHECKED_FIRST, REBALANCED_AFTER, apply_mutation
+
+
+@dataclass
+class PendingMutation:
+    op: str
+    args: dict[str, Any]
+    future: asyncio.Future = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+    # The submitter's span, so the mutation is traced under its own request.
+    span: Span | None = field(default_factory=current_span)
+
+
+def apply_batch(game: Game, batch: list[PendingMutation]) -> tuple[Game, list[PendingMutation]]:
+    """Apply ``batch`` in order, failing only the mutations that are rejected.
+
+    A rejected mutation may leave the game half-modified, so each one not in
+    ``CHECKED_FIRST`` runs against a copy taken just before it and a failure falls back to
+    that copy; a burst of joins therefore copies nothing. Roles are rebalanced once after
+    each run of ``REBALANCED_AFTER`` mutations, before anything else sees the seats.
+    Returns the resulting game and the accepted mutations, whose futures are left for the
+    caller to resolve.
+    """
+    applied: list[PendingMutation] = []
+    rebalance = False
+    for mutation in batch:
+        if mutation.future.done():
+            continue
+        if rebalance and mutation.op not in REBALANCED_AFTER:
+            _rebalance(game)
+            rebalance = False
+        checkpoint = None if mutation.op in CHECKED_FIRST else game.copy()
+        try:
+            with span(f"mutation.{mutation.op}", parent=mutation.span, phase=game.phase.value):
+                apply_mutation(game, mutation.op, mutation.args)
+        except Exception as e:
+            mutation.future.set_exception(e)
+            if checkpoint is not None:
+                game = checkpoint
+            record_mutation(game, mutation.op, mutation.args, e)
+            continue
+        record_mutation(game, mutation.op, mutation.args, None)
+        applied.append(mutation)
+        rebalance = rebalance or mutation.op in REBALANCED_AFTER
+    if rebalance:
+        _rebalance(game)
+    return game, applied
+
+
+def _rebalance(game: Game) -> None:
+    # Logged like any other mutation, so a replay rebalances at the same points.
+    with span("mutation.rebalance_roles", players=len(game.players)):
+        apply_mutation(game, "rebalance_roles", {})
+    record_mutation(game, "rebalance_roles", {}, None)
+
+
+class MutationBatcher:
+    """Per-room queue that hands everything waiting to ``commit`` in one batch."""
+
+    def __init__(self, commit: Callable[[str, list[PendingMutation]], Awaitable[None]]):
+        self._commit = commit
+        self._queues: dict[str, list[PendingMutation]] = {}
+        self._drainers: dict[str, asyncio.Task] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._drainers)
+
+    async def flush(self) -> None:
+        """Wait until every queued mutation has been committed (or failed)."""
+        while self._drainers:
+            await asyncio.gather(*self._drainers.values(), return_exceptions=True)
+
+    async def submit(self, room_id: str, op: str, args: dict[str, Any]) -> Any:
+        mutation = PendingMutation(op, args)
+        self._queues.setdefault(room_id, []).append(mutation)
+        if room_id not in self._drainers:
+            self._drainers[room_id] = asyncio.create_task(self._drain(room_id))
+        return await mutation.future
+
+    async def _drain(self, room_id: str) -> None:
+        try:
+            while batch := self._take(room_id):
+                try:
+                    await self._commit(room_id, batch)
+                except Exception as e:
+                    for mutation in batch:
+                        if not mutation.future.done():
+                            mutation.future.set_exception(e)
+        finally:
+            self._drainers.pop(room_id, None)
+
+    def _take(self, room_id: str) -> list[PendingMutation]:
+        queue = self._queues.get(room_id)
+        if not queue:
+            self._queues.pop(room_id, None)
+            return []
+        limit = settings.MUTATION_BATCH_MAX_SIZE
+        batch, self._queues[room_id] = queue[:limit], queue[limit:]
+        return batch
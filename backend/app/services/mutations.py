@@ -0,0 +1,167 @@
+"""Named game mutations.
+
+Every state change made through ``GameService`` is expressed as an operation name plus
+JSON-serialisable arguments and applied synchronously to a loaded ``Game``. Keeping the
+mutations as plain data lets the service run them under the Redis lock, hand them to the
+in-memory owner of a room, or forward them to another node unchanged.
+"""
+
+import itertools
+from collections.abc import Callable
+from typing import Any
+
+from app.core.tracing import span
+from app.models.game import Game
+from app.schemas.game import GamePhase, GameSettingsSchema
+
+
+def join(game: Game, player_id: str, nickname: str) -> None:
+    if game.phase not in (GamePhase.WAITING, GamePhase.GAME_OVER):
+        raise ValueError("Game in progress; spectate it and join the next round")
+    if game.nickname_owner(nickname) is not None:
+        raise ValueError("Nickname already taken")
+
+    is_admin = len(game.players) == 0
+    game.add_player(player_id, nickname, is_admin)
+
+
+def add_bots(game: Game, player_id: str, bot_ids: list[str]) -> None:
+    player = game.players.get(player_id)
+    if not player or not player.is_admin:
+        raise ValueError("Only admin can add bots")
+
+    if game.phase != GamePhase.WAITING:
+        raise ValueError("Bots can only be added before the game starts")
+
+    numbers = (n for n in itertools.count(1) if game.nickname_owner(f"Bot {n}") is None)
+    for bot_id, n in zip(bot_ids, numbers, strict=False):
+        game.add_player(bot_id, f"Bot {n}", is_bot=True)
+    game.auto_balance_roles()
+
+
+def update_settings(game: Game, player_id: str, settings: dict[str, Any]) -> None:
+    player = game.players.get(player_id)
+    if not player or not player.is_admin:
+        raise ValueError("Only admin can update settings")
+
+    game.settings = GameSettingsSchema.model_validate(settings)
+
+
+def start_game(game: Game, player_id: str, settings: dict[str, Any] | None = None) -> None:
+    player = game.players.get(player_id)
+    if not player or not player.is_admin:
+        raise ValueError("Only admin can start the game")
+
+    if settings:
+        game.settings = GameSettingsSchema.model_validate(settings)
+
+    total_roles = sum(game.settings.role_distribution.values())
+    if total_roles != len(game.players):
+        raise ValueError(
+            f"Role count ({total_roles}) must match player count ({len(game.players)})"
+        )
+
+    game.start_game()
+
+
+def submit_action(
+    game: Game,
+    player_id: str,
+    action_type: str,
+    target_id: str | None,
+    confirmed: bool = True,
+) -> None:
+    if not target_id:
+        raise ValueError("Action requires a target")
+
+    with span("process_action"):
+        game.process_action(
+            player_id,
+            {"action_type": action_type, "target_id": target_id, "confirmed": confirmed},
+        )
+    with span("check_and_advance"):
+        game.check_and_advance()
+
+
+def submit_vote(game: Game, player_id: str, target_id: str) -> None:
+    if game.phase != GamePhase.DAY:
+        raise ValueError("Can only vote during day phase")
+
+    with span("process_action"):
+        game.process_action(player_id, {"target_id": target_id})
+    with span("check_and_advance"):
+        game.check_and_advance()
+
+
+def end_game(game: Game, player_id: str) -> None:
+    player = game.players.get(player_id)
+    if not player or not player.is_admin:
+        raise ValueError("Only admin can end the game")
+
+    game.winners = "CANCELLED"
+    game.transition_to(GamePhase.GAME_OVER)
+
+
+def kick_player(game: Game, player_id: str, target_id: str) -> None:
+    player = game.players.get(player_id)
+    if not player or not player.is_admin:
+        raise ValueError("Only admin can kick players")
+
+    if game.phase not in [GamePhase.WAITING, GamePhase.GAME_OVER]:
+        raise ValueError("Cannot kick players while game is in progress")
+
+    if target_id not in game.players:
+        raise ValueError("Player not found")
+
+    if target_id == player_id:
+        raise ValueError("Cannot kick yourself")
+
+    game.remove_player(target_id)
+
+
+def restart_game(game: Game, player_id: str) -> None:
+    player = game.players.get(player_id)
+    if not player or not player.is_admin:
+        raise ValueError("Only admin can restart the game")
+
+    game.restart()
+
+
+def rebalance_roles(game: Game) -> None:
+    if game.phase == GamePhase.WAITING:
+        game.auto_balance_roles()
+
+
+MUTATIONS: dict[str, Callable[..., None]] = {
+    "join": join,
+    "add_bots": add_bots,
+    "update_settings": update_settings,
+    "start_game": start_game,
+    "submit_action": submit_action,
+    "submit_vote": submit_vote,
+    "end_game": end_game,
+    "kick_player": kick_player,
+    "restart_game": restart_game,
+    "rebalance_roles": rebalance_roles,
+}
+
+# Mutations that change who is seated but leave the role distribution to a
+# ``rebalance_roles`` after them: ``apply_batch`` runs one for a whole run of joins and kicks,
+# rather than one per player.
+REBALANCED_AFTER = frozenset({"join", "kick_player"})
+
+# Mutations that check everything before they change the game, so a rejected one leaves it
+# untouched and needs no checkpoint to roll back to.
+CHECKED_FIRST = frozenset({"join", "kick_player", "add_bots", "rebalance_roles"})
+
+
+def apply_mutation(game: Game, op: str, args: dict[str, Any]) -> None:
+    """Apply the named mutation to ``game`` in place.
+
+    Raises ``ValueError`` or ``GameLogicError`` when the mutation is rejected; the game may
+    then be partially modified and must be discarded or restored by the caller.
+    """
+    mutation = MUTATIONS.get(op)
+    if mutation is None:
+        raise ValueError(f"Unknown mutation: {op}")
+    mutation(game, **args)
@@ -0,0 +1,444 @@
+"""Per-room actor ownership.
+
+When ``ROOM_OWNERSHIP_ENABLED`` is set, each room is leased by exactly one node. The owner
+keeps the room's ``Game`` in memory inside a ``RoomActor`` and applies mutations from an
+asyncio mailbox, so a hot room costs no Redis reads and a single fenced write per batch of
+queued mutations. Other nodes forward commands to the owner over its ``node:{id}`` channel and
+wait for the reply on their own. Leases are renewed in the background; when an owner dies
+its lease expires and the next node to receive a command for the room takes it over.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Coroutine
+from typing import TYPE_CHECKING, Any
+
+from app.core.config import settings
+from app.core.exceptions import (
+    GameLogicError,
+    InvalidActionError,
+    PhaseError,
+    RoomUnavailableError,
+)
+from app.core.keys import node_channel, owner_key
+from app.core.metrics import track_tasks
+from app.core.redis import LuaScript, RedisClient, TrafficClass
+from app.core.tracing import current_trace_id, span
+from app.models.game import Game
+from app.schemas.game import GameStateSchema
+from app.services.game_store import load_game_state, save_and_publish
+from app.services.mutation_batcher import PendingMutation, apply_batch
+
+if TYPE_CHECKING:
+    from redis.asyncio.client import PubSub
+
+logger = logging.getLogger(__name__)
+
+MAX_FORWARD_HOPS = 1
+
+# Called with the committed state and the ops of the mutations applied in the batch.
+OnCommit = Callable[[GameStateSchema, list[str]], Awaitable[None]]
+
+_RENEW_SCRIPT = LuaScript(
+    """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+)
+
+_RELEASE_SCRIPT = LuaScript(
+    """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+)
+
+# Exceptions that may cross the wire in a forwarded reply.
+_REMOTE_ERRORS: dict[str, type[Exception]] = {
+    "ValueError": ValueError,
+    "GameLogicError": GameLogicError,
+    "InvalidActionError": InvalidActionError,
+    "PhaseError": PhaseError,
+}
+
+
+class _LeaseLostError(Exception):
+    """The local actor no longer holds the room lease."""
+
+
+class _OwnerUnreachableError(Exception):
+    """A forwarded command reached nobody, so it was certainly not applied."""
+
+
+class RoomActor:
+    """Holds one room's Game in memory and applies its mutations sequentially."""
+
+    def __init__(self, room_id: str, game: Game, node_id: str, on_commit: OnCommit | None = None):
+        self.room_id = room_id
+        self.game = game
+        self.node_id = node_id
+        self._on_commit = on_commit
+        self.closed = False
+        self.last_used = time.monotonic()
+        # Last persisted state: rolled back to when a write fails, and what readers see.
+        self._snapshot = game.to_json()
+        # ``None`` is the shutdown sentinel queued by ``close``.
+        self._mailbox: asyncio.Queue[PendingMutation | None] = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    @property
+    def idle(self) -> bool:
+        return self._mailbox.empty() and (
+            time.monotonic() - self.last_used > settings.ROOM_ACTOR_IDLE_SECONDS
+        )
+
+    def committed_game(self) -> Game:
+        """A private copy of the last persisted state, never a not-yet-saved mutation."""
+        return Game.from_json(self._snapshot)
+
+    async def submit(self, op: str, args: dict[str, Any]) -> GameStateSchema:
+        if self.closed:
+            raise _LeaseLostError(self.room_id)
+        mutation = PendingMutation(op, args)
+        self._mailbox.put_nowait(mutation)
+        self.last_used = time.monotonic()
+        return await mutation.future
+
+    async def close(self) -> None:
+        """Stop accepting commands, finish the queued ones and wait for the loop to exit."""
+        if not self.closed:
+            self.closed = True
+            self._mailbox.put_nowait(None)
+        await self._task
+
+    def _fail_pending(self) -> None:
+        while not self._mailbox.empty():
+            item = self._mailbox.get_nowait()
+            if item is not None and not item.future.done():
+                item.future.set_exception(_LeaseLostError(self.room_id))
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._mailbox.get()
+            if item is None:
+                return
+
+            # Group commit: everything that queued up during the last write goes in one batch.
+            batch = [item]
+            stop = False
+            while not self._mailbox.empty() and len(batch) < settings.MUTATION_BATCH_MAX_SIZE:
+                queued = self._mailbox.get_nowait()
+                if queued is None:
+                    stop = True
+                    break
+                batch.append(queued)
+
+            with span(
+                "room.commit", parent=batch[0].span, room_id=self.room_id, batch_size=len(batch)
+            ):
+                committed = await self._commit(batch)
+            if not committed or stop:
+                return
+
+    async def _commit(self, batch: list[PendingMutation]) -> bool:
+        """Apply and persist one batch. Returns False once the lease has been lost."""
+        snapshot = self._snapshot
+        try:
+            self.game, applied = apply_batch(self.game, batch)
+            if not applied:
+                return True
+            state = self.game.to_json()
+            # Fenced by the lease: a node that lost the room gets 0 and writes nothing.
+            persisted = await save_and_publish(
+                RedisClient.for_room(self.room_id), self.room_id, state, fence_node=self.node_id
+            )
+        except Exception as e:
+            self.game = Game.from_json(snapshot)
+            for mutation in batch:
+                if not mutation.future.done():
+                    mutation.future.set_exception(e)
+            return True
+
+        if not persisted:
+            logger.warning(f"Lost lease for room {self.room_id} on node {self.node_id}")
+            self.closed = True
+            for mutation in applied:
+                mutation.future.set_exception(_LeaseLostError(self.room_id))
+            self._fail_pending()
+            return False
+
+        self._snapshot = state
+        result = self.game.to_schema()
+        if self._on_commit is not None:
+            await self._on_commit(result, [mutation.op for mutation in applied])
+        for mutation in applied:
+            mutation.future.set_result(result)
+        return True
+
+
+class RoomOwnership:
+    """Leases rooms to this node, runs their actors and routes commands between nodes."""
+
+    def __init__(self):
+        self.node_id = settings.NODE_ID or uuid.uuid4().hex[:12]
+        self.actors: dict[str, RoomActor] = {}
+        self.pubsub: PubSub | None = None
+        self._pending: dict[str, asyncio.Future] = {}
+        self._room_locks: dict[str, asyncio.Lock] = {}
+        self._listener_task: asyncio.Task | None = None
+        self._renew_task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        # Run by each actor once per committed batch, before its callers are answered.
+        self.on_commit: OnCommit | None = None
+
+    @property
+    def channel(self) -> str:
+        return node_channel(self.node_id)
+
+    async def start(self) -> None:
+        self.pubsub = RedisClient.get_client(TrafficClass.PUBSUB).pubsub()
+        await self.pubsub.subscribe(self.channel)
+        self._listener_task = asyncio.create_task(self._listener_loop())
+        self._renew_task = asyncio.create_task(self._renew_loop())
+        logger.info(f"Room ownership enabled on node {self.node_id}")
+
+    async def stop(self) -> None:
+        for task in (self._renew_task, self._listener_task):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        self._renew_task = self._listener_task = None
+
+        for room_id in list(self.actors):
+            await self._release(room_id)
+
+        if self.pubsub is not None:
+            await self.pubsub.aclose()
+            self.pubsub = None
+
+    def local_game(self, room_id: str) -> Game | None:
+        """Return the room's last persisted game if this node currently owns it."""
+        actor = self.actors.get(room_id)
+        if actor is None or actor.closed:
+            return None
+        return actor.committed_game()
+
+    async def execute(
+        self, room_id: str, op: str, args: dict[str, Any], hops: int = 0
+    ) -> GameStateSchema | None:
+        """Run a mutation on the room's owner, acquiring the lease if nobody holds it."""
+        lease_ms = settings.ROOM_LEASE_TTL_MS
+        deadline = time.monotonic() + lease_ms / 1000 + settings.ROOM_FORWARD_TIMEOUT
+        while True:
+            owner = await self._resolve(room_id)
+            if owner is None:
+                return None
+
+            try:
+                if isinstance(owner, RoomActor):
+                    return await owner.submit(op, args)
+                if hops >= MAX_FORWARD_HOPS:
+                    raise RoomUnavailableError(f"Room {room_id} changed owner mid-forward")
+                return await self._forward(owner, room_id, op, args, hops)
+            except _LeaseLostError:
+                # Nothing was written; another node took the room, so route there instead.
+                self.actors.pop(room_id, None)
+            except _OwnerUnreachableError:
+                # The owner is gone; wait for its lease to lapse and take the room over.
+                pass
+            if time.monotonic() >= deadline:
+                raise RoomUnavailableError(f"Room {room_id} has no reachable owner")
+            await asyncio.sleep(min(0.5, lease_ms / 4000))
+
+    async def _resolve(self, room_id: str) -> "RoomActor | str | None":
+        """Return the local actor, the remote owner's node id, or None if the room is gone."""
+        actor = self.actors.get(room_id)
+        if actor is not None and not actor.closed:
+            return actor
+
+        lock = self._room_locks.setdefault(room_id, asyncio.Lock())
+        try:
+            async with lock:
+                return await self._acquire(room_id)
+        finally:
+            # Only rooms run here keep a lock; rooms merely forwarded would pile up forever.
+            if room_id not in self.actors and self._room_locks.get(room_id) is lock:
+                del self._room_locks[room_id]
+
+    async def _acquire(self, room_id: str) -> "RoomActor | str | None":
+        actor = self.actors.get(room_id)
+        if actor is not None and not actor.closed:
+            return actor
+
+        redis = RedisClient.for_room(room_id, TrafficClass.LOCKS)
+        lease_key = owner_key(room_id)
+        while True:
+            if await redis.set(lease_key, self.node_id, nx=True, px=settings.ROOM_LEASE_TTL_MS):
+                break
+            owner = await redis.get(lease_key)
+            if owner == self.node_id:
+                break
+            if owner is not None:
+                return owner
+
+        data = await load_game_state(room_id)
+        actor = self.actors.get(room_id)
+        if actor is not None and not actor.closed:
+            return actor  # Resolved concurrently by a caller holding a since-dropped lock.
+        if not data:
+            await _RELEASE_SCRIPT(redis, keys=[lease_key], args=[self.node_id])
+            return None
+
+        actor = RoomActor(room_id, Game.from_json(data), self.node_id, self.on_commit)
+        self.actors[room_id] = actor
+        return actor
+
+    async def _forward(
+        self, owner: str, room_id: str, op: str, args: dict[str, Any], hops: int
+    ) -> GameStateSchema | None:
+        request_id = uuid.uuid4().hex
+        future: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        command = {
+            "kind": "command",
+            "id": request_id,
+            "reply_to": self.channel,
+            "room_id": room_id,
+            "op": op,
+            "args": args,
+            "hops": hops + 1,
+            "trace_id": current_trace_id(),
+        }
+        try:
+            receivers = await RedisClient.get_client(TrafficClass.PUBSUB).publish(
+                node_channel(owner), json.dumps(command)
+            )
+            if not receivers:
+                raise _OwnerUnreachableError(owner)
+            reply = await asyncio.wait_for(future, timeout=settings.ROOM_FORWARD_TIMEOUT)
+        except TimeoutError:
+            # The owner got the command and may have applied it; retrying could apply it
+            # twice, so the outcome is reported as unknown instead.
+            raise RoomUnavailableError(f"No reply from the owner of room {room_id}") from None
+        finally:
+            self._pending.pop(request_id, None)
+
+        return _decode_reply(reply)
+
+    async def _listener_loop(self) -> None:
+        if not self.pubsub:
+            return
+
+        async for message in self.pubsub.listen():
+            if message["type"] != "message":
+                continue
+            try:
+                payload = json.loads(message["data"])
+            except (TypeError, ValueError):
+                logger.warning("Ignoring malformed node message")
+                continue
+
+            if payload.get("kind") == "reply":
+                future = self._pending.get(payload.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(payload)
+            elif payload.get("kind") == "command":
+                self._spawn(self._handle_command(payload))
+
+    async def _handle_command(self, command: dict[str, Any]) -> None:
+        reply: dict[str, Any] = {"kind": "reply", "id": command["id"]}
+        try:
+            with span("room.forwarded", trace_id=command.get("trace_id"), op=command["op"]):
+                result = await self.execute(
+                    command["room_id"], command["op"], command["args"], hops=command.get("hops", 1)
+                )
+            reply["result"] = result.model_dump(mode="json") if result else None
+        except Exception as e:
+            reply["error"] = {"type": type(e).__name__, "message": str(e)}
+
+        await RedisClient.get_client(TrafficClass.PUBSUB).publish(
+            command["reply_to"], json.dumps(reply)
+        )
+
+    async def _renew_loop(self) -> None:
+        interval = settings.ROOM_LEASE_TTL_MS / 3000
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._renew_all()
+            except Exception:
+                logger.exception("Lease renewal pass failed")
+
+    async def _renew_all(self) -> None:
+        """Renew every live lease concurrently so a pass takes one round trip, not one per room."""
+        renewing: list[tuple[str, RoomActor]] = []
+        for room_id, actor in list(self.actors.items()):
+            if actor.closed:
+                self.actors.pop(room_id, None)
+            elif actor.idle:
+                # Closing waits for the mailbox to drain; keep that off the renewal path.
+                self._spawn(self._release(room_id))
+            else:
+                renewing.append((room_id, actor))
+
+        results = await asyncio.gather(
+            *(
+                _RENEW_SCRIPT(
+                    RedisClient.for_room(room_id, TrafficClass.LOCKS),
+                    keys=[owner_key(room_id)],
+                    args=[self.node_id, settings.ROOM_LEASE_TTL_MS],
+                )
+                for room_id, _ in renewing
+            ),
+            return_exceptions=True,
+        )
+        for (room_id, actor), renewed in zip(renewing, results, strict=True):
+            if isinstance(renewed, BaseException):
+                logger.warning(f"Failed to renew lease for room {room_id}: {renewed}")
+            elif not renewed:
+                logger.warning(f"Lease for room {room_id} was taken over; dropping actor")
+                if self.actors.get(room_id) is actor:
+                    self.actors.pop(room_id)
+                self._spawn(actor.close())
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _release(self, room_id: str) -> None:
+        actor = self.actors.pop(room_id, None)
+        if actor is not None:
+            try:
+                await actor.close()
+            except Exception:
+                logger.exception(f"Actor for room {room_id} failed while closing")
+        with contextlib.suppress(Exception):
+            await _RELEASE_SCRIPT(
+                RedisClient.for_room(room_id, TrafficClass.LOCKS),
+                keys=[owner_key(room_id)],
+                args=[self.node_id],
+            )
+        self._room_locks.pop(room_id, None)
+
+
+def _decode_reply(reply: dict[str, Any]) -> GameStateSchema | None:
+    if error := reply.get("error"):
+        exc_type = _REMOTE_ERRORS.get(error.get("type"), RoomUnavailableError)
+        raise exc_type(error.get("message", ""))
+    result = reply.get("result")
+    return GameStateSchema.model_validate(result) if result else None
+
+
+room_ownership = RoomOwnership()
+track_tasks("room_commands", lambda: len(room_ownership._tasks))
+track_tasks("room_actors", lambda: len(room_ownership.actors))
@@ -0,0 +1,74 @@
+"""Spectators: everyone watching a room from outside its player table.
+
+A spectator is a socket, not a player. Each node keeps one ``SpectatorStream`` per room that
+has spectators on it. Every new version the node already renders for its players from the
+room's ``ROOM_CHANGED`` events is also rendered once into the public view, which the stream
+sends to all of the room's spectators as the same frame, ``SPECTATOR_DELAY_SECONDS`` later.
+A room's thousandth spectator on a node costs a socket send per version and nothing else.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+
+from fastapi import WebSocket
+
+from app.core.metrics import BROADCAST_SEND, timed
+
+logger = logging.getLogger(__name__)
+
+
+class SpectatorStream:
+    """One room's spectators on this node and the delayed frames queued for them."""
+
+    def __init__(self, room_id: str, delay: float):
+        self.room_id = room_id
+        self.delay = delay
+        self.sockets: set[WebSocket] = set()
+        self.version = -1  # Newest version queued
+        self.current: str | None = None  # Frame last sent, for spectators who arrive later
+        # Set once the first frame is queued; False if the room turned out not to exist.
+        self.ready: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        self._pending: deque[tuple[float, str]] = deque()  # (monotonic send time, frame)
+        self._sender: asyncio.Task | None = None
+
+    def publish(self, version: int, frame: str) -> None:
+        """Queue ``frame`` for every spectator; versions older than one queued are dropped."""
+        if version <= self.version:
+            return
+        self.version = version
+        self._pending.append((time.monotonic() + self.delay, frame))
+        if self._sender is None or self._sender.done():
+            self._sender = asyncio.create_task(self._send_loop())
+
+    async def add(self, websocket: WebSocket) -> None:
+        self.sockets.add(websocket)
+        if self.current is not None:
+            await websocket.send_text(self.current)
+
+    def remove(self, websocket: WebSocket) -> None:
+        self.sockets.discard(websocket)
+
+    async def close(self) -> None:
+        if self._sender is not None:
+            self._sender.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sender
+
+    async def _send_loop(self) -> None:
+        while self._pending:
+            due, frame = self._pending[0]
+            await asyncio.sleep(max(due - time.monotonic(), 0.0))
+            self._pending.popleft()
+            self.current = frame
+            await asyncio.gather(*(self._send(ws, frame) for ws in list(self.sockets)))
+
+    async def _send(self, websocket: WebSocket, frame: str) -> None:
+        try:
+            with timed(BROADCAST_SEND):
+                await websocket.send_text(frame)
+        except Exception as e:
+            # The socket's own route notices it is gone and removes it.
+            logger.debug(f"Failed to send spectator frame in room {self.room_id}: {e}")
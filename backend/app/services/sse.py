@@ -0,0 +1,86 @@
+"""Server-Sent Events for players whose network or webview blocks WebSockets.
+
+An ``SSEConnection`` stands in for a player's WebSocket in the ``ConnectionManager``: it is
+registered under the player's id like a socket, so the fan-out that renders and writes
+frames to sockets queues them here unchanged, and the route's response streams them out as
+events. Each event's id is ``<seq>.<version>``, the room event seq and state version the
+client has seen, which the browser sends back as ``Last-Event-ID`` when it reconnects.
+"""
+
+import asyncio
+import re
+from collections.abc import AsyncIterator
+
+# Frames the client has not read yet. A client this far behind is dropped; it reconnects
+# with its Last-Event-ID and gets a fresh state.
+SSE_QUEUE_SIZE = 64
+
+# Room events end with their seq (spliced in when published); state updates with their
+# version.
+_CURSOR = re.compile(r'"(seq|version)":(\d+)\}$')
+
+
+def parse_event_id(event_id: str | None) -> tuple[int, int] | None:
+    """(seq, version) from a ``Last-Event-ID``; None if there is none or it is malformed."""
+    seq, _, version = (event_id or "").partition(".")
+    if not (seq.isdigit() and version.isdigit()):
+        return None
+    return int(seq), int(version)
+
+
+def retry_event(retry_ms: int) -> str:
+    """Tell the browser to reconnect after ``retry_ms`` once this stream ends."""
+    return f"retry: {retry_ms}\n\n"
+
+
+class SSEConnection:
+    """The WebSocket side of a player's event stream: ``send_text`` queues a frame."""
+
+    def __init__(self, seq: int = 0, version: int = 0):
+        self.seq = seq
+        self.version = version
+        self._frames: asyncio.Queue[str | None] = asyncio.Queue(SSE_QUEUE_SIZE)
+        self._closed = False
+
+    async def accept(self) -> None:
+        """Nothing to accept: the response starts once the handshake is done."""
+
+    async def send_text(self, data: str) -> None:
+        if self._closed:
+            return
+        try:
+            self._frames.put_nowait(data)
+        except asyncio.QueueFull:
+            await self.close()
+
+    async def close(self, _code: int = 1000, _reason: str | None = None) -> None:
+        """End the stream after the frames already queued, or at once if it fell behind."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._frames.full():
+            while not self._frames.empty():
+                self._frames.get_nowait()
+        self._frames.put_nowait(None)
+
+    def event(self, frame: str) -> str:
+        """Format ``frame`` as an event, with the cursor it advances as the event id."""
+        if match := _CURSOR.search(frame):
+            if match[1] == "seq":
+                self.seq = max(self.seq, int(match[2]))
+            else:
+                self.version = max(self.version, int(match[2]))
+        return f"id: {self.seq}.{self.version}\ndata: {frame}\n\n"
+
+    async def events(self, keepalive: float) -> AsyncIterator[str]:
+        """Queued frames as events until closed, with a comment line when idle for
+        ``keepalive`` seconds so proxies keep the response open."""
+        while True:
+            try:
+                frame = await asyncio.wait_for(self._frames.get(), timeout=keepalive)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if frame is None:
+                return
+            yield self.event(frame)
@@ -1,99 +1,460 @@
 import asyncio
+import bisect
 import contextlib
 import logging
-from collections.abc import Awaitable, Callable
-from typing import TYPE_CHECKING, Any
+import random
+from collections.abc import Awaitable, Callable, Coroutine, Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Protocol
 
 from fastapi import WebSocket
+from prometheus_client.core import GaugeMetricFamily, HistogramMetricFamily, Metric
 
 if TYPE_CHECKING:
     from redis.asyncio.client import PubSub
 
-from app.core.redis import RedisClient
+from app.core.config import settings
+from app.core.keys import presence_key, room_changes_channel, room_channel, room_id_from_tagged
+from app.core.logging import sample_hot_path
+from app.core.metrics import (
+    BROADCAST_RENDER,
+    BROADCAST_SEND,
+    DRAIN_FORCED_CLOSES,
+    DRAIN_RECONNECT_HINTS,
+    WS_HANDSHAKE_REJECTED,
+    register_scrape_collector,
+    timed,
+    track_tasks,
+)
+from app.core.redis import RedisClient, TrafficClass
+from app.core.tracing import span
+from app.models.game import Game
 from app.schemas.game import GameStateSchema
 from app.schemas.socket import (
     MessageType,
+    PresenceDigestMessage,
+    PresenceDigestPayload,
     PresenceMessage,
     PresencePayload,
+    ReconnectMessage,
+    ReconnectPayload,
     StateUpdateMessage,
+    WSBaseMessage,
 )
+from app.services.game_service import GameService
+from app.services.game_store import load_for_handshake, parse_room_changed, publish_room_event
+from app.services.spectators import SpectatorStream
 
 logger = logging.getLogger(__name__)
 PRESENCE_TTL = 90  # seconds
 DISCONNECT_GRACE_PERIOD = 15  # seconds
+RECONNECT_HINT_GRACE = 1.0  # seconds a drained client gets past its hint before we close it
+SERVICE_RESTART = 1012  # Close code for sockets still open at the end of their drain delay
+
+
+class PlayerSocket(Protocol):
+    """What the fan-out writes a player's frames to: their WebSocket, or the
+    ``SSEConnection`` standing in for one."""
+
+    async def accept(self) -> None: ...
+
+    async def send_text(self, data: str, /) -> None: ...
+
+    async def close(self, code: int = 1000, /) -> None: ...
+
+
+@dataclass
+class RoomSnapshot:
+    """A room as loaded for a batch of connecting sockets; shared read-only between them."""
+
+    game: Game
+    presence: dict[str, bool]
+    version: int
+    seq: int
+    events: list[str]  # Buffered room events ending at ``seq``; loaded only for resumes
+
+    def events_after(self, seq: int) -> list[str] | None:
+        """The events a client that saw up to ``seq`` missed; None if they left the buffer."""
+        first = self.seq - len(self.events) + 1
+        if seq > self.seq or seq + 1 < first:
+            return None
+        return self.events[seq + 1 - first :]
+
+
+class HandshakeAdmission:
+    """Caps how many sockets on this node can be waiting on their room's load at once."""
+
+    def __init__(self):
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= settings.WS_HANDSHAKE_CONCURRENCY:
+            WS_HANDSHAKE_REJECTED.inc()
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    @staticmethod
+    def retry_after_ms() -> int:
+        """Spread over [base, 2 * base] so rejected clients don't all come back together."""
+        base = settings.WS_RETRY_AFTER_SECONDS * 1000
+        return int(random.uniform(base, 2 * base))
 
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: dict[str, dict[str, WebSocket]] = {}
-        self.pubsub: PubSub | None = None
-        self.listener_task: asyncio.Task | None = None
+        self.admission = HandshakeAdmission()
+        self.draining = False
+        self.active_connections: dict[str, dict[str, PlayerSocket]] = {}
+        # Spectators per room: one shared public view each, rendered once per version.
+        self.spectator_streams: dict[str, SpectatorStream] = {}
+        # Sockets between the start of connect() and their registration, per room.
+        self._connecting: dict[str, int] = {}
+        # Sockets waiting for their room's next shared load (client id, resuming, result), and
+        # the room's loader task. Spectators wait without a client id.
+        self._handshake_queue: dict[str, list[tuple[str | None, bool, asyncio.Future]]] = {}
+        self._handshake_loaders: dict[str, asyncio.Task] = {}
+        # Players that reconnected per room, waiting for the room's next PRESENCE_DIGEST.
+        self._reconnects: dict[str, dict[str, str]] = {}
+        # One pub/sub connection (and listener) per Redis shard that holds a local room.
+        self.pubsubs: dict[int, PubSub] = {}
+        self.listener_tasks: list[asyncio.Task] = []
         self._tasks: set[asyncio.Task] = set()
+        # Newest ROOM_CHANGED (version, trace id, state JSON) seen per room, and its render task.
+        self._latest_state: dict[str, tuple[int, str, str]] = {}
+        self._renderers: dict[str, asyncio.Task] = {}
 
-    async def _get_pubsub(self) -> "PubSub":
-        if not self.pubsub:
-            redis = RedisClient.get_client()
-            self.pubsub = redis.pubsub()
-            await self.pubsub.subscribe("system:keepalive")
-            self.listener_task = asyncio.create_task(self._listener_loop())
-        return self.pubsub
+    async def _get_pubsub(self, room_id: str) -> "PubSub":
+        """Pub/sub connection for the shard holding ``room_id``, started on first use."""
+        client = RedisClient.for_room(room_id, TrafficClass.PUBSUB)
+        pubsub = self.pubsubs.get(id(client))
+        if pubsub is None:
+            pubsub = client.pubsub()
+            await pubsub.subscribe("system:keepalive")
+            self.pubsubs[id(client)] = pubsub
+            self.listener_tasks.append(asyncio.create_task(self._listener_loop(pubsub)))
+        return pubsub
 
-    async def _listener_loop(self):
-        if not self.pubsub:
-            return
-
-        async def send_safe(ws: WebSocket, data: str):
+    async def _listener_loop(self, pubsub: "PubSub"):
+        async def send_safe(ws: PlayerSocket, data: str):
             with contextlib.suppress(Exception):
                 await ws.send_text(data)
 
-        async for message in self.pubsub.listen():
-            if message["type"] == "message":
-                channel = message["channel"]
-                data = message["data"]
-                if channel.startswith("room:"):
-                    room_id = channel.split(":")[1]
-                    if room_id in self.active_connections:
-                        connections = list(self.active_connections[room_id].values())
-                        await asyncio.gather(*(send_safe(ws, data) for ws in connections))
-
-    async def connect(self, room_id: str, client_id: str, websocket: WebSocket):
-        await websocket.accept()
+        # Redis Cluster spreads shard subscriptions over one connection per node.
+        read = getattr(pubsub, "get_sharded_message", None) or pubsub.get_message
+        while True:
+            message = await read(ignore_subscribe_messages=True, timeout=1.0)
+            if message is None:
+                continue
+            if message["type"] not in ("message", "smessage"):
+                continue
+
+            channel = message["channel"]
+            data = message["data"]
+            if not channel.startswith("room:"):
+                continue
+            room_id = room_id_from_tagged(channel)
+            if room_id not in self.active_connections:
+                continue
+            if channel == room_changes_channel(room_id):
+                # Full state: only ever rendered into per-player views, never relayed.
+                self._schedule_state_broadcast(room_id, *parse_room_changed(data))
+            elif channel == room_channel(room_id):
+                connections = list(self.active_connections[room_id].values())
+                await asyncio.gather(*(send_safe(ws, data) for ws in connections))
+
+    def _schedule_state_broadcast(self, room_id: str, version: int, trace_id: str, state: str):
+        """Queue a render of the room's new state; superseded versions are skipped."""
+        latest = self._latest_state.get(room_id)
+        if latest and latest[0] >= version:
+            return
+        self._latest_state[room_id] = (version, trace_id, state)
+        if room_id not in self._renderers:
+            self._renderers[room_id] = self._spawn(self._render_loop(room_id))
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _render_loop(self, room_id: str):
+        rendered = 0
+        try:
+            while (latest := self._latest_state.get(room_id)) and latest[0] > rendered:
+                rendered, trace_id, state = latest
+                # Traced under the request that saved this version, wherever it ran.
+                with span("broadcast", trace_id=trace_id or None, version=rendered):
+                    try:
+                        await self._broadcast_state(room_id, Game.from_json(state), rendered)
+                    except Exception:
+                        logger.exception(f"Failed to broadcast state for room {room_id}")
+        finally:
+            self._renderers.pop(room_id, None)
+            if room_id not in self.active_connections:
+                self._latest_state.pop(room_id, None)
+
+    async def _broadcast_state(self, room_id: str, game: Game, version: int | None = None):
+        """Send each local socket in the room its own filtered view of ``game``, and queue
+        the public view once for the room's spectators."""
+        service = GameService()
+        with span("broadcast.presence", players=len(game.players), phase=game.phase.value):
+            presence_map = await service.get_all_player_presence(room_id, list(game.players.keys()))
+
+        stream = self.spectator_streams.get(room_id)
+        if stream is not None and version is not None:
+            with span("broadcast.spectators", spectators=len(stream.sockets)):
+                await self._publish_spectator_view(stream, game, presence_map, version)
+
+        async def get_view(player_id: str):
+            return await service.get_player_view(game, player_id, presence_map)
+
+        await self.broadcast_filtered_game_states(room_id, get_view, version)
+
+    async def _publish_spectator_view(
+        self, stream: SpectatorStream, game: Game, presence: dict[str, bool], version: int
+    ) -> None:
+        if version <= stream.version:
+            return
+        with timed(BROADCAST_RENDER):
+            view = await GameService().get_spectator_view(game, presence, stream.delay)
+            message = StateUpdateMessage(room_id=stream.room_id, payload=view, version=version)
+            frame = message.model_dump_json()
+        stream.publish(version, frame)
+
+    async def connect(
+        self, room_id: str, client_id: str, websocket: PlayerSocket, resuming: bool = False
+    ) -> tuple[RoomSnapshot, bool] | None:
+        """Load the room, mark the client online and accept the socket.
+
+        Returns the room snapshot, shared with the sockets loaded in the same batch, and
+        whether the client was already online. Returns None without accepting when the room
+        does not exist. ``resuming`` loads the room's event buffer into the snapshot.
+        """
+        self._connecting[room_id] = self._connecting.get(room_id, 0) + 1
+        try:
+            loaded = await self._load_shared(room_id, client_id, resuming)
+            if loaded is not None:
+                await websocket.accept()
+                self.active_connections.setdefault(room_id, {})[client_id] = websocket
+        finally:
+            self._connecting[room_id] -= 1
+            if not self._connecting[room_id]:
+                del self._connecting[room_id]
+            await self._release_room(room_id)
+        return loaded
+
+    async def connect_spectator(self, room_id: str, websocket: WebSocket) -> bool:
+        """Accept a spectator onto the room's shared stream; False without accepting when the
+        room does not exist. Only the room's first spectator on this node loads it."""
+        self._connecting[room_id] = self._connecting.get(room_id, 0) + 1
+        try:
+            stream = self.spectator_streams.get(room_id)
+            if stream is None:
+                stream = SpectatorStream(room_id, settings.SPECTATOR_DELAY_SECONDS)
+                self.spectator_streams[room_id] = stream
+                self._spawn(self._prime_spectators(stream))
+            if not await asyncio.shield(stream.ready):
+                return False
+            await websocket.accept()
+            await stream.add(websocket)
+            return True
+        finally:
+            self._connecting[room_id] -= 1
+            if not self._connecting[room_id]:
+                del self._connecting[room_id]
+            await self._release_room(room_id)
+
+    async def _prime_spectators(self, stream: SpectatorStream) -> None:
+        """Queue the room's current public view as the stream's first frame."""
+        room_id = stream.room_id
+        try:
+            loaded = await self._load_shared(room_id, None, False)
+            if loaded is not None:
+                snapshot = loaded[0]
+                await self._publish_spectator_view(
+                    stream, snapshot.game, snapshot.presence, snapshot.version
+                )
+        except Exception as e:
+            loaded = None
+            stream.ready.set_exception(e)
+        else:
+            stream.ready.set_result(loaded is not None)
+        if loaded is None and self.spectator_streams.get(room_id) is stream:
+            # The next spectator tries again.
+            del self.spectator_streams[room_id]
+
+    async def disconnect_spectator(self, room_id: str, websocket: WebSocket) -> None:
+        stream = self.spectator_streams.get(room_id)
+        if stream is not None:
+            stream.remove(websocket)
+            await self._release_room(room_id)
+
+    async def _load_shared(
+        self, room_id: str, client_id: str | None, resuming: bool
+    ) -> tuple[RoomSnapshot, bool] | None:
+        future = asyncio.get_running_loop().create_future()
+        self._handshake_queue.setdefault(room_id, []).append((client_id, resuming, future))
+        if room_id not in self._handshake_loaders:
+            self._handshake_loaders[room_id] = self._spawn(self._handshake_loop(room_id))
+        return await future
+
+    async def _handshake_loop(self, room_id: str) -> None:
+        """Load the room once per batch of waiting sockets, until none are left.
+
+        Sockets that arrive while a load is in flight wait for the next one, so a reconnect
+        storm costs one round trip and one parse per room per batch instead of per socket.
+        """
+        try:
+            while waiters := self._handshake_queue.pop(room_id, None):
+                try:
+                    loaded = await self._load_batch(
+                        room_id,
+                        [cid for cid, _, _ in waiters if cid is not None],
+                        with_events=any(resuming for _, resuming, _ in waiters),
+                    )
+                except Exception as e:
+                    for *_, future in waiters:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for client_id, _, future in waiters:
+                    if not future.done():
+                        future.set_result(
+                            None if loaded is None else (loaded[0], client_id in loaded[1])
+                        )
+        finally:
+            self._handshake_loaders.pop(room_id, None)
+
+    async def _load_batch(
+        self, room_id: str, client_ids: list[str], with_events: bool
+    ) -> tuple[RoomSnapshot, set[str]] | None:
+        """The room snapshot and which of ``client_ids`` were already online."""
         if room_id not in self.active_connections:
+            # Subscribe before the first load, so no change saved after it can be missed.
             self.active_connections[room_id] = {}
-            pubsub = await self._get_pubsub()
-            await pubsub.subscribe(f"room:{room_id}")
+            pubsub = await self._get_pubsub(room_id)
+            await pubsub.ssubscribe(room_channel(room_id), room_changes_channel(room_id))
+
+        with span("ws.handshake.load", sockets=len(client_ids)):
+            handshake = await load_for_handshake(
+                room_id, list(dict.fromkeys(client_ids)), PRESENCE_TTL, with_events
+            )
+            if handshake is None:
+                return None
+            game = Game.from_json(handshake.state)
+        presence = {pid: pid in handshake.online for pid in game.players}
+        snapshot = RoomSnapshot(game, presence, handshake.version, handshake.seq, handshake.events)
+        return snapshot, handshake.was_online
 
-        redis = RedisClient.get_client()
-        was_online = await redis.exists(f"presence:{room_id}:{client_id}")
+    async def _release_room(self, room_id: str) -> None:
+        """Unsubscribe once no socket is connected or connecting to the room."""
+        stream = self.spectator_streams.get(room_id)
+        if (
+            not self.active_connections.get(room_id, True)
+            and room_id not in self._connecting
+            and not (stream and stream.sockets)
+        ):
+            await self._unsubscribe(room_id)
+
+    async def _unsubscribe(self, room_id: str) -> None:
+        """Drop the room's (empty) connection map, spectator stream and subscription."""
+        self.active_connections.pop(room_id, None)
+        stream = self.spectator_streams.pop(room_id, None)
+        if stream is not None:
+            await stream.close()
+        if room_id not in self._renderers:
+            self._latest_state.pop(room_id, None)
+        pubsub = self.pubsubs.get(id(RedisClient.for_room(room_id, TrafficClass.PUBSUB)))
+        if pubsub:
+            await pubsub.sunsubscribe(room_channel(room_id), room_changes_channel(room_id))
+
+    async def drain(self, window: float) -> None:
+        """Move every socket off this node over ``window`` seconds.
+
+        Each client gets a RECONNECT hint with its own random delay, and is closed with 1012
+        (Service Restart) shortly after it if it is still here, so the other nodes see the
+        reconnects spread out rather than all at once. The route turns new sockets away with
+        a retry-after from the moment draining starts.
+        """
+        self.draining = True
+        sockets: list[tuple[str, str | None, PlayerSocket]] = [
+            (room_id, client_id, ws)
+            for room_id, connections in list(self.active_connections.items())
+            for client_id, ws in list(connections.items())
+        ]
+        sockets += [
+            (room_id, None, ws)
+            for room_id, stream in list(self.spectator_streams.items())
+            for ws in list(stream.sockets)
+        ]
+        logger.info(f"Draining {len(sockets)} sockets over {window:.1f}s")
+        spread = max(window - RECONNECT_HINT_GRACE, 0.0)
+        await asyncio.gather(
+            *(self._drain_socket(*socket, random.uniform(0, spread)) for socket in sockets)
+        )
+        # Sockets that finished their handshake after the hints went out.
+        hinted = {id(ws) for *_, ws in sockets}
+        late = [
+            ws for connections in self.active_connections.values() for ws in connections.values()
+        ]
+        late += [ws for stream in self.spectator_streams.values() for ws in stream.sockets]
+        for ws in late:
+            if id(ws) in hinted:
+                continue
+            DRAIN_FORCED_CLOSES.inc()
+            with contextlib.suppress(Exception):
+                await ws.close(SERVICE_RESTART)
+
+    async def _drain_socket(
+        self, room_id: str, client_id: str | None, ws: PlayerSocket, delay: float
+    ):
+        hint = ReconnectMessage(
+            room_id=room_id, payload=ReconnectPayload(delay_ms=int(delay * 1000))
+        )
+        with contextlib.suppress(Exception):
+            await ws.send_text(hint.model_dump_json())
+            DRAIN_RECONNECT_HINTS.inc()
+        await asyncio.sleep(delay + RECONNECT_HINT_GRACE)
+        if client_id is None:
+            stream = self.spectator_streams.get(room_id)
+            still_here = stream is not None and ws in stream.sockets
+        else:
+            still_here = self.active_connections.get(room_id, {}).get(client_id) is ws
+        if still_here:
+            DRAIN_FORCED_CLOSES.inc()
+            with contextlib.suppress(Exception):
+                await ws.close(SERVICE_RESTART)
 
-        self.active_connections[room_id][client_id] = websocket
-        await self.update_presence(room_id, client_id)
-        return was_online > 0
+    async def flush(self, timeout: float) -> None:
+        """Wait up to ``timeout`` seconds for queued renders and presence digests to go out."""
+        if self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=timeout)
 
     async def disconnect(self, room_id: str, client_id: str):
         if room_id in self.active_connections:
             self.active_connections[room_id].pop(client_id, None)
-            if not self.active_connections[room_id]:
-                del self.active_connections[room_id]
-                if self.pubsub:
-                    await self.pubsub.unsubscribe(f"room:{room_id}")
+            await self._release_room(room_id)
 
         # Set a short TTL for grace period instead of removing immediately
-        redis = RedisClient.get_client()
-        await redis.expire(f"presence:{room_id}:{client_id}", DISCONNECT_GRACE_PERIOD)
+        redis = RedisClient.for_room(room_id, TrafficClass.PRESENCE)
+        await redis.expire(presence_key(room_id, client_id), DISCONNECT_GRACE_PERIOD)
 
     async def update_presence(self, room_id: str, client_id: str):
         """Update presence key with TTL. Called on connect and heartbeat."""
-        redis = RedisClient.get_client()
-        await redis.set(f"presence:{room_id}:{client_id}", "1", ex=PRESENCE_TTL)
+        redis = RedisClient.for_room(room_id, TrafficClass.PRESENCE)
+        await redis.set(presence_key(room_id, client_id), "1", ex=PRESENCE_TTL)
 
     async def remove_presence(self, room_id: str, client_id: str):
         """Remove presence and broadcast disconnect."""
-        redis = RedisClient.get_client()
-        await redis.delete(f"presence:{room_id}:{client_id}")
+        redis = RedisClient.for_room(room_id, TrafficClass.PRESENCE)
+        await redis.delete(presence_key(room_id, client_id))
 
     async def broadcast_disconnect(self, room_id: str, player_id: str, nickname: str):
-        """Broadcast player disconnect via Redis pubsub."""
+        """Broadcast player disconnect via Redis sharded pubsub."""
         message = PresenceMessage(
             type=MessageType.PLAYER_DISCONNECTED,
             room_id=room_id,
@@ -101,20 +462,42 @@ class ConnectionManager:
         )
         await self.broadcast_to_room(room_id, message)
 
-    async def broadcast_reconnect(self, room_id: str, player_id: str, nickname: str):
-        """Broadcast player reconnect via Redis pubsub."""
-        message = PresenceMessage(
-            type=MessageType.PLAYER_RECONNECTED,
+    def queue_reconnect(self, room_id: str, player_id: str, nickname: str):
+        """Announce the player in the room's next PRESENCE_DIGEST.
+
+        Reconnects within ``WS_PRESENCE_DIGEST_SECONDS`` of the first go out together, so a
+        room reconnecting after a deploy gets one message instead of one per player.
+        """
+        pending = self._reconnects.get(room_id)
+        if pending is None:
+            pending = self._reconnects[room_id] = {}
+            self._spawn(self._flush_reconnects(room_id))
+        pending[player_id] = nickname
+
+    async def _flush_reconnects(self, room_id: str):
+        await asyncio.sleep(settings.WS_PRESENCE_DIGEST_SECONDS)
+        reconnected = self._reconnects.pop(room_id, {})
+        message = PresenceDigestMessage(
             room_id=room_id,
-            payload=PresencePayload(player_id=player_id, nickname=nickname),
+            payload=PresenceDigestPayload(
+                reconnected=[
+                    PresencePayload(player_id=pid, nickname=nickname)
+                    for pid, nickname in reconnected.items()
+                ]
+            ),
         )
-        await self.broadcast_to_room(room_id, message)
+        try:
+            await self.broadcast_to_room(room_id, message)
+        except Exception as e:
+            logger.warning(f"Failed to broadcast presence digest for room {room_id}: {e}")
 
-    async def broadcast_to_room(self, room_id: str, message: Any):
-        redis = RedisClient.get_client()
-        # Ensure we use model_dump_json if it's a Pydantic model
-        data = message.model_dump_json() if hasattr(message, "model_dump_json") else str(message)
-        await redis.publish(f"room:{room_id}", data)
+    async def broadcast_to_room(self, room_id: str, message: WSBaseMessage):
+        """Publish a room event to every socket in the room, on every node.
+
+        The event is numbered and kept in the room's ring buffer, so a client that
+        reconnects can be sent what it missed (see ``RoomSnapshot.events_after``).
+        """
+        await publish_room_event(room_id, message.model_dump_json(exclude={"seq"}))
 
     async def broadcast_game_state(self, room_id: str, game_state: GameStateSchema):
         """Broadcast game state update to all players in room.
@@ -122,27 +505,37 @@ class ConnectionManager:
         NOTE: This sends the SAME state to all players.
         For role-filtered views, use broadcast_filtered_game_states instead.
         """
-        logger.info(f"Broadcasting game state for room {room_id}, phase: {game_state.phase}")
+        if sample_hot_path(logger):
+            logger.info("Broadcasting game state for room %s, phase: %s", room_id, game_state.phase)
         message = StateUpdateMessage(room_id=room_id, payload=game_state)
         await self.broadcast_to_room(room_id, message)
 
     async def broadcast_filtered_game_states(
-        self, room_id: str, get_player_view_fn: Callable[[str], Awaitable[GameStateSchema]]
+        self,
+        room_id: str,
+        get_player_view_fn: Callable[[str], Awaitable[GameStateSchema]],
+        version: int | None = None,
     ):
         """Send player-specific filtered game state to each connected player.
 
         Args:
             room_id: The room to broadcast to
             get_player_view_fn: Async function that takes (game, player_id) and returns filtered state
+            version: Version of the state being sent, if known
         """
         if room_id not in self.active_connections:
             return
 
-        async def send_to_one(player_id: str, ws: WebSocket):
+        async def send_to_one(player_id: str, ws: PlayerSocket):
             try:
-                filtered_state = await get_player_view_fn(player_id)
-                message = StateUpdateMessage(room_id=room_id, payload=filtered_state)
-                await ws.send_text(message.model_dump_json())
+                with span("broadcast.render"), timed(BROADCAST_RENDER):
+                    filtered_state = await get_player_view_fn(player_id)
+                    message = StateUpdateMessage(
+                        room_id=room_id, payload=filtered_state, version=version
+                    )
+                    data = message.model_dump_json()
+                with span("ws.send", bytes=len(data)), timed(BROADCAST_SEND):
+                    await ws.send_text(data)
             except Exception as e:
                 logger.warning(f"Failed to send filtered state to {player_id}: {e}")
 
@@ -166,3 +559,39 @@ class ConnectionManager:
 
 
 manager = ConnectionManager()
+
+
+def _collect_connection_metrics() -> Iterable[Metric]:
+    rooms = manager.active_connections
+    yield GaugeMetricFamily(
+        "werewolf_active_rooms", "Rooms with at least one socket on this node.", len(rooms)
+    )
+    sizes = sorted(len(sockets) for sockets in rooms.values())
+    buckets = [
+        (str(bound), bisect.bisect_right(sizes, bound)) for bound in (1, 2, 4, 8, 12, 16, 24, 32)
+    ]
+    yield HistogramMetricFamily(
+        "werewolf_room_sockets",
+        "Sockets per active room on this node.",
+        buckets=[*buckets, ("+Inf", len(sizes))],
+        sum_value=sum(sizes),
+    )
+
+    yield GaugeMetricFamily(
+        "werewolf_spectators",
+        "Spectator sockets on this node.",
+        sum(len(stream.sockets) for stream in manager.spectator_streams.values()),
+    )
+
+    yield GaugeMetricFamily(
+        "werewolf_draining", "1 while this node is draining its sockets.", int(manager.draining)
+    )
+    yield GaugeMetricFamily(
+        "werewolf_ws_handshakes_in_flight",
+        "Sockets on this node waiting on their room's handshake load.",
+        manager.admission.in_flight,
+    )
+
+
+register_scrape_collector(_collect_connection_metrics)
+track_tasks("connection_manager", lambda: len(manager._tasks))
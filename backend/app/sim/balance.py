@@ -0,0 +1,220 @@
+"""Offline pipeline that builds ``app/models/balance_table.json``.
+
+For each player count, candidate distributions are played with the kernel's heuristic
+bots. Each candidate is 1 to 40% werewolves plus the first k special roles of
+``SPECIAL_ROLES``. The candidates closest to an even villagers-vs-werewolves split are
+replayed with more games, and the closest one wins, preferring more special roles when two
+are within ``--tolerance``. A few random mixes are played too, never chosen, so that the
+logistic model of the villager win rate, fitted on every candidate played, sees more than
+one of a role. The model covers distributions the table doesn't hold. Needs the ``sim``
+extra (NumPy).
+
+    python -m app.sim.balance                           # 3 to 40 players, rewrites the table
+    python -m app.sim.balance --players 5 12 --games 1000 --output /tmp/table.json
+"""
+
+import argparse
+import json
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.models.balance import (
+    BALANCE_TABLE_PATH,
+    BALANCE_TABLE_VERSION,
+    FEATURES,
+    SPECIAL_ROLES,
+    balance_features,
+    normalize_distribution,
+)
+from app.schemas.game import RoleType
+from app.sim import kernel
+from app.sim.batch import game_seed
+from app.sim.simulator import RoleSetup
+
+BOTS = "heuristic"
+
+
+@dataclass
+class Candidate:
+    roles: dict[RoleType, int]
+    specials: int  # Distinct special roles, the tie-break between equally balanced ones
+    structured: bool  # False for the random mixes, which only feed the model
+    games: int = 0
+    villager_win: float = 0.0
+    werewolf_win: float = 0.0
+
+    @property
+    def imbalance(self) -> float:
+        return abs(self.villager_win - self.werewolf_win)
+
+
+def candidates(players: int, extra: int, rng: random.Random) -> list[Candidate]:
+    max_wolves = max(1, min(math.ceil(players * 0.4), (players - 1) // 2))
+    seen: set[tuple] = set()
+    out = []
+
+    def add(roles: dict[RoleType, int], structured: bool) -> None:
+        try:
+            roles = normalize_distribution(players, roles)
+        except ValueError:
+            return
+        key = tuple(sorted(roles.items()))
+        if key not in seen:
+            seen.add(key)
+            out.append(Candidate(roles, sum(1 for r in SPECIAL_ROLES if roles[r]), structured))
+
+    for wolves in range(1, max_wolves + 1):
+        for k in range(len(SPECIAL_ROLES) + 1):
+            add({RoleType.WEREWOLF: wolves} | dict.fromkeys(SPECIAL_ROLES[:k], 1), True)
+    for _ in range(extra):
+        add(
+            {RoleType.WEREWOLF: rng.randint(1, max_wolves)}
+            | {role: rng.choice((0, 0, 1, 1, 2)) for role in SPECIAL_ROLES},
+            False,
+        )
+    return out
+
+
+def evaluate(candidate: Candidate, players: int, games: int, seed: int) -> None:
+    winners = kernel.play(RoleSetup.of(players, candidate.roles), games, seed, BOTS)
+    counts = np.bincount(winners, minlength=len(kernel.WINNERS))
+    candidate.games = games
+    candidate.villager_win = counts[kernel.WINNERS.index("VILLAGERS")] / games
+    candidate.werewolf_win = counts[kernel.WINNERS.index("WEREWOLVES")] / games
+
+
+def balance_players(
+    players: int,
+    games: int,
+    refine: int,
+    refine_games: int,
+    extra: int,
+    tolerance: float,
+    seed: int,
+) -> tuple[Candidate, list[Candidate]]:
+    """The chosen distribution for ``players`` and every candidate played."""
+    pool = candidates(players, extra, random.Random(game_seed(seed, players, -1)))
+    for i, candidate in enumerate(pool):
+        evaluate(candidate, players, games, game_seed(seed, players, i))
+    finalists = sorted((c for c in pool if c.structured), key=lambda c: c.imbalance)[:refine]
+    for i, candidate in enumerate(finalists):
+        evaluate(candidate, players, refine_games, game_seed(seed, players, len(pool) + i))
+    best = min(c.imbalance for c in finalists)
+    chosen = max(
+        (c for c in finalists if c.imbalance <= best + tolerance),
+        key=lambda c: (c.specials, -c.imbalance),
+    )
+    return chosen, pool
+
+
+def fit_model(rows: list[tuple[list[float], float, int]], ridge: float = 1e-3) -> list[float]:
+    """Weighted logistic regression of win rates on features, by Newton's method."""
+    x = np.array([features for features, _, _ in rows])
+    y = np.array([rate for _, rate, _ in rows])
+    n = np.array([games for _, _, games in rows], dtype=float)
+    n /= n.mean()
+    w = np.zeros(x.shape[1])
+    for _ in range(50):
+        p = 1 / (1 + np.exp(-x @ w))
+        gradient = x.T @ (n * (p - y)) + ridge * w
+        hessian = (x.T * (n * p * (1 - p))) @ x + ridge * np.eye(len(w))
+        step = np.linalg.solve(hessian, gradient)
+        w -= step
+        if np.abs(step).max() < 1e-9:
+            break
+    return [float(v) for v in w]
+
+
+def build_table(
+    player_counts: list[int],
+    games: int = 2_000,
+    refine: int = 4,
+    refine_games: int = 20_000,
+    extra: int = 24,
+    tolerance: float = 0.02,
+    seed: int = 0,
+    workers: int | None = None,
+) -> dict[str, Any]:
+    jobs = [(n, games, refine, refine_games, extra, tolerance, seed) for n in player_counts]
+    if workers == 0:
+        results = [balance_players(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(balance_players, *zip(*jobs, strict=True)))
+
+    entries, rows = {}, []
+    for players, (chosen, played) in zip(player_counts, results, strict=True):
+        entries[str(players)] = {
+            "roles": {role.value: count for role, count in chosen.roles.items() if count},
+            "villager_win": round(chosen.villager_win, 4),
+            "werewolf_win": round(chosen.werewolf_win, 4),
+        }
+        rows += [(balance_features(players, c.roles), c.villager_win, c.games) for c in played]
+
+    weights = fit_model(rows)
+    x = np.array([features for features, _, _ in rows])
+    predicted = 1 / (1 + np.exp(-x @ np.array(weights)))
+    rmse = float(np.sqrt(np.mean((predicted - np.array([rate for _, rate, _ in rows])) ** 2)))
+    return {
+        "version": BALANCE_TABLE_VERSION,
+        "generated_by": {
+            "policy": BOTS,
+            "games": games,
+            "refine_games": refine_games,
+            "seed": seed,
+            "candidates": len(rows),
+        },
+        "players": entries,
+        "model": {"features": list(FEATURES), "weights": weights, "rmse": round(rmse, 4)},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, nargs=2, default=[3, 40], metavar=("MIN", "MAX"))
+    parser.add_argument("--games", type=int, default=2_000, help="Games per candidate")
+    parser.add_argument("--refine", type=int, default=4, help="Finalists replayed per count")
+    parser.add_argument("--refine-games", type=int, default=20_000)
+    parser.add_argument("--extra", type=int, default=24, help="Random mixes per count")
+    parser.add_argument("--tolerance", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="0 runs in-process")
+    parser.add_argument("--output", type=Path, default=BALANCE_TABLE_PATH)
+    args = parser.parse_args()
+
+    low, high = args.players
+    table = build_table(
+        list(range(low, high + 1)),
+        args.games,
+        args.refine,
+        args.refine_games,
+        args.extra,
+        args.tolerance,
+        args.seed,
+        args.workers,
+    )
+    # One line per top-level key and per player count keeps regenerated tables diffable.
+    players = ",\n".join(
+        f"    {json.dumps(n)}: {json.dumps(e)}" for n, e in table["players"].items()
+    )
+    lines = [
+        f"  {json.dumps(key)}: {{\n{players}\n  }}"
+        if key == "players"
+        else f"  {json.dumps(key)}: {json.dumps(value)}"
+        for key, value in table.items()
+    ]
+    args.output.write_text("{\n" + ",\n".join(lines) + "\n}\n")
+    print(f"Wrote {len(table['players'])} player counts to {args.output}")
+    print(
+        f"Model RMSE over {table['generated_by']['candidates']} candidates: {table['model']['rmse']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Fans simulated games out over a process pool and streams win rates per role setup.
+
+Games are cut into chunks of consecutive game indexes per setup. Each game's seed is derived
+from ``(seed, setup, game index)`` alone, so totals do not depend on the chunk size, the
+worker count or the order chunks finish in.
+
+    python -m app.sim.batch --players 5 8 12 --games 100000
+    python -m app.sim.batch --setup 8:werewolf=2,seer=1,doctor=1 --wolves random
+
+Prints one JSON line per setup each time a chunk finishes, with the running totals.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.sim.policies import POLICIES
+from app.sim.simulator import RoleSetup, simulate_game
+
+
+@dataclass
+class SetupStats:
+    """Running totals for one role setup."""
+
+    setup: RoleSetup
+    games: int = 0
+    rounds: int = 0
+    wins: Counter[str] = field(default_factory=Counter)
+
+    def merge(self, other: "SetupStats") -> None:
+        self.games += other.games
+        self.rounds += other.rounds
+        self.wins.update(other.wins)
+
+    def win_rates(self) -> dict[str, float]:
+        return {team: wins / self.games for team, wins in sorted(self.wins.items())}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "setup": self.setup.label,
+            "games": self.games,
+            "mean_rounds": round(self.rounds / self.games, 3) if self.games else None,
+            "win_rates": {team: round(rate, 5) for team, rate in self.win_rates().items()},
+        }
+
+
+def game_seed(seed: int, setup_index: int, game_index: int) -> int:
+    digest = hashlib.blake2b(f"{seed}:{setup_index}:{game_index}".encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), "big")
+
+
+def play_chunk(
+    setup: RoleSetup,
+    setup_index: int,
+    games: range,
+    seed: int,
+    village: str,
+    wolves: str,
+) -> SetupStats:
+    stats = SetupStats(setup)
+    for game_index in games:
+        result = simulate_game(setup, game_seed(seed, setup_index, game_index), village, wolves)
+        stats.games += 1
+        stats.rounds += result.rounds
+        stats.wins[result.winner] += 1
+    return stats
+
+
+def _quiet_worker() -> None:
+    # check_and_advance logs every phase resolution at INFO.
+    logging.disable(logging.INFO)
+
+
+def run_batch(
+    setups: list[RoleSetup],
+    games: int,
+    seed: int = 0,
+    workers: int | None = None,
+    chunk_size: int = 500,
+    village: str = "heuristic",
+    wolves: str = "heuristic",
+) -> Iterator[SetupStats]:
+    """Play ``games`` games of every setup and yield a setup's running totals after each chunk.
+
+    ``workers=0`` plays in this process. Only a few chunks per worker are queued at a time,
+    so memory stays flat however many games are asked for.
+    """
+    chunks = (
+        (index, setup, range(start, min(start + chunk_size, games)))
+        for start in range(0, games, chunk_size)
+        for index, setup in enumerate(setups)
+    )
+    totals = [SetupStats(setup) for setup in setups]
+
+    if workers == 0:
+        for index, setup, span in chunks:
+            totals[index].merge(play_chunk(setup, index, span, seed, village, wolves))
+            yield totals[index]
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers, initializer=_quiet_worker) as pool:
+        pending: dict[Future[SetupStats], int] = {}
+        while True:
+            for index, setup, span in chunks:
+                future = pool.submit(play_chunk, setup, index, span, seed, village, wolves)
+                pending[future] = index
+                if len(pending) >= workers * 4:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                totals[index].merge(future.result())
+                yield totals[index]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, nargs="*", default=[], help="Balanced setups")
+    parser.add_argument(
+        "--setup", action="append", default=[], help="PLAYERS:role=count,... (repeatable)"
+    )
+    parser.add_argument("--games", type=int, default=10_000, help="Games per setup")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="0 plays in-process")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--village", choices=sorted(POLICIES), default="heuristic")
+    parser.add_argument("--wolves", choices=sorted(POLICIES), default="heuristic")
+    args = parser.parse_args()
+
+    setups = [RoleSetup.balanced(n) for n in args.players]
+    setups += [RoleSetup.parse(text) for text in args.setup]
+    if not setups:
+        parser.error("give --players or --setup")
+
+    _quiet_worker()
+    for stats in run_batch(
+        setups, args.games, args.seed, args.workers, args.chunk_size, args.village, args.wolves
+    ):
+        print(json.dumps(stats.to_dict()), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+"""Vectorised Monte Carlo kernel: thousands of games of one role setup as NumPy arrays.
+
+Each game is a row; each seat a column. Roles are codes into ``ROLES``, and a seat index of
+-1 means "nobody". The resolve functions follow ``NightState.resolve``,
+``DayState.resolve`` and ``HunterRevengeState.resolve`` exactly (kills minus saves, hunter
+revenge, the lovers' pact, plurality voting, the Tanner and every win condition) for every
+row at once. ``tests/test_sim_kernel.py`` checks them against the object model on sampled
+games.
+
+``RandomBots`` and ``HeuristicBots`` play the policies of ``app.sim.policies`` with a NumPy
+generator, so win rates match the object-level simulator in distribution but not game by
+game. Needs the ``sim`` extra (NumPy).
+
+    python -m app.sim.kernel --players 5 9 12 --games 100000
+"""
+
+import argparse
+import json
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from app.models.game import Game
+from app.schemas.game import NightActionType, RoleType
+from app.sim.simulator import STALEMATE, RoleSetup
+
+ROLES: tuple[RoleType, ...] = tuple(RoleType)
+ACTIONS: tuple[NightActionType, ...] = tuple(NightActionType)
+# Winner codes; 0 is "no winner yet" and is reported as a stalemate if the game never ends.
+WINNERS = (STALEMATE, "VILLAGERS", "WEREWOLVES", "LOVERS", "TANNER")
+
+NOBODY = -1
+_WOLF = ROLES.index(RoleType.WEREWOLF)
+_DOCTOR = ROLES.index(RoleType.DOCTOR)
+_BODYGUARD = ROLES.index(RoleType.BODYGUARD)
+_WITCH = ROLES.index(RoleType.WITCH)
+_HUNTER = ROLES.index(RoleType.HUNTER)
+_TANNER = ROLES.index(RoleType.TANNER)
+_SPECTATOR = ROLES.index(RoleType.SPECTATOR)
+_SEER = ROLES.index(RoleType.SEER)
+_LYCAN = ROLES.index(RoleType.LYCAN)
+_HEAL = ACTIONS.index(NightActionType.HEAL)
+_POISON = ACTIONS.index(NightActionType.POISON)
+_VILLAGERS, _WEREWOLVES, _LOVERS, _TANNER_WIN = 1, 2, 3, 4
+
+
+@dataclass
+class GameArrays:
+    """The resolution-relevant state of many games with the same number of seats."""
+
+    roles: np.ndarray  # (games, seats) codes into ROLES
+    alive: np.ndarray  # (games, seats) bool
+    lovers: np.ndarray  # (games, 2) seats, NOBODY before Cupid links
+    winner: np.ndarray  # (games,) codes into WINNERS
+    witch_heal: np.ndarray  # (games, seats) bool, potions left
+    witch_poison: np.ndarray  # (games, seats) bool
+    last_protected: np.ndarray  # (games, seats) seat each bodyguard guarded last night
+    reveals: np.ndarray  # (games, seer seat, seat) bool, ``Game.seer_reveals``
+
+    @classmethod
+    def deal(cls, setup: RoleSetup, games: int, rng: np.random.Generator) -> "GameArrays":
+        """Shuffle ``setup`` into ``games`` fresh games, as ``Game.assign_roles`` does."""
+        deck = [ROLES.index(role) for role, count in setup.roles for _ in range(count)]
+        deck += [ROLES.index(RoleType.VILLAGER)] * (setup.players - len(deck))
+        roles = rng.permuted(np.tile(np.array(deck, dtype=np.int8), (games, 1)), axis=1)
+        seats = (games, setup.players)
+        return cls(
+            roles=roles,
+            alive=np.ones(seats, dtype=bool),
+            lovers=np.full((games, 2), NOBODY, dtype=np.int32),
+            winner=np.zeros(games, dtype=np.int8),
+            witch_heal=np.ones(seats, dtype=bool),
+            witch_poison=np.ones(seats, dtype=bool),
+            last_protected=np.full(seats, NOBODY, dtype=np.int32),
+            reveals=np.zeros((games, setup.players, setup.players), dtype=bool),
+        )
+
+    @classmethod
+    def from_games(cls, games: list[Game]) -> "GameArrays":
+        """Arrays for ``Game`` objects with equal player counts; seats follow player order."""
+        rows = []
+        for game in games:
+            seat = {pid: i for i, pid in enumerate(game.players)}
+            players = list(game.players.values())
+            rows.append(
+                (
+                    [ROLES.index(p.role or RoleType.SPECTATOR) for p in players],
+                    [p.is_alive for p in players],
+                    [seat[pid] for pid in game.lovers] or [NOBODY, NOBODY],
+                    WINNERS.index(game.winners) if game.winners else 0,
+                    [p.witch_has_heal for p in players],
+                    [p.witch_has_poison for p in players],
+                    [seat.get(p.last_protected_target or "", NOBODY) for p in players],
+                    [
+                        [pid in game.seer_reveals.get(p.id, ()) for pid in game.players]
+                        for p in players
+                    ],
+                )
+            )
+        columns = list(zip(*rows, strict=True))
+        dtypes = (np.int8, bool, np.int32, np.int8, bool, bool, np.int32, bool)
+        return cls(*(np.array(c, dtype=t) for c, t in zip(columns, dtypes, strict=True)))
+
+    def __getitem__(self, rows: np.ndarray) -> "GameArrays":
+        return GameArrays(*(getattr(self, f.name)[rows] for f in fields(self)))
+
+    def __setitem__(self, rows: np.ndarray, other: "GameArrays") -> None:
+        for f in fields(self):
+            getattr(self, f.name)[rows] = getattr(other, f.name)
+
+    def __len__(self) -> int:
+        return len(self.winner)
+
+
+@dataclass
+class NightActions:
+    targets: np.ndarray  # (games, seats) target seat of each player's action, NOBODY to skip
+    kinds: np.ndarray  # (games, seats) codes into ACTIONS (only the witch's is read)
+    link: np.ndarray  # (games, 2) seats Cupid links tonight, NOBODY otherwise
+
+    @classmethod
+    def from_games(cls, games: list[Game]) -> "NightActions":
+        """The night actions already submitted in ``games``."""
+        targets, kinds, links = [], [], []
+        for game in games:
+            seat = {pid: i for i, pid in enumerate(game.players)}
+            players = list(game.players.values())
+            targets.append([seat.get(p.night_action_target or "", NOBODY) for p in players])
+            kinds.append([_action_code(p.night_action_type) for p in players])
+            link = [NOBODY, NOBODY]
+            for p in players:
+                if p.role == RoleType.CUPID and p.night_action_type == NightActionType.LINK:
+                    link = [seat[pid] for pid in (p.night_action_target or "").split(",")]
+            links.append(link)
+        return cls(
+            np.array(targets, dtype=np.int32),
+            np.array(kinds, dtype=np.int8),
+            np.array(links, dtype=np.int32),
+        )
+
+
+def votes_from_games(games: list[Game]) -> np.ndarray:
+    """(games, seats) seat each player voted for today, NOBODY if they haven't."""
+    out = []
+    for game in games:
+        seat = {pid: i for i, pid in enumerate(game.players)}
+        out.append([seat.get(p.vote_target or "", NOBODY) for p in game.players.values()])
+    return np.array(out, dtype=np.int32)
+
+
+# ===== Resolution =====
+def resolve_night(g: GameArrays, actions: NightActions) -> None:
+    """``NightState.resolve`` for every game, in place."""
+    role, targets, kinds = g.roles, actions.targets, actions.kinds
+    acting = g.alive & (targets != NOBODY)
+    witch = role == _WITCH
+    seats = role.shape[1]
+    kills = _mark(targets, acting & ((role == _WOLF) | (witch & (kinds == _POISON))), seats)
+    guard = (role == _DOCTOR) | (role == _BODYGUARD) | (witch & (kinds == _HEAL))
+    saves = _mark(targets, acting & guard, seats)
+    linked = actions.link[:, 0] != NOBODY
+    g.lovers[linked] = actions.link[linked]
+
+    dead = kills & ~saves
+    revenge = (role == _HUNTER) & dead & (targets != NOBODY)
+    dead |= _mark(targets, revenge, seats)
+    dead |= _lovers_pact(g, dead)
+    g.alive &= ~dead
+    _settle(g, np.ones(len(g), dtype=bool))
+
+
+def resolve_day(g: GameArrays, votes: np.ndarray) -> np.ndarray:
+    """``DayState.resolve`` for every game, in place.
+
+    Returns the seat voted out in each game (NOBODY on a tie or no votes). Games where that
+    is a hunter get no winner yet: ``resolve_revenge`` settles them, as in HUNTER_REVENGE.
+    """
+    games, seats = g.roles.shape
+    rows = np.arange(games)
+    counted = g.alive & (votes != NOBODY)
+    flat = (rows[:, None] * seats + votes)[counted]
+    tally = np.bincount(flat, minlength=games * seats).reshape(games, seats)
+    top = tally.max(axis=1)
+    leader = tally.argmax(axis=1)
+    decided = (top > 0) & ((tally == top[:, None]).sum(axis=1) == 1)
+
+    leader_role = g.roles[rows, leader]
+    tanner = decided & (leader_role == _TANNER)
+    g.winner[tanner] = _TANNER_WIN
+    out = decided & ~tanner
+    voted_out = np.where(out, leader, NOBODY)
+
+    eliminated = _mark(voted_out[:, None], out[:, None], seats)
+    g.alive &= ~eliminated
+    g.alive &= ~_lovers_pact(g, eliminated)
+    _settle(g, ~tanner & ~(out & (leader_role == _HUNTER)))
+    return voted_out
+
+
+def resolve_revenge(g: GameArrays, targets: np.ndarray) -> None:
+    """``HunterRevengeState.resolve`` for every game, in place: ``targets`` is the seat each
+    voted-out hunter shoots (NOBODY for none)."""
+    shot = _mark(targets[:, None], (targets != NOBODY)[:, None], g.roles.shape[1])
+    g.alive &= ~shot
+    g.alive &= ~_lovers_pact(g, shot)
+    _settle(g, np.ones(len(g), dtype=bool))
+
+
+def check_winners(g: GameArrays) -> np.ndarray:
+    """``Game.check_winners`` for every game, as codes into ``WINNERS``."""
+    rows = np.arange(len(g))
+    wolves = (g.alive & (g.roles == _WOLF)).sum(axis=1)
+    others = (g.alive & (g.roles != _WOLF) & (g.roles != _SPECTATOR)).sum(axis=1)
+    linked = g.lovers[:, 0] != NOBODY
+    pair = np.where(linked[:, None], g.lovers, 0)
+    lovers_only = (
+        linked & (g.alive.sum(axis=1) == 2) & g.alive[rows, pair[:, 0]] & g.alive[rows, pair[:, 1]]
+    )
+    return np.select(
+        [lovers_only, wolves == 0, wolves >= others],
+        [_LOVERS, _VILLAGERS, _WEREWOLVES],
+        0,
+    ).astype(np.int8)
+
+
+def _settle(g: GameArrays, rows: np.ndarray) -> None:
+    g.winner[rows] = check_winners(g)[rows]
+
+
+def _mark(targets: np.ndarray, where: np.ndarray, seats: int) -> np.ndarray:
+    """(games, seats) bool with the seats in ``targets[where]`` set in each game's row."""
+    hit = np.zeros((len(targets), seats), dtype=bool)
+    rows, cols = np.nonzero(where)
+    hit[rows, targets[rows, cols]] = True
+    return hit
+
+
+def _lovers_pact(g: GameArrays, dying: np.ndarray) -> np.ndarray:
+    """``Game.resolve_lovers_pact``: the surviving lover of each game where the other is dead
+    or in ``dying``."""
+    rows = np.arange(len(g))
+    linked = g.lovers[:, 0] != NOBODY
+    pair = np.where(linked[:, None], g.lovers, 0)
+    gone = ~g.alive[rows[:, None], pair] | dying[rows[:, None], pair]
+    follow = np.zeros_like(dying)
+    for dead, left in ((0, 1), (1, 0)):
+        hit = linked & gone[:, dead] & ~gone[:, left]
+        follow[rows[hit], pair[hit, left]] = True
+    return follow
+
+
+def _action_code(action_type: str | None) -> int:
+    return ACTIONS.index(NightActionType(action_type or NightActionType.SKIP))
+
+
+# ===== Policies =====
+Claims = tuple[np.ndarray, np.ndarray]
+
+
+def seer_claims(g: GameArrays) -> Claims:
+    """``policies.seer_claim`` for every game: the claiming seer's seat (NOBODY if none) and
+    the (games, seats) mask of the living players they accused."""
+    rows = np.arange(len(g))
+    suspects = g.alive & ((g.roles == _WOLF) | (g.roles == _LYCAN))
+    found = (g.reveals & suspects[:, None, :]).any(axis=2) & g.alive
+    seer = np.where(found.any(axis=1), found.argmax(axis=1), NOBODY)
+    accused = g.reveals[rows, np.maximum(seer, 0)] & suspects & (seer != NOBODY)[:, None]
+    return seer, accused
+
+
+class RandomBots:
+    """``policies.RandomPolicy`` for every seat of every game at once."""
+
+    # ===== Choices (overridden by smarter policies) =====
+    def victims(self, g: GameArrays, rng: np.random.Generator, _claims: Claims) -> np.ndarray:
+        return _choose_one(rng, g.alive & (g.roles != _WOLF))
+
+    def checks(self, g: GameArrays, rng: np.random.Generator, _claims: Claims) -> np.ndarray:
+        return _choose_each(rng, g.alive, _seats(g))
+
+    def protects(self, g: GameArrays, rng: np.random.Generator, _claims: Claims) -> np.ndarray:
+        return _choose_each(rng, g.alive, g.last_protected)
+
+    def votes(self, g: GameArrays, rng: np.random.Generator, _claims: Claims) -> np.ndarray:
+        return _choose_each(rng, g.alive, _seats(g))
+
+    def revenge(self, g: GameArrays, rng: np.random.Generator, _claims: Claims) -> np.ndarray:
+        return _choose_each(rng, g.alive, _seats(g))
+
+    def heals(
+        self, g: GameArrays, rng: np.random.Generator, _victim: np.ndarray, _claims: Claims
+    ) -> np.ndarray:
+        return rng.random(g.alive.shape) < 0.5
+
+    def poisons(self, g: GameArrays, rng: np.random.Generator, _claims: Claims) -> np.ndarray:
+        others = _choose_each(rng, g.alive, _seats(g))
+        return np.where(rng.random(g.alive.shape) < 0.25, others, NOBODY)
+
+    # ===== Moves =====
+    def night(self, g: GameArrays, rng: np.random.Generator, first_night: bool) -> NightActions:
+        """Every player's night action. Like ``process_action``, this spends witch potions and
+        records seer reveals and each bodyguard's target."""
+        games, seats = g.roles.shape
+        alive, role = g.alive, g.roles
+        claims = seer_claims(g)  # The seer acts last, so tonight's reveal isn't in yet
+        targets = np.full((games, seats), NOBODY, dtype=np.int32)
+        kinds = np.full((games, seats), _action_code(None), dtype=np.int8)
+
+        victim = self.victims(g, rng, claims)
+        targets = np.where(alive & (role == _WOLF), victim[:, None], targets)
+
+        guards = alive & ((role == _DOCTOR) | (role == _BODYGUARD))
+        protect = self.protects(g, rng, claims)
+        targets = np.where(guards, protect, targets)
+        bodyguards = alive & (role == _BODYGUARD)
+        g.last_protected[bodyguards] = protect[bodyguards]
+
+        hunters = alive & (role == _HUNTER)
+        targets = np.where(hunters, self.revenge(g, rng, claims), targets)
+
+        witches = alive & (role == _WITCH) & (victim != NOBODY)[:, None]
+        heal = witches & g.witch_heal & self.heals(g, rng, victim, claims)
+        poison_target = self.poisons(g, rng, claims)
+        poison = alive & (role == _WITCH) & ~heal & g.witch_poison & (poison_target != NOBODY)
+        targets = np.where(heal, victim[:, None], targets)
+        targets = np.where(poison, poison_target, targets)
+        kinds[heal] = _HEAL
+        kinds[poison] = _POISON
+        g.witch_heal &= ~heal
+        g.witch_poison &= ~poison
+
+        seers = alive & (role == _SEER)
+        checks = np.where(seers, self.checks(g, rng, claims), NOBODY)
+        targets = np.where(seers, checks, targets)
+        rows, cols = np.nonzero(checks != NOBODY)
+        g.reveals[rows, cols, checks[rows, cols]] = True
+
+        link = np.full((games, 2), NOBODY, dtype=np.int32)
+        if first_night:
+            cupid = (alive & (role == ROLES.index(RoleType.CUPID))).any(axis=1)
+            first = _choose_one(rng, alive)
+            second = _choose_one(rng, alive & (_seats(g) != first[:, None]))
+            paired = cupid & (second != NOBODY)
+            link[paired] = np.stack([first, second], axis=1)[paired]
+        return NightActions(targets, kinds, link)
+
+    def day(self, g: GameArrays, rng: np.random.Generator) -> np.ndarray:
+        """Every living player's vote."""
+        return np.where(g.alive, self.votes(g, rng, seer_claims(g)), NOBODY)
+
+    def shoot(self, g: GameArrays, rng: np.random.Generator, hunters: np.ndarray) -> np.ndarray:
+        """The revenge target of the voted-out hunter at ``hunters`` (a seat per game)."""
+        return self.revenge(g, rng, seer_claims(g))[np.arange(len(g)), hunters]
+
+
+class HeuristicBots(RandomBots):
+    """``policies.HeuristicPolicy`` for every seat of every game at once."""
+
+    def victims(self, g: GameArrays, rng: np.random.Generator, claims: Claims) -> np.ndarray:
+        seer, _ = claims
+        return np.where(seer != NOBODY, seer, super().victims(g, rng, claims))
+
+    def checks(self, g: GameArrays, rng: np.random.Generator, claims: Claims) -> np.ndarray:
+        picks = super().checks(g, rng, claims)
+        rows, seers = np.nonzero(g.alive & (g.roles == _SEER))
+        unchecked = g.alive[rows] & ~g.reveals[rows, seers]
+        unchecked[np.arange(len(rows)), seers] = False
+        chosen = _choose_one(rng, unchecked)
+        picks[rows, seers] = np.where(chosen != NOBODY, chosen, picks[rows, seers])
+        return picks
+
+    def protects(self, g: GameArrays, rng: np.random.Generator, claims: Claims) -> np.ndarray:
+        seer, _ = claims
+        guard_seer = (seer != NOBODY)[:, None] & (g.last_protected != seer[:, None])
+        return np.where(guard_seer, seer[:, None], super().protects(g, rng, claims))
+
+    def votes(self, g: GameArrays, rng: np.random.Generator, claims: Claims) -> np.ndarray:
+        seer, _ = claims
+        pack = _choose_one(rng, g.alive & (g.roles != _WOLF))
+        wolves = np.where(seer != NOBODY, seer, pack)
+        village = _first_accused(g, claims)
+        village = np.where(village != NOBODY, village, super().votes(g, rng, claims))
+        return np.where(g.roles == _WOLF, wolves[:, None], village)
+
+    def revenge(self, g: GameArrays, rng: np.random.Generator, claims: Claims) -> np.ndarray:
+        accused = _first_accused(g, claims)
+        return np.where(accused != NOBODY, accused, super().revenge(g, rng, claims))
+
+    def heals(
+        self, g: GameArrays, rng: np.random.Generator, victim: np.ndarray, claims: Claims
+    ) -> np.ndarray:
+        seer, _ = claims
+        own = (victim[:, None] == seer[:, None]) | (victim[:, None] == _seats(g))
+        return own | super().heals(g, rng, victim, claims)
+
+    def poisons(self, g: GameArrays, _rng: np.random.Generator, claims: Claims) -> np.ndarray:
+        return _first_accused(g, claims)
+
+
+BOTS: dict[str, type[RandomBots]] = {"random": RandomBots, "heuristic": HeuristicBots}
+
+
+def _first_accused(g: GameArrays, claims: Claims) -> np.ndarray:
+    """For every seat, the first accused player in seat order other than itself."""
+    _, accused = claims
+    seats = g.roles.shape[1]
+    others = accused[:, None, :] & ~np.eye(seats, dtype=bool)
+    return np.where(others.any(axis=2), others.argmax(axis=2), NOBODY)
+
+
+def _seats(g: GameArrays) -> np.ndarray:
+    return np.broadcast_to(np.arange(g.roles.shape[1]), g.roles.shape)
+
+
+def _choose_one(rng: np.random.Generator, candidates: np.ndarray) -> np.ndarray:
+    """One uniformly chosen candidate seat per game, NOBODY where there is none."""
+    keys = np.where(candidates, rng.random(candidates.shape), -1.0)
+    return np.where(candidates.any(axis=1), keys.argmax(axis=1), NOBODY)
+
+
+def _choose_each(rng: np.random.Generator, alive: np.ndarray, exclude: np.ndarray) -> np.ndarray:
+    """For every seat, a uniformly chosen living seat other than ``exclude`` at that seat."""
+    games, seats = alive.shape
+    rows = np.arange(games)[:, None]
+    order = np.argsort(~alive, axis=1, kind="stable")  # Living seats first
+    rank = np.cumsum(alive, axis=1) - 1  # Position of each living seat in ``order``
+    excluded = np.where(exclude != NOBODY, exclude, 0)
+    skip = (exclude != NOBODY) & alive[rows, excluded]
+    skip_rank = np.where(skip, rank[rows, excluded], seats)
+    pool = alive.sum(axis=1)[:, None] - skip
+    pick = (rng.random((games, seats)) * pool).astype(np.int32)
+    pick += pick >= skip_rank
+    chosen = np.take_along_axis(order, np.minimum(pick, seats - 1), axis=1)
+    return np.where(pool > 0, chosen, NOBODY)
+
+
+# ===== Driver =====
+def play(
+    setup: RoleSetup, games: int, seed: int = 0, bots: str = "random", max_rounds: int = 100
+) -> np.ndarray:
+    """Winner codes of ``games`` games of ``setup`` between ``bots``, played in lockstep."""
+    rng = np.random.default_rng(seed)
+    policy = BOTS[bots]()
+    g = GameArrays.deal(setup, games, rng)
+    for night in range(max_rounds):
+        playing = np.flatnonzero(g.winner == 0)
+        if not playing.size:
+            break
+        sub = g[playing]
+        resolve_night(sub, policy.night(sub, rng, first_night=night == 0))
+
+        day = np.flatnonzero(sub.winner == 0)
+        d = sub[day]
+        voted_out = resolve_day(d, policy.day(d, rng))
+        hunted = np.flatnonzero(
+            (voted_out != NOBODY) & (d.roles[np.arange(len(d)), voted_out] == _HUNTER)
+        )
+        if hunted.size:
+            h = d[hunted]
+            resolve_revenge(h, policy.shoot(h, rng, voted_out[hunted]))
+            d[hunted] = h
+        sub[day] = d
+        g[playing] = sub
+    return g.winner
+
+
+def win_rates(
+    setup: RoleSetup, games: int, seed: int = 0, bots: str = "random"
+) -> dict[str, float]:
+    counts = np.bincount(play(setup, games, seed, bots), minlength=len(WINNERS))
+    return {WINNERS[code]: int(n) / games for code, n in enumerate(counts) if n}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, nargs="*", default=[], help="Balanced setups")
+    parser.add_argument(
+        "--setup", action="append", default=[], help="PLAYERS:role=count,... (repeatable)"
+    )
+    parser.add_argument("--games", type=int, default=100_000, help="Games per setup")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bots", choices=sorted(BOTS), default="heuristic")
+    args = parser.parse_args()
+
+    setups = [RoleSetup.balanced(n) for n in args.players]
+    setups += [RoleSetup.parse(text) for text in args.setup]
+    if not setups:
+        parser.error("give --players or --setup")
+    for setup in setups:
+        rates = win_rates(setup, args.games, args.seed, args.bots)
+        print(json.dumps({"setup": setup.label, "games": args.games, "win_rates": rates}))
+
+
+if __name__ == "__main__":
+    main()
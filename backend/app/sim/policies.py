@@ -0,0 +1,201 @@
+"""Bot policies: how simulated players choose their night actions, votes and revenge.
+
+A policy drives every player of one team (the werewolves, or everyone else) in one game and
+answers with the same action dicts a client would send, so games run through the real
+``Game.process_action``. Policies only read what their players could know: their own role,
+the other wolves for werewolves, and what the seer has publicly claimed. A seer claims as
+soon as it has found a werewolf (a Lycan looks like one to the seer), which is what lets the
+heuristic village vote together and the heuristic wolves hunt the seer.
+"""
+
+import random
+
+from app.models.game import Game, PlayerState
+from app.schemas.game import NightActionType, RoleType
+
+# Roles whose players must still "act" at night (dream) for the night to complete.
+_DREAMERS = {RoleType.VILLAGER, RoleType.LYCAN, RoleType.TANNER}
+
+
+def seer_claim(game: Game) -> tuple[str | None, set[str]]:
+    """The seer who has publicly claimed, if any, and the alive players they accused."""
+    for seer_id, seer in game.players.items():
+        revealed = game.seer_reveals.get(seer_id)
+        if not revealed or not seer.is_alive:
+            continue
+        accused = {
+            pid
+            for pid in revealed
+            if game.players[pid].is_alive
+            and game.players[pid].role in (RoleType.WEREWOLF, RoleType.LYCAN)
+        }
+        if accused:
+            return seer_id, accused
+    return None, set()
+
+
+class RandomPolicy:
+    """Uniformly random legal moves. Werewolves still agree on one victim per night,
+    since the night cannot end otherwise."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self._victims: dict[int, str | None] = {}
+        self._pack_votes: dict[int, str | None] = {}
+
+    # ===== Choices (overridden by smarter policies) =====
+    def choose_victim(self, game: Game, _wolf: PlayerState) -> str | None:
+        return self._pick(_alive(game, exclude_roles={RoleType.WEREWOLF}))
+
+    def choose_check(self, game: Game, seer: PlayerState) -> str | None:
+        return self._pick(_alive(game, exclude={seer.id}))
+
+    def choose_protect(self, game: Game, guard: PlayerState) -> str | None:
+        return self._pick(_alive(game, exclude={guard.last_protected_target}))
+
+    def choose_vote(self, game: Game, voter: PlayerState) -> str | None:
+        return self._pick(_alive(game, exclude={voter.id}))
+
+    def choose_revenge(self, game: Game, hunter: PlayerState) -> str | None:
+        return self._pick(_alive(game, exclude={hunter.id}))
+
+    def witch_heals(self, _game: Game, _witch: PlayerState, _victim: str) -> bool:
+        return self.rng.random() < 0.5
+
+    def witch_poisons(self, game: Game, witch: PlayerState) -> str | None:
+        if self.rng.random() < 0.25:
+            return self._pick(_alive(game, exclude={witch.id}))
+        return None
+
+    # ===== Moves =====
+    def night_action(self, game: Game, player: PlayerState) -> dict | None:
+        """The player's night action, or None when their role has nothing to do."""
+        role = player.role
+        if role == RoleType.WEREWOLF:
+            return _act(NightActionType.KILL, self.victim(game, player))
+        if role == RoleType.SEER:
+            return _act(NightActionType.CHECK, self.choose_check(game, player))
+        if role in (RoleType.DOCTOR, RoleType.BODYGUARD):
+            return _act(NightActionType.SAVE, self.choose_protect(game, player))
+        if role == RoleType.HUNTER:
+            return _act(NightActionType.REVENGE, self.choose_revenge(game, player))
+        if role == RoleType.WITCH:
+            return self._witch(game, player)
+        if role == RoleType.CUPID:
+            alive = _alive(game)
+            if game.turn_count > 1 or len(alive) < 2:
+                return _act(NightActionType.SKIP, None)
+            return _act(NightActionType.LINK, ",".join(self.rng.sample(alive, 2)))
+        if role in _DREAMERS:
+            return _act(NightActionType.DREAM, player.id)
+        return None
+
+    def victim(self, game: Game, wolf: PlayerState) -> str | None:
+        """Tonight's victim, chosen by the first wolf to act and shared by the rest."""
+        if game.turn_count not in self._victims:
+            self._victims[game.turn_count] = self.choose_victim(game, wolf)
+        return self._victims[game.turn_count]
+
+    def pack_vote(self, game: Game) -> str | None:
+        """Today's werewolf vote, chosen by the first wolf to vote and shared by the rest."""
+        if game.turn_count not in self._pack_votes:
+            self._pack_votes[game.turn_count] = self._pick(
+                _alive(game, exclude_roles={RoleType.WEREWOLF})
+            )
+        return self._pack_votes[game.turn_count]
+
+    def _witch(self, game: Game, witch: PlayerState) -> dict:
+        victim = _wolf_consensus(game)
+        if witch.witch_has_heal and victim and self.witch_heals(game, witch, victim):
+            return _act(NightActionType.HEAL, victim)
+        if witch.witch_has_poison and (target := self.witch_poisons(game, witch)):
+            return _act(NightActionType.POISON, target)
+        return _act(NightActionType.SKIP, None)
+
+    def _pick(self, candidates: list[str]) -> str | None:
+        return self.rng.choice(candidates) if candidates else None
+
+
+class HeuristicPolicy(RandomPolicy):
+    """Plays on public information.
+
+    The seer checks players it hasn't checked yet and claims once it finds a werewolf; the
+    village then votes out whoever the seer accused and the doctor (or bodyguard) protects
+    the seer. Werewolves kill a claimed seer first and otherwise vote as one block.
+    """
+
+    def choose_victim(self, game: Game, wolf: PlayerState) -> str | None:
+        seer_id, _ = seer_claim(game)
+        return seer_id or super().choose_victim(game, wolf)
+
+    def choose_check(self, game: Game, seer: PlayerState) -> str | None:
+        checked = set(game.seer_reveals.get(seer.id, ()))
+        unchecked = _alive(game, exclude={seer.id, *checked})
+        return self._pick(unchecked) or super().choose_check(game, seer)
+
+    def choose_protect(self, game: Game, guard: PlayerState) -> str | None:
+        seer_id, _ = seer_claim(game)
+        if seer_id and seer_id != guard.last_protected_target:
+            return seer_id
+        return super().choose_protect(game, guard)
+
+    def choose_vote(self, game: Game, voter: PlayerState) -> str | None:
+        seer_id, accused = seer_claim(game)
+        if voter.role == RoleType.WEREWOLF:
+            return seer_id or self.pack_vote(game)
+        accused.discard(voter.id)
+        return _first(game, accused) or super().choose_vote(game, voter)
+
+    def choose_revenge(self, game: Game, hunter: PlayerState) -> str | None:
+        _, accused = seer_claim(game)
+        accused.discard(hunter.id)
+        return _first(game, accused) or super().choose_revenge(game, hunter)
+
+    def witch_heals(self, game: Game, witch: PlayerState, victim: str) -> bool:
+        seer_id, _ = seer_claim(game)
+        return victim in (seer_id, witch.id) or self.rng.random() < 0.5
+
+    def witch_poisons(self, game: Game, witch: PlayerState) -> str | None:
+        _, accused = seer_claim(game)
+        accused.discard(witch.id)
+        return _first(game, accused)
+
+
+POLICIES: dict[str, type[RandomPolicy]] = {
+    "random": RandomPolicy,
+    "heuristic": HeuristicPolicy,
+}
+
+
+def _act(action_type: NightActionType, target_id: str | None) -> dict:
+    if target_id is None and action_type != NightActionType.SKIP:
+        action_type = NightActionType.SKIP
+    return {"action_type": action_type.value, "target_id": target_id, "confirmed": True}
+
+
+def _alive(
+    game: Game, exclude: set[str | None] = frozenset(), exclude_roles: set[RoleType] = frozenset()
+) -> list[str]:
+    return [
+        pid
+        for pid, p in game.players.items()
+        if p.is_alive
+        and pid not in exclude
+        and p.role not in exclude_roles
+        and p.role != RoleType.SPECTATOR
+    ]
+
+
+def _first(game: Game, pids: set[str]) -> str | None:
+    """The first of ``pids`` in seat order."""
+    return next((pid for pid in game.players if pid in pids), None)
+
+
+def _wolf_consensus(game: Game) -> str | None:
+    targets = {
+        p.night_action_target
+        for p in game.players.values()
+        if p.is_alive and p.role == RoleType.WEREWOLF
+    }
+    victim = targets.pop() if len(targets) == 1 else None
+    return victim if victim in game.players else None
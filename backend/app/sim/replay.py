@@ -0,0 +1,166 @@
+"""Re-executes a recorded room against the game model at full speed.
+
+A room's action log is its initial state plus every mutation applied to it, in order, with
+the outcome and the resulting state digest (see ``app.services.action_log``). Games draw
+all randomness from the seed in their state, so replaying the log must reproduce every
+outcome and end on the recorded digest; anything else is a behaviour change in the model.
+Logs can be read straight from JSON log lines or from a fixture saved with ``--save``, which
+is how an incident becomes a regression test.
+
+    python -m app.sim.replay server.log --room 1a2b3c4d --save tests/fixtures/incident.json
+    python -m app.sim.replay tests/fixtures/incident.json --repeat 100 --check-every
+
+Prints one JSON report: whether the replay matched, where it diverged, and actions/sec.
+"""
+
+import argparse
+import json
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from app.models.game import Game
+from app.services.action_log import ROOM_CREATED, ROOM_MUTATION
+from app.services.mutations import apply_mutation
+
+
+@dataclass
+class LoggedMutation:
+    op: str
+    args: dict[str, Any]
+    accepted: bool
+    digest: str | None = None  # State digest after the mutation, when accepted
+
+
+@dataclass
+class ActionLog:
+    room_id: str
+    initial: str  # GameState JSON as the room was created
+    actions: list[LoggedMutation] = field(default_factory=list)
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[dict[str, Any]], room_id: str | None = None
+    ) -> "ActionLog":
+        """Build the log of ``room_id``, or of the first room created, from log records."""
+        log = None
+        for record in records:
+            event = record.get("event")
+            if event == ROOM_CREATED and log is None:
+                if room_id is None or record.get("room_id") == room_id:
+                    log = cls(record["room_id"], record["state"])
+            elif event == ROOM_MUTATION and log is not None and record["room_id"] == log.room_id:
+                log.actions.append(
+                    LoggedMutation(
+                        record["op"], record["args"], record["accepted"], record.get("digest")
+                    )
+                )
+        if log is None:
+            raise ValueError(f"No {ROOM_CREATED} record for room {room_id or '(any)'}")
+        return log
+
+    @classmethod
+    def load(cls, path: Path, room_id: str | None = None) -> "ActionLog":
+        """Read a fixture written by ``save``, or JSON log lines; other lines are skipped."""
+        text = path.read_text()
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            data = None
+        if isinstance(data, dict) and "initial" in data:
+            actions = [LoggedMutation(**action) for action in data["actions"]]
+            return cls(data["room_id"], data["initial"], actions)
+        return cls.from_records(_json_records(text.splitlines()), room_id)
+
+    def save(self, path: Path) -> None:
+        path.write_text(json.dumps(asdict(self), indent=1) + "\n")
+
+
+@dataclass
+class ReplayReport:
+    actions: int  # Mutations re-executed, up to the divergence if any
+    seconds: float
+    final_match: bool
+    diverged_at: int | None = None  # Index of the first mutation whose outcome differed
+    reason: str | None = None
+
+    @property
+    def actions_per_s(self) -> float:
+        return self.actions / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self) | {"actions_per_s": round(self.actions_per_s, 1)}
+
+
+def replay(log: ActionLog, check_every: bool = False) -> tuple[Game, ReplayReport]:
+    """Re-execute ``log`` on its initial state and compare outcomes with the recording.
+
+    Each mutation's accept/reject outcome is always checked; ``check_every`` also compares
+    the digest after every accepted mutation (slower, but pinpoints a divergence that only
+    shows in the state). Stops at the first divergence.
+    """
+    game = Game.from_json(log.initial)
+    diverged_at = reason = None
+    count = 0
+    start = time.perf_counter()
+    for i, action in enumerate(log.actions):
+        count += 1
+        # Rejected mutations may leave the game half-modified, as in ``apply_batch``.
+        checkpoint = None if action.accepted else game.copy()
+        try:
+            apply_mutation(game, action.op, action.args)
+        except Exception as e:
+            if checkpoint is None:
+                diverged_at, reason = i, f"{action.op} was rejected: {e}"
+                break
+            game = checkpoint
+            continue
+        if checkpoint is not None:
+            diverged_at, reason = i, f"{action.op} was accepted, recorded as rejected"
+            break
+        if check_every and action.digest and game.digest() != action.digest:
+            diverged_at, reason = i, f"state after {action.op} differs from the recording"
+            break
+    seconds = time.perf_counter() - start
+
+    expected = next((a.digest for a in reversed(log.actions) if a.digest), None)
+    final_match = diverged_at is None and (expected is None or game.digest() == expected)
+    return game, ReplayReport(count, seconds, final_match, diverged_at, reason)
+
+
+def _json_records(lines: Iterable[str]) -> Iterable[dict[str, Any]]:
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict):
+            yield record
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log", type=Path, help="JSON log lines or a saved fixture")
+    parser.add_argument("--room", help="Room to extract from log lines (default: first)")
+    parser.add_argument("--save", type=Path, help="Write the room's log as a fixture")
+    parser.add_argument("--repeat", type=int, default=1, help="Replays, for stable timing")
+    parser.add_argument("--check-every", action="store_true", help="Compare every digest")
+    args = parser.parse_args()
+
+    log = ActionLog.load(args.log, args.room)
+    if args.save:
+        log.save(args.save)
+    # check_and_advance logs every phase resolution at INFO.
+    logging.disable(logging.INFO)
+    reports = [replay(log, args.check_every)[1] for _ in range(args.repeat)]
+    report = reports[0]
+    report.actions = sum(r.actions for r in reports)
+    report.seconds = sum(r.seconds for r in reports)
+    print(json.dumps({"room_id": log.room_id, "replays": args.repeat} | report.to_dict()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Plays complete games headlessly between bot policies.
+
+Games go through the same ``Game.process_action``/``check_and_advance`` path as the server,
+with no Redis, sockets or clocks involved. One seed fixes the role deal and every policy
+choice, so a game can be replayed exactly from ``(setup, seed, policies)``.
+"""
+
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from app.models.game import Game
+from app.schemas.game import GamePhase, GameSettingsSchema, NightActionType, RoleType
+from app.sim.policies import POLICIES, RandomPolicy
+
+# Result recorded for a game still running after ``max_phases``.
+STALEMATE = "STALEMATE"
+
+
+@dataclass(frozen=True)
+class RoleSetup:
+    """A player count and the roles dealt to them; unlisted seats are villagers."""
+
+    players: int
+    roles: tuple[tuple[RoleType, int], ...]
+
+    @classmethod
+    def of(cls, players: int, roles: dict[RoleType, int]) -> "RoleSetup":
+        return cls(players, tuple(sorted((r, n) for r, n in roles.items() if n)))
+
+    @classmethod
+    def balanced(cls, players: int) -> "RoleSetup":
+        """The setup ``auto_balance_roles`` picks for this many players."""
+        game = Game.create("sim")
+        for i in range(players):
+            game.add_player(f"p{i}", f"Bot{i}")
+        game.auto_balance_roles()
+        return cls.of(players, game.settings.role_distribution)
+
+    @classmethod
+    def parse(cls, text: str) -> "RoleSetup":
+        """``"8:werewolf=2,seer=1"`` -> 8 players, 2 werewolves, a seer and 5 villagers."""
+        players, _, roles = text.partition(":")
+        counts = {}
+        for item in filter(None, roles.split(",")):
+            role, _, count = item.partition("=")
+            counts[RoleType(role.strip().upper())] = int(count or 1)
+        return cls.of(int(players), counts)
+
+    @property
+    def label(self) -> str:
+        roles = ",".join(f"{role.value.lower()}={count}" for role, count in self.roles)
+        return f"{self.players}:{roles}"
+
+
+@dataclass
+class GameResult:
+    winner: str  # VILLAGERS, WEREWOLVES, LOVERS, TANNER or STALEMATE
+    rounds: int
+
+
+def simulate_game(
+    setup: RoleSetup,
+    seed: int,
+    village: str = "heuristic",
+    wolves: str = "heuristic",
+    max_phases: int = 1000,
+) -> GameResult:
+    """Play one game of ``setup`` to the end with the named policies for each team."""
+    *_, game = play_phases(setup, seed, village, wolves, max_phases)
+    if game.phase == GamePhase.GAME_OVER:
+        return GameResult(game.winners or STALEMATE, game.turn_count)
+    return GameResult(STALEMATE, game.turn_count)
+
+
+def play_phases(
+    setup: RoleSetup,
+    seed: int,
+    village: str = "heuristic",
+    wolves: str = "heuristic",
+    max_phases: int = 1000,
+) -> Iterator[Game]:
+    """Play one game, yielding it each time every bot has acted, just before the phase
+    resolves, and once more when it ends. Callers may copy it but must not change it."""
+    rng = random.Random(seed)
+    teams = {
+        False: POLICIES[village](random.Random(rng.getrandbits(64))),
+        True: POLICIES[wolves](random.Random(rng.getrandbits(64))),
+    }
+
+    game = Game.create(
+        f"sim-{seed}",
+        GameSettingsSchema(role_distribution=dict(setup.roles)),
+        seed=rng.getrandbits(53),
+    )
+    for i in range(setup.players):
+        game.add_player(f"p{i}", f"Bot{i}", is_admin=i == 0)
+    game.start_game()
+
+    for _ in range(max_phases):
+        if game.phase == GamePhase.GAME_OVER:
+            break
+        _play_phase(game, teams)
+        yield game
+        if not game.check_and_advance():
+            raise RuntimeError(f"{game.phase} did not complete after every bot acted")
+    yield game
+
+
+def _play_phase(game: Game, teams: dict[bool, RandomPolicy]) -> None:
+    def policy(pid: str) -> RandomPolicy:
+        return teams[game.players[pid].role == RoleType.WEREWOLF]
+
+    if game.phase == GamePhase.NIGHT:
+        for pid in _night_order(game):
+            action = policy(pid).night_action(game, game.players[pid])
+            if action is not None:
+                game.process_action(pid, action)
+    elif game.phase == GamePhase.DAY:
+        for pid, player in game.players.items():
+            role = player.role_instance
+            if player.is_alive and role and role.can_vote:
+                target = policy(pid).choose_vote(game, player)
+                game.process_action(pid, {"target_id": target})
+    elif game.phase == GamePhase.HUNTER_REVENGE:
+        pid = game.voted_out_this_round
+        assert pid is not None
+        target = policy(pid).choose_revenge(game, game.players[pid])
+        game.process_action(
+            pid,
+            {"action_type": NightActionType.REVENGE.value, "target_id": target, "confirmed": True},
+        )
+
+
+def _night_order(game: Game) -> list[str]:
+    """Werewolves first and the witch after them, since she sees their victim. The seer goes
+    last so nobody acts on tonight's reveal before day."""
+    rank = {RoleType.WEREWOLF: 0, RoleType.WITCH: 2, RoleType.SEER: 3}
+    alive = [pid for pid, p in game.players.items() if p.is_alive and p.role]
+    return sorted(alive, key=lambda pid: rank.get(game.players[pid].role, 1))
@@ -0,0 +1,581 @@
+"""Async load generator: N rooms of M scripted players over HTTP and WebSocket.
+
+Every player joins over HTTP, opens its socket and plays full games (night actions, day
+votes) until someone wins. Each room keeps one action in flight, with a think time drawn
+before every action, so the first ``STATE_UPDATE`` a player receives after the POST is the
+one that action caused. Rooms run concurrently and are started over ``--ramp`` seconds.
+
+Recorded:
+- ``post``: action or vote POST round trip.
+- ``fanout``: action POST sent until every player in the room has received the resulting
+  ``STATE_UPDATE`` (end-to-end latency).
+- ``handshake``: socket connect until the first ``STATE_UPDATE``, including any waits after
+  the server answered "try again later" (close code 1013), which are counted in
+  ``retried_handshakes``.
+- ``reconnect``: the same, for ``--reconnect-storm``: once every room is set up, all sockets
+  drop and reconnect at the same moment, as after a rolling deploy.
+- errors by kind, completed games, and actions per second.
+
+``--bot-rooms`` adds background rooms of one scripted admin and server-side bots, which play
+on the server's bot scheduler while the measured rooms run; compare the measured rooms'
+latencies with and without them. Bot rooms are abandoned when the measured rooms finish.
+
+Without ``--url`` the app is served in-process by uvicorn on a loopback port, against
+``REDIS_URL``. ``--fake-redis`` swaps Redis for in-memory fakeredis (a dev dependency) for
+smoke runs; the generator then shares the event loop with the server, so point ``--url`` at
+a deployed server for capacity numbers. Thousands of sockets need a raised ``ulimit -n``.
+
+    python -m benchmarks.load_test --rooms 200 --players 8 --think exp:0.5
+    python -m benchmarks.load_test --url http://localhost:8000 --rooms 2000 --players 10
+    python -m benchmarks.load_test --fake-redis --rooms 50 --bot-rooms 1000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import random
+import time
+from collections import Counter, deque
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+from websockets.asyncio.client import ClientConnection, connect
+
+ThinkTime = Callable[[random.Random], float]
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, math.inf)
+MAX_ROUNDS = 50
+
+
+def parse_think(spec: str) -> ThinkTime:
+    """``const:S``, ``uniform:LO:HI`` or ``exp:MEAN``, all in seconds."""
+    kind, *args = spec.split(":")
+    values = [float(a) for a in args]
+    if kind == "const" and len(values) == 1:
+        return lambda _rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exp" and len(values) == 1:
+        return lambda rng: rng.expovariate(1 / values[0]) if values[0] > 0 else 0.0
+    raise ValueError(f"Unknown think-time distribution: {spec!r}")
+
+
+@dataclass
+class LatencyHistogram:
+    samples: list[float] = field(default_factory=list)
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def summary(self) -> dict[str, Any]:
+        if not self.samples:
+            return {"count": 0}
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 2)
+
+        counts = Counter(next(b for b in LATENCY_BUCKETS_MS if s * 1000 <= b) for s in ordered)
+        return {
+            "count": len(ordered),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+            "p50_ms": pct(0.50),
+            "p90_ms": pct(0.90),
+            "p99_ms": pct(0.99),
+            "max_ms": round(ordered[-1] * 1000, 2),
+            "buckets_ms": {f"le_{b}": counts[b] for b in LATENCY_BUCKETS_MS if counts[b]},
+        }
+
+
+@dataclass
+class LoadStats:
+    post: LatencyHistogram = field(default_factory=LatencyHistogram)
+    fanout: LatencyHistogram = field(default_factory=LatencyHistogram)
+    handshake: LatencyHistogram = field(default_factory=LatencyHistogram)
+    reconnect: LatencyHistogram = field(default_factory=LatencyHistogram)
+    errors: Counter = field(default_factory=Counter)
+    actions: int = 0
+    games_completed: int = 0
+    bot_games_completed: int = 0
+    retried_handshakes: int = 0
+    elapsed: float = 0.0
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "elapsed_s": round(self.elapsed, 2),
+            "actions": self.actions,
+            "actions_per_s": round(self.actions / self.elapsed, 1) if self.elapsed else 0.0,
+            "games_completed": self.games_completed,
+            "bot_games_completed": self.bot_games_completed,
+            "retried_handshakes": self.retried_handshakes,
+            "errors": dict(self.errors),
+            "error_rate": round(sum(self.errors.values()) / max(self.actions, 1), 4),
+            "post": self.post.summary(),
+            "fanout": self.fanout.summary(),
+            "handshake": self.handshake.summary(),
+            "reconnect": self.reconnect.summary(),
+        }
+
+
+TRY_AGAIN_LATER = 1013  # Close code for a handshake over the server's limit; reason = retry ms
+
+
+class PlayerSocket:
+    """One player's socket; records when each ``STATE_UPDATE`` arrives and answers PINGs."""
+
+    def __init__(self, ws: ClientConnection, room_id: str):
+        self._ws = ws
+        self._room_id = room_id
+        self._arrivals: deque[float] = deque(maxlen=16)
+        self._updated = asyncio.Condition()
+        self._closed = False
+        self._reader = asyncio.create_task(self._read())
+
+    @classmethod
+    async def open(
+        cls,
+        ws_base: str,
+        room_id: str,
+        player_id: str,
+        stats: LoadStats,
+        histogram: LatencyHistogram | None = None,
+    ):
+        start = time.perf_counter()
+        while True:
+            ws = await connect(f"{ws_base}/ws/{room_id}/{player_id}", open_timeout=30)
+            socket = cls(ws, room_id)
+            first_state = await socket.update_after(start, timeout=30)
+            if first_state is not None or ws.close_code != TRY_AGAIN_LATER:
+                break
+            stats.retried_handshakes += 1
+            await socket.close()
+            await asyncio.sleep(int(ws.close_reason or 1000) / 1000)
+        if first_state is None:
+            stats.errors["handshake_closed" if socket._closed else "handshake_timeout"] += 1
+        else:
+            (histogram or stats.handshake).observe(first_state - start)
+        return socket
+
+    async def _read(self) -> None:
+        with contextlib.suppress(Exception):
+            async for raw in self._ws:
+                message = json.loads(raw)
+                if message.get("type") == "STATE_UPDATE":
+                    async with self._updated:
+                        self._arrivals.append(time.perf_counter())
+                        self._updated.notify_all()
+                elif message.get("type") == "PING":
+                    await self._ws.send(json.dumps({"type": "PONG", "room_id": self._room_id}))
+        async with self._updated:
+            self._closed = True
+            self._updated.notify_all()
+
+    def _first_after(self, t0: float) -> float | None:
+        return next((t for t in self._arrivals if t > t0), None)
+
+    async def update_after(self, t0: float, timeout: float) -> float | None:
+        """Arrival time of the first ``STATE_UPDATE`` received after ``t0``."""
+        with contextlib.suppress(TimeoutError):
+            async with asyncio.timeout(timeout), self._updated:
+                await self._updated.wait_for(
+                    lambda: self._closed or self._first_after(t0) is not None
+                )
+        return self._first_after(t0)
+
+    async def close(self) -> None:
+        await self._ws.close()
+        self._reader.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._reader
+
+
+def role_distribution(players: int) -> dict[str, int]:
+    """Roles the scripted players know how to play: wolves, seer, doctor, villagers."""
+    roles = {"WEREWOLF": max(1, players // 4)}
+    if players >= 4:
+        roles["SEER"] = 1
+    if players >= 5:
+        roles["DOCTOR"] = 1
+    roles["VILLAGER"] = players - sum(roles.values())
+    return roles
+
+
+def plan_night(state: dict, rng: random.Random) -> list[tuple[str, str, dict]]:
+    alive = [pid for pid, p in state["players"].items() if p["is_alive"]]
+    roles = {pid: state["players"][pid]["role"] for pid in alive}
+    victim = rng.choice([pid for pid in alive if roles[pid] != "WEREWOLF"])
+    plan = []
+    for pid in alive:
+        others = [o for o in alive if o != pid]
+        role = roles[pid]
+        if role == "WEREWOLF":
+            body = {"action_type": "KILL", "target_id": victim}
+        elif role == "SEER":
+            body = {"action_type": "CHECK", "target_id": rng.choice(others)}
+        elif role == "DOCTOR":
+            last = state["players"][pid]["last_protected_target"]
+            body = {"action_type": "SAVE", "target_id": rng.choice([o for o in alive if o != last])}
+        else:
+            body = {"action_type": "DREAM", "target_id": rng.choice(others)}
+        plan.append((pid, "action", body))
+    rng.shuffle(plan)
+    return plan
+
+
+def plan_day(state: dict, rng: random.Random) -> list[tuple[str, str, dict]]:
+    alive = [pid for pid, p in state["players"].items() if p["is_alive"]]
+    target = rng.choice(alive)
+    plan = [(pid, "vote", {"target_id": target}) for pid in alive]
+    rng.shuffle(plan)
+    return plan
+
+
+class ReconnectStorm:
+    """Releases every room at once after all of them have finished setting up."""
+
+    def __init__(self, rooms: int):
+        self._pending = rooms
+        self._go = asyncio.Event()
+
+    async def wait(self) -> None:
+        self._pending -= 1
+        if self._pending == 0:
+            self._go.set()
+        await self._go.wait()
+
+
+class RoomRunner:
+    def __init__(
+        self,
+        http: httpx.AsyncClient,
+        ws_base: str,
+        players: int,
+        think: ThinkTime,
+        rng: random.Random,
+        stats: LoadStats,
+        fanout_timeout: float,
+        storm: ReconnectStorm | None = None,
+    ):
+        self.http = http
+        self.ws_base = ws_base
+        self.players = players
+        self.think = think
+        self.rng = rng
+        self.stats = stats
+        self.fanout_timeout = fanout_timeout
+        self.storm = storm
+        self.sockets: dict[str, PlayerSocket] = {}
+
+    async def run(self) -> None:
+        room_id = None
+        try:
+            room_id = await self._setup()
+        except (httpx.HTTPError, OSError) as e:
+            self.stats.errors[type(e).__name__] += 1
+        try:
+            if self.storm is not None:
+                await self.storm.wait()
+                if room_id is not None:
+                    await self._reconnect_all(room_id)
+            if room_id is not None:
+                await self._play(room_id)
+        except (httpx.HTTPError, OSError) as e:
+            self.stats.errors[type(e).__name__] += 1
+        finally:
+            await asyncio.gather(*(s.close() for s in self.sockets.values()))
+
+    async def _reconnect_all(self, room_id: str) -> None:
+        await asyncio.gather(*(s.close() for s in self.sockets.values()))
+        sockets = await asyncio.gather(
+            *(
+                PlayerSocket.open(self.ws_base, room_id, pid, self.stats, self.stats.reconnect)
+                for pid in self.sockets
+            )
+        )
+        self.sockets = dict(zip(self.sockets, sockets, strict=True))
+
+    async def _setup(self) -> str | None:
+        created = await self.http.post("/api/rooms", json={})
+        created.raise_for_status()
+        room_id = created.json()["room_id"]
+        player_ids = [f"{room_id}-p{i}" for i in range(self.players)]
+        for i, pid in enumerate(player_ids):
+            joined = await self.http.post(
+                f"/api/rooms/{room_id}/join", json={"nickname": f"Bot{i}", "player_id": pid}
+            )
+            joined.raise_for_status()
+
+        sockets = await asyncio.gather(
+            *(PlayerSocket.open(self.ws_base, room_id, pid, self.stats) for pid in player_ids)
+        )
+        self.sockets = dict(zip(player_ids, sockets, strict=True))
+
+        started = await self.http.post(
+            f"/api/rooms/{room_id}/start",
+            json={
+                "player_id": player_ids[0],
+                "settings": {"role_distribution": role_distribution(self.players)},
+            },
+        )
+        if started.status_code != 200:
+            self.stats.errors[f"start_{started.status_code}"] += 1
+            return None
+        return room_id
+
+    async def _play(self, room_id: str) -> None:
+        for _ in range(MAX_ROUNDS):
+            response = await self.http.get(f"/api/rooms/{room_id}")
+            response.raise_for_status()
+            state = response.json()
+            if state["phase"] == "GAME_OVER":
+                self.stats.games_completed += 1
+                return
+            plan = (
+                plan_night(state, self.rng)
+                if state["phase"] == "NIGHT"
+                else plan_day(state, self.rng)
+            )
+            for player_id, kind, body in plan:
+                await asyncio.sleep(self.think(self.rng))
+                await self._act(room_id, player_id, kind, body)
+        self.stats.errors["max_rounds"] += 1
+
+    async def _act(self, room_id: str, player_id: str, kind: str, body: dict) -> None:
+        t0 = time.perf_counter()
+        response = await self.http.post(
+            f"/api/rooms/{room_id}/{kind}", params={"player_id": player_id}, json=body
+        )
+        self.stats.post.observe(time.perf_counter() - t0)
+        self.stats.actions += 1
+        if response.status_code != 200:
+            self.stats.errors[f"{kind}_{response.status_code}"] += 1
+            return
+
+        arrivals = await asyncio.gather(
+            *(s.update_after(t0, self.fanout_timeout) for s in self.sockets.values())
+        )
+        if any(a is None for a in arrivals):
+            self.stats.errors["fanout_timeout"] += 1
+        else:
+            self.stats.fanout.observe(max(a for a in arrivals if a is not None) - t0)
+
+
+class BotRoomRunner:
+    """A room of one scripted admin and ``players - 1`` server-side bots, polled over HTTP
+    so the admin can play its part. Background load only: nothing here is timed."""
+
+    def __init__(self, http: httpx.AsyncClient, players: int, rng: random.Random, stats: LoadStats):
+        self.http = http
+        self.players = players
+        self.rng = rng
+        self.stats = stats
+
+    async def run(self, poll: float = 1.0) -> None:
+        try:
+            room_id, admin = await self._setup()
+            while True:
+                await asyncio.sleep(poll)
+                response = await self.http.get(f"/api/rooms/{room_id}")
+                response.raise_for_status()
+                state = response.json()
+                if state["phase"] == "GAME_OVER":
+                    self.stats.bot_games_completed += 1
+                    return
+                await self._act(room_id, admin, state)
+        except (httpx.HTTPError, OSError) as e:
+            self.stats.errors[f"bot_room_{type(e).__name__}"] += 1
+
+    async def _setup(self) -> tuple[str, str]:
+        created = await self.http.post("/api/rooms", json={})
+        created.raise_for_status()
+        room_id = created.json()["room_id"]
+        admin = f"{room_id}-admin"
+        joined = await self.http.post(
+            f"/api/rooms/{room_id}/join", json={"nickname": "Admin", "player_id": admin}
+        )
+        joined.raise_for_status()
+        bots = await self.http.post(
+            f"/api/rooms/{room_id}/bots", json={"player_id": admin, "count": self.players - 1}
+        )
+        bots.raise_for_status()
+        started = await self.http.post(
+            f"/api/rooms/{room_id}/start",
+            json={
+                "player_id": admin,
+                "settings": {"role_distribution": role_distribution(self.players)},
+            },
+        )
+        started.raise_for_status()
+        return room_id, admin
+
+    async def _act(self, room_id: str, admin: str, state: dict) -> None:
+        me = state["players"][admin]
+        if not me["is_alive"]:
+            return
+        if state["phase"] == "NIGHT" and me["night_action_target"] is None:
+            plan = plan_night(state, self.rng)
+        elif state["phase"] == "DAY" and me["vote_target"] is None:
+            plan = plan_day(state, self.rng)
+        else:
+            return
+        for pid, kind, body in plan:
+            if pid == admin:
+                await self.http.post(
+                    f"/api/rooms/{room_id}/{kind}", params={"player_id": pid}, json=body
+                )
+
+
+async def run_load(
+    base_url: str,
+    rooms: int,
+    players: int,
+    think: ThinkTime,
+    ramp: float = 0.0,
+    seed: int = 0,
+    fanout_timeout: float = 10.0,
+    reconnect_storm: bool = False,
+    bot_rooms: int = 0,
+) -> LoadStats:
+    stats = LoadStats()
+    ws_base = "ws" + base_url.removeprefix("http")
+    storm = ReconnectStorm(rooms) if reconnect_storm else None
+    limits = httpx.Limits(max_connections=max(100, rooms), max_keepalive_connections=rooms)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as http:
+
+        async def room(i: int) -> None:
+            await asyncio.sleep(ramp * i / rooms)
+            runner = RoomRunner(
+                http,
+                ws_base,
+                players,
+                think,
+                random.Random(seed + i),
+                stats,
+                fanout_timeout,
+                storm,
+            )
+            await runner.run()
+
+        background = [
+            asyncio.create_task(BotRoomRunner(http, players, random.Random(-i), stats).run())
+            for i in range(1, bot_rooms + 1)
+        ]
+        start = time.perf_counter()
+        await asyncio.gather(*(room(i) for i in range(rooms)))
+        stats.elapsed = time.perf_counter() - start
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+    return stats
+
+
+async def connect_fake_redis(*_args: Any, **_kwargs: Any) -> None:
+    """Stand-in for ``RedisClient.connect``: instrumented pools on one in-memory server."""
+    import fakeredis
+    from fakeredis.aioredis import FakeAsyncRedisConnection
+
+    from app.core.redis import (
+        InstrumentedConnectionPool,
+        InstrumentedRedis,
+        RedisClient,
+        TrafficClass,
+    )
+
+    server = fakeredis.FakeServer()
+    RedisClient._clients = {
+        traffic: InstrumentedRedis.from_pool(
+            InstrumentedConnectionPool(
+                connection_class=FakeAsyncRedisConnection,
+                server=server,
+                max_connections=1000,
+                decode_responses=True,
+                traffic=traffic.value,
+            )
+        )
+        for traffic in TrafficClass
+    }
+
+
+@contextlib.asynccontextmanager
+async def serve_in_process(
+    fake_redis: bool = False, wrap: Callable[[Any], Any] | None = None
+) -> AsyncIterator[str]:
+    """Serve ``app.main:app`` (through ``wrap`` if given) on a free loopback port.
+
+    Yields the base URL.
+    """
+    import uvicorn
+
+    from app.core.redis import RedisClient
+    from app.main import app
+
+    original_connect = RedisClient.connect
+    if fake_redis:
+        RedisClient.connect = connect_fake_redis  # type: ignore[method-assign]
+
+    asgi_app = wrap(app) if wrap else app
+    server = uvicorn.Server(uvicorn.Config(asgi_app, host="127.0.0.1", port=0, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    try:
+        while not server.started:
+            if task.done():
+                task.result()
+            await asyncio.sleep(0.01)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
+        RedisClient.connect = original_connect  # type: ignore[method-assign]
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    think = parse_think(args.think)
+    options = {"reconnect_storm": args.reconnect_storm, "bot_rooms": args.bot_rooms}
+    if args.url:
+        stats = await run_load(
+            args.url, args.rooms, args.players, think, args.ramp, args.seed, **options
+        )
+    else:
+        async with serve_in_process(args.fake_redis) as url:
+            stats = await run_load(
+                url, args.rooms, args.players, think, args.ramp, args.seed, **options
+            )
+    return stats.report()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Base URL of a running server; in-process when omitted")
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--think", default="exp:0.2", help="const:S, uniform:LO:HI or exp:MEAN")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds to start all rooms")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--reconnect-storm",
+        action="store_true",
+        help="Reconnect every socket at once after all rooms are set up",
+    )
+    parser.add_argument(
+        "--bot-rooms", type=int, default=0, help="Background rooms played by server-side bots"
+    )
+    parser.add_argument("--fake-redis", action="store_true", help="In-process only")
+    parser.add_argument("--output", help="Also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    report = asyncio.run(_main(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Logging overhead per night action with the dev and production logging profiles.
+
+Each action is one ``process_action`` + ``check_and_advance`` on a 30-player night that never
+completes, which is the per-action hot path of ``GameService``. Output goes to ``os.devnull``
+so only the cost of building, rendering and writing records is measured. For the production
+profile the rendering thread competes for the GIL, so the number includes that work too.
+
+    python -m benchmarks.logging_overhead [--actions N]
+"""
+
+import argparse
+import logging
+import os
+import time
+from pathlib import Path
+
+from app.core import logging as app_logging
+from app.models.game import Game
+from app.schemas.game import GameSettingsSchema, NightActionType, RoleType
+
+PLAYERS = 30
+ROLES = {RoleType.WEREWOLF: 6, RoleType.SEER: 2, RoleType.DOCTOR: 2}
+
+
+def _night_game() -> tuple[Game, str, str]:
+    game = Game.create("bench", GameSettingsSchema(role_distribution=dict(ROLES)))
+    for i in range(PLAYERS):
+        game.add_player(f"p{i}", f"Player{i}")
+    game.start_game()
+    wolf = next(p.id for p in game.players.values() if p.role == RoleType.WEREWOLF)
+    target = next(p.id for p in game.players.values() if p.role == RoleType.VILLAGER)
+    return game, wolf, target
+
+
+def _run(actions: int) -> float:
+    """Seconds per action."""
+    game, wolf, target = _night_game()
+    # Unconfirmed, so the night stays open and every action takes the same path.
+    action = {"action_type": NightActionType.KILL.value, "target_id": target, "confirmed": False}
+    start = time.perf_counter()
+    for _ in range(actions):
+        game.process_action(wolf, action)
+        game.check_and_advance()
+    app_logging.shutdown_logging()  # Drain the queue so its work is counted
+    return (time.perf_counter() - start) / actions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--actions", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with Path(os.devnull).open("w") as devnull:
+        results = {}
+        for profile in ("off", "dev", "production"):
+            app_logging.setup_logging("dev" if profile == "off" else profile, devnull)
+            if profile == "off":
+                logging.getLogger().setLevel(logging.WARNING)
+            results[profile] = _run(args.actions)
+        app_logging.setup_logging()
+
+    baseline = results["off"]
+    print(f"{'profile':<12}{'us/action':>12}{'overhead':>12}")
+    for profile, seconds in results.items():
+        overhead = (seconds - baseline) * 1e6
+        print(f"{profile:<12}{seconds * 1e6:>12.2f}{overhead:>+12.2f}")
+
+
+if __name__ == "__main__":
+    main()
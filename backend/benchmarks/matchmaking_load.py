@@ -0,0 +1,128 @@
+"""Quick-play throughput: N players queue at once and wait on their sockets to be placed.
+
+Each player POSTs ``/api/matchmaking`` and opens ``/ws/matchmaking/{player_id}``, arriving
+over ``--ramp`` seconds, and waits for ``MATCH_FOUND``. Reported: players placed and rooms
+created per second, the wait from enqueue to ``MATCH_FOUND``, how many ``QUEUE_STATUS``
+frames were pushed, and players still waiting after ``--timeout`` (fewer than the smallest
+room can be left over).
+
+Without ``--url`` the app is served in-process as in ``benchmarks.load_test``; matchmaking
+runs on the server's ``Matchmaker`` loop, every ``MATCHMAKING_TICK_SECONDS``.
+
+    python -m benchmarks.matchmaking_load --fake-redis --players 2000 --ramp 2
+    python -m benchmarks.matchmaking_load --url http://localhost:8000 --players 20000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from websockets.asyncio.client import connect
+
+from benchmarks.load_test import LatencyHistogram, serve_in_process
+
+
+@dataclass
+class MatchmakingStats:
+    wait: LatencyHistogram = field(default_factory=LatencyHistogram)
+    rooms: set[str] = field(default_factory=set)
+    errors: Counter = field(default_factory=Counter)
+    players: int = 0
+    placed: int = 0
+    status_updates: int = 0
+    elapsed: float = 0.0
+
+    def report(self) -> dict[str, Any]:
+        per_s = (lambda n: round(n / self.elapsed, 1)) if self.elapsed else (lambda _n: 0.0)
+        return {
+            "elapsed_s": round(self.elapsed, 2),
+            "players": self.players,
+            "placed": self.placed,
+            "unplaced": self.players - self.placed,
+            "rooms": len(self.rooms),
+            "players_per_s": per_s(self.placed),
+            "rooms_per_s": per_s(len(self.rooms)),
+            "status_updates": self.status_updates,
+            "errors": dict(self.errors),
+            "wait": self.wait.summary(),
+        }
+
+
+async def _quick_play(
+    http: httpx.AsyncClient, ws_base: str, i: int, stats: MatchmakingStats, timeout: float
+) -> None:
+    start = time.perf_counter()
+    try:
+        response = await http.post("/api/matchmaking", json={"nickname": f"Quick{i}"})
+        response.raise_for_status()
+        player_id = response.json()["player_id"]
+        async with (
+            asyncio.timeout(timeout),
+            connect(f"{ws_base}/ws/matchmaking/{player_id}", open_timeout=30) as ws,
+        ):
+            async for raw in ws:
+                message = json.loads(raw)
+                if message["type"] == "QUEUE_STATUS":
+                    stats.status_updates += 1
+                elif message["type"] == "MATCH_FOUND":
+                    stats.placed += 1
+                    stats.rooms.add(message["payload"]["room_id"])
+                    stats.wait.observe(time.perf_counter() - start)
+                    return
+                elif message["type"] == "ERROR":
+                    stats.errors[message["payload"].get("code") or "error"] += 1
+                    return
+    except TimeoutError:
+        pass  # Still queued: counted as unplaced
+    except Exception as e:
+        stats.errors[type(e).__name__] += 1
+
+
+async def run_matchmaking_load(
+    base_url: str, players: int, ramp: float = 0.0, timeout: float = 60.0
+) -> MatchmakingStats:
+    stats = MatchmakingStats(players=players)
+    ws_base = "ws" + base_url.removeprefix("http")
+    limits = httpx.Limits(max_connections=100)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as http:
+
+        async def player(i: int) -> None:
+            await asyncio.sleep(ramp * i / players)
+            await _quick_play(http, ws_base, i, stats, timeout)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(player(i) for i in range(players)))
+        stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    options = {"players": args.players, "ramp": args.ramp, "timeout": args.timeout}
+    async with contextlib.AsyncExitStack() as stack:
+        url = args.url or await stack.enter_async_context(serve_in_process(args.fake_redis))
+        stats = await run_matchmaking_load(url, **options)
+    return stats.report()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Base URL of a running server; in-process when omitted")
+    parser.add_argument("--players", type=int, default=800)
+    parser.add_argument("--ramp", type=float, default=2.0, help="Seconds to queue all players")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Longest wait per player")
+    parser.add_argument("--fake-redis", action="store_true", help="In-process only")
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    print(json.dumps(asyncio.run(_main(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Microbenchmarks for the game model hot paths, compared against a JSON baseline.
+
+Every case runs at each player count in ``--sizes``. Timings are the best of ``--repeat``
+runs of an auto-sized loop (at least ``--min-time`` seconds each), in seconds per call.
+Cases that mutate the game (phase resolution) run on fresh copies made outside the timer.
+
+    python -m benchmarks.microbench                      # compare with baseline.json
+    python -m benchmarks.microbench --update-baseline    # re-record it
+    python -m benchmarks.microbench --sizes 5 50 --threshold 0.5
+
+Exits with status 1 when a case is more than ``--threshold`` slower than the baseline.
+The committed baseline is from one machine; re-record it on yours before comparing
+branches, and commit a new one when a change makes a case faster or slower on purpose.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from app.models.game import Game
+from app.models.phases import get_phase_state
+from app.schemas.game import GamePhase, RoleType
+
+NIGHT = get_phase_state(GamePhase.NIGHT)
+DAY = get_phase_state(GamePhase.DAY)
+BASELINE = Path(__file__).with_name("baseline.json")
+SIZES = (5, 10, 50, 200, 1000)
+
+
+def night_game(players: int) -> Game:
+    """A started game with every night action in, so completion checks walk every player."""
+    game = Game.create(f"bench{players}", seed=players)
+    for i in range(players):
+        game.add_player(f"p{i}", f"Player{i}", is_admin=i == 0)
+    game.auto_balance_roles()
+    game.start_game()
+
+    ids = list(game.players)
+    victim = next(pid for pid in ids if game.players[pid].role != RoleType.WEREWOLF)
+    for pid, player in game.players.items():
+        target = ids[(ids.index(pid) + 1) % len(ids)]
+        if player.role == RoleType.WEREWOLF:
+            target = victim
+        elif player.role == RoleType.CUPID:
+            target = f"{ids[0]},{ids[1]}"
+        player.night_action_target = target
+        player.night_action_confirmed = True
+    return game
+
+
+def day_game(players: int) -> Game:
+    """A day where every living player has voted for the same player."""
+    game = night_game(players)
+    game.transition_to(GamePhase.DAY)
+    target = next(pid for pid, p in game.players.items() if p.role == RoleType.VILLAGER)
+    for player in game.players.values():
+        player.vote_target = target
+    return game
+
+
+# Builds the call for a player count: (make an argument, timed function of it).
+Builder = Callable[[int], tuple[Callable[[], Any], Callable[[Any], Any]]]
+
+
+@dataclass
+class Case:
+    name: str
+    build: Builder
+
+
+def _fixed(make_game: Callable[[int], Game], fn: Callable[[Game], Any]) -> Builder:
+    def build(players: int):
+        game = make_game(players)
+        return (lambda: game), fn
+
+    return build
+
+
+def _fresh(make_game: Callable[[int], Game], fn: Callable[[Game], Any]) -> Builder:
+    def build(players: int):
+        game = make_game(players)
+        return game.copy, fn
+
+    return build
+
+
+def _all_views(game: Game) -> None:
+    for pid in game.players:
+        game.get_view_for_player(pid)
+
+
+def _from_json(players: int):
+    data = night_game(players).to_json()
+    return (lambda: data), Game.from_json
+
+
+CASES = [
+    Case("game.from_json", _from_json),
+    Case("game.to_json", _fixed(night_game, Game.to_json)),
+    Case("game.to_schema", _fixed(night_game, Game.to_schema)),
+    Case("game.get_view_for_player.all", _fixed(night_game, _all_views)),
+    Case("night.check_completion", _fixed(night_game, NIGHT.check_completion)),
+    Case("night.resolve", _fresh(night_game, NIGHT.resolve)),
+    Case("day.resolve", _fresh(day_game, DAY.resolve)),
+    Case("game.check_winners", _fixed(night_game, Game.check_winners)),
+    Case("game.auto_balance_roles", _fixed(night_game, Game.auto_balance_roles)),
+]
+
+
+def measure(case: Case, players: int, min_time: float, repeat: int) -> float:
+    """Best seconds per call over ``repeat`` loops of at least ``min_time`` each."""
+    make_arg, fn = case.build(players)
+
+    def run(number: int) -> float:
+        args = [make_arg() for _ in range(number)]
+        start = time.perf_counter()
+        for arg in args:
+            fn(arg)
+        return time.perf_counter() - start
+
+    number = 1
+    while (elapsed := run(number)) < min_time:
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        best = min(best, run(number) / number)
+    return best
+
+
+def run_suite(
+    sizes: tuple[int, ...] = SIZES,
+    min_time: float = 0.2,
+    repeat: int = 3,
+    cases: list[Case] = CASES,
+) -> dict[str, float]:
+    return {
+        f"{case.name}/{players}": measure(case, players, min_time, repeat)
+        for case in cases
+        for players in sizes
+    }
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> list[tuple[str, float, float | None, bool]]:
+    """Rows of (key, seconds, ratio to baseline, regressed) for every result."""
+    rows = []
+    for key, seconds in results.items():
+        before = baseline.get(key)
+        ratio = seconds / before if before else None
+        rows.append((key, seconds, ratio, ratio is not None and ratio > 1 + threshold))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, help="Also write these results as JSON")
+    args = parser.parse_args()
+
+    results = run_suite(tuple(args.sizes), args.min_time, args.repeat)
+    document = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(document, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    baseline = json.loads(args.baseline.read_text())["results"] if args.baseline.exists() else {}
+    rows = compare(results, baseline, args.threshold)
+    print(f"{'case':<42}{'us/call':>14}{'vs baseline':>14}")
+    for key, seconds, ratio, regressed in rows:
+        change = f"{ratio:.2f}x" if ratio is not None else "new"
+        print(f"{key:<42}{seconds * 1e6:>14.2f}{change:>14}{'  REGRESSED' if regressed else ''}")
+    if any(regressed for *_, regressed in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Redis round trips per route call, checked against each route's declared budget.
+
+Plays a scripted game against the app served in-process on fakeredis. A wrapper around the
+ASGI app records every round trip made while handling each HTTP call, and for WebSockets and
+event streams until the first frame is sent (the handshake). Routes declare their budget with
+``@redis_budget(n)`` from ``app.core.redis``. ``tests/test_redis_budgets.py`` fails when a
+call goes over budget; this module prints the report:
+
+    python -m benchmarks.redis_budget
+
+The counts cover the default group-commit path (``ROOM_OWNERSHIP_ENABLED`` off). Work done
+after a save by the ``ConnectionManager`` fan-out is not charged to the route.
+"""
+
+import asyncio
+import json
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+from websockets.asyncio.client import connect
+
+from app.core.redis import count_round_trips
+from benchmarks.load_test import plan_day, plan_night, role_distribution, serve_in_process
+
+PLAYERS = 5
+
+
+@dataclass
+class RouteCall:
+    route: str
+    budget: int | None
+    commands: list[str]
+
+
+class RoundTripRecorder:
+    """ASGI wrapper that records the Redis round trips of every route call."""
+
+    def __init__(self, app: Any):
+        self.app = app
+        self.calls: list[RouteCall] = []
+
+    def _record(self, scope: dict, commands: list[str]) -> None:
+        route = scope.get("route")
+        if route is None:
+            return
+        prefix = "WS" if scope["type"] == "websocket" else scope["method"]
+        budget = getattr(scope.get("endpoint"), "redis_budget", None)
+        self.calls.append(RouteCall(f"{prefix} {route.path}", budget, list(commands)))
+
+    async def __call__(
+        self,
+        scope: dict,
+        receive: Callable[[], Awaitable[dict]],
+        send: Callable[[dict], Awaitable[None]],
+    ) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        with count_round_trips() as commands:
+            recorded = False
+            streaming = False
+
+            async def send_and_record(message: dict) -> None:
+                # Recorded before the client can see the end of the response or the first
+                # frame, so a call is always charged before the next one starts.
+                nonlocal recorded, streaming
+                if message["type"] == "http.response.start":
+                    streaming = (b"content-type", b"text/event-stream") in [
+                        (name.lower(), value.split(b";")[0]) for name, value in message["headers"]
+                    ]
+                ends_call = message["type"] == "websocket.send" or (
+                    message["type"] == "http.response.body"
+                    and (streaming or not message.get("more_body"))
+                )
+                if ends_call and not recorded:
+                    recorded = True
+                    self._record(scope, commands)
+                await send(message)
+
+            await self.app(scope, receive, send_and_record)
+
+
+async def _play(http: httpx.AsyncClient, ws_base: str) -> None:
+    room_id = (await http.post("/api/rooms", json={})).json()["room_id"]
+    players = [f"p{i}" for i in range(PLAYERS)]
+    for i, pid in enumerate([*players, "extra"]):
+        joined = await http.post(
+            f"/api/rooms/{room_id}/join", json={"nickname": f"Bot{i}", "player_id": pid}
+        )
+        joined.raise_for_status()
+    admin = players[0]
+    await http.post(f"/api/rooms/{room_id}/kick", json={"player_id": admin, "target_id": "extra"})
+    bots = await http.post(f"/api/rooms/{room_id}/bots", json={"player_id": admin, "count": 1})
+    bot_id = next(pid for pid, p in bots.json()["players"].items() if p["is_bot"])
+    await http.post(f"/api/rooms/{room_id}/kick", json={"player_id": admin, "target_id": bot_id})
+    settings = (await http.get(f"/api/rooms/{room_id}")).json()["settings"]
+    settings["role_distribution"] = role_distribution(PLAYERS)
+    await http.post(f"/api/rooms/{room_id}/settings", params={"player_id": admin}, json=settings)
+    await http.get(f"/api/rooms/{room_id}", params={"player_id": admin})
+    await http.get("/api/roles")
+    await http.get("/api/lobby", params={"sort": "recent"})
+    await http.post(
+        "/api/balance/predict", json={"role_distribution": settings["role_distribution"]}
+    )
+
+    async with connect(f"{ws_base}/ws/{room_id}/{admin}") as ws:
+        await ws.recv()
+        events = http.stream(
+            "GET", f"/api/rooms/{room_id}/events", params={"player_id": players[1]}
+        )
+        async with events as stream:
+            await anext(stream.aiter_lines())
+        started = await http.post(f"/api/rooms/{room_id}/start", json={"player_id": admin})
+        started.raise_for_status()
+        # The room's first spectator loads it; the second shares the first one's stream.
+        async with (
+            connect(f"{ws_base}/ws/spectate/{room_id}") as first,
+            connect(f"{ws_base}/ws/spectate/{room_id}") as second,
+        ):
+            await first.recv()
+            await second.recv()
+
+        rng = random.Random(0)
+        for plan in (plan_night, plan_day):
+            state = (await http.get(f"/api/rooms/{room_id}")).json()
+            for pid, kind, body in plan(state, rng):
+                response = await http.post(
+                    f"/api/rooms/{room_id}/{kind}", params={"player_id": pid}, json=body
+                )
+                response.raise_for_status()
+
+    await http.post(f"/api/rooms/{room_id}/end", json={"player_id": admin})
+    await http.post(f"/api/rooms/{room_id}/restart", json={"player_id": admin})
+
+    # One player is never enough for a room, so they wait until they leave.
+    ticket = (await http.post("/api/matchmaking", json={"nickname": "Solo"})).json()
+    async with connect(f"{ws_base}/ws/matchmaking/{ticket['player_id']}") as ws:
+        await ws.recv()
+    (await http.delete(f"/api/matchmaking/{ticket['player_id']}")).raise_for_status()
+
+
+async def measure_round_trips() -> list[RouteCall]:
+    """Play one scripted game and return the Redis round trips of every route call."""
+    recorder: RoundTripRecorder | None = None
+
+    def wrap(app: Any) -> RoundTripRecorder:
+        nonlocal recorder
+        recorder = RoundTripRecorder(app)
+        return recorder
+
+    async with (
+        serve_in_process(fake_redis=True, wrap=wrap) as url,
+        httpx.AsyncClient(base_url=url, timeout=30) as http,
+    ):
+        ws_base = "ws" + url.removeprefix("http")
+        # The first game loads the Lua scripts (a NOSCRIPT retry each); budgets are for the
+        # steady state, so only the second game is recorded.
+        await _play(http, ws_base)
+        assert recorder is not None
+        recorder.calls.clear()
+        await _play(http, ws_base)
+    return recorder.calls
+
+
+def summarize(calls: list[RouteCall]) -> dict[str, dict[str, Any]]:
+    """Per route: calls, budget, most round trips in one call and that call's commands."""
+    report: dict[str, dict[str, Any]] = {}
+    for call in calls:
+        entry = report.setdefault(
+            call.route, {"calls": 0, "budget": call.budget, "max": -1, "commands": []}
+        )
+        entry["calls"] += 1
+        if len(call.commands) > entry["max"]:
+            entry["max"] = len(call.commands)
+            entry["commands"] = call.commands
+    return dict(sorted(report.items()))
+
+
+def main() -> None:
+    report = summarize(asyncio.run(measure_round_trips()))
+    print(f"{'route':<36}{'calls':>6}{'max':>5}{'budget':>8}  commands")
+    for route, entry in report.items():
+        budget = "-" if entry["budget"] is None else entry["budget"]
+        over = "  OVER BUDGET" if entry["budget"] is not None and entry["max"] > budget else ""
+        print(
+            f"{route:<36}{entry['calls']:>6}{entry['max']:>5}{budget:>8}  "
+            f"{json.dumps(entry['commands'])}{over}"
+        )
+
+
+if __name__ == "__main__":
+    main()
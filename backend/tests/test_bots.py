@@ -0,0 +1,117 @@
+import asyncio
+import random
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.models.game import Game
+from app.schemas.game import GamePhase, GameSettingsSchema, NightActionType
+from app.services import mutations
+from app.services.bots import BotScheduler
+from app.services.game_service import GameService, bot_scheduler
+from app.sim.policies import HeuristicPolicy
+
+
+@pytest.fixture
+async def redis():
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    with (
+        patch("app.core.redis.RedisClient.get_client", return_value=client),
+        patch.object(settings, "BOT_THINK_MIN_SECONDS", 0.0),
+        patch.object(settings, "BOT_THINK_MAX_SECONDS", 0.01),
+    ):
+        yield client
+    await client.aclose()
+
+
+@pytest.fixture
+async def scheduler():
+    bot_scheduler.start()
+    yield bot_scheduler
+    await bot_scheduler.stop()
+
+
+def test_add_bots_fills_seats_and_rebalances():
+    game = Game.create("room")
+    game.add_player("admin", "Bot 1", is_admin=True)
+    mutations.add_bots(game, "admin", ["b1", "b2", "b3", "b4"])
+
+    bots = [p for p in game.players.values() if p.is_bot]
+    assert [p.nickname for p in bots] == ["Bot 2", "Bot 3", "Bot 4", "Bot 5"]
+    assert sum(game.settings.role_distribution.values()) == 5
+
+    with pytest.raises(ValueError, match="Only admin"):
+        mutations.add_bots(game, "b1", ["b5"])
+    game.start_game()
+    with pytest.raises(ValueError, match="before the game starts"):
+        mutations.add_bots(game, "admin", ["b5"])
+
+
+@pytest.mark.usefixtures("redis", "scheduler")
+async def test_bots_play_a_game_to_the_end():
+    service = GameService()
+    room_id = (await service.create_room(GameSettingsSchema())).room_id
+    await service.join_room(room_id, "Alice", "alice")
+    state = await service.add_bots(room_id, "alice", 6)
+    assert sum(p.is_bot for p in state.players.values()) == 6
+    await service.start_game(room_id, "alice")
+
+    # The test plays Alice with the same policy the bots use.
+    alice = HeuristicPolicy(random.Random(0))
+    async with asyncio.timeout(10):
+        while (game := await service.get_game(room_id)).phase != GamePhase.GAME_OVER:
+            await _play_human(service, game, "alice", alice)
+            await asyncio.sleep(0.01)
+
+    assert game.winners
+
+
+async def test_observe_is_a_no_op_when_stopped():
+    scheduler = BotScheduler(GameService)
+    game = Game.create("room")
+    game.add_player("admin", "Alice", is_admin=True)
+    mutations.add_bots(game, "admin", ["b1", "b2", "b3", "b4"])
+    game.start_game()
+
+    scheduler.observe(game.to_schema())
+    assert not scheduler._moves
+
+
+async def test_moves_planned_for_a_finished_phase_are_dropped(scheduler):
+    game = Game.create("room")
+    game.add_player("admin", "Alice", is_admin=True)
+    mutations.add_bots(game, "admin", ["b1", "b2", "b3", "b4"])
+    game.start_game()
+
+    with (
+        patch.object(settings, "BOT_THINK_MIN_SECONDS", 60.0),
+        patch.object(settings, "BOT_THINK_MAX_SECONDS", 60.0),
+    ):
+        scheduler.observe(game.to_schema())
+    assert len(scheduler._moves) == 4
+    # Seeing the same state again plans nothing new.
+    scheduler.observe(game.to_schema())
+    assert len(scheduler._moves) == 4
+
+    game.transition_to(GamePhase.GAME_OVER)
+    scheduler.observe(game.to_schema())
+    outcomes = [await scheduler._submit(move) for move in scheduler._moves]
+    assert outcomes == ["stale"] * 4
+
+
+async def _play_human(service: GameService, game: Game, pid: str, policy: HeuristicPolicy):
+    player = game.players[pid]
+    if game.phase == GamePhase.NIGHT and player.is_alive and player.night_action_target is None:
+        action = policy.night_action(game, player)
+        if action:
+            await service.submit_action(
+                game.room_id, pid, action["action_type"], action["target_id"] or "SKIP"
+            )
+    elif game.phase == GamePhase.DAY and player.is_alive and player.vote_target is None:
+        if target := policy.choose_vote(game, player):
+            await service.submit_vote(game.room_id, pid, target)
+    elif game.phase == GamePhase.HUNTER_REVENGE and game.voted_out_this_round == pid:
+        target = policy.choose_revenge(game, player)
+        await service.submit_action(game.room_id, pid, NightActionType.REVENGE.value, target)
@@ -0,0 +1,194 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.models.game import Game
+from app.schemas.game import GamePhase, RoleType
+from app.services.game_service import GameService
+from app.services.game_store import RoomHandshake
+from app.services.spectators import SpectatorStream
+from app.services.websocket_manager import ConnectionManager, HandshakeAdmission, RoomSnapshot
+
+
+@pytest.mark.asyncio
+async def test_state_changes_in_a_burst_render_once():
+    manager = ConnectionManager()
+    manager.active_connections["room1"] = {"p1": MagicMock()}
+    manager._broadcast_state = AsyncMock()
+
+    for version in (1, 2, 3):
+        game = Game.create("room1")
+        game.turn_count = version
+        manager._schedule_state_broadcast("room1", version, "", game.to_json())
+    manager._schedule_state_broadcast("room1", 2, "", Game.create("room1").to_json())  # Stale
+    await asyncio.gather(*manager._tasks)
+
+    manager._broadcast_state.assert_awaited_once()
+    rendered = manager._broadcast_state.await_args.args[1]
+    assert rendered.turn_count == 3
+
+
+@pytest.mark.asyncio
+async def test_sockets_connecting_together_share_one_load():
+    game = Game.create("room1")
+    for pid in ("p0", "p1", "p2"):
+        game.add_player(pid, pid)
+    loaded = RoomHandshake(
+        state=game.to_json(),
+        was_online={"p1"},
+        online={"p0", "p1", "p2"},
+        version=3,
+        seq=0,
+        events=[],
+    )
+
+    manager = ConnectionManager()
+    manager._get_pubsub = AsyncMock()
+    with patch(
+        "app.services.websocket_manager.load_for_handshake", AsyncMock(return_value=loaded)
+    ) as load:
+        results = await asyncio.gather(
+            *(manager.connect("room1", pid, AsyncMock()) for pid in ("p0", "p1", "p2"))
+        )
+
+    load.assert_awaited_once()
+    assert load.await_args.args[1] == ["p0", "p1", "p2"]
+    snapshots = {id(snapshot) for snapshot, _ in results}
+    assert len(snapshots) == 1
+    assert [was_online for _, was_online in results] == [False, True, False]
+    assert set(manager.active_connections["room1"]) == {"p0", "p1", "p2"}
+
+
+@pytest.mark.asyncio
+async def test_spectators_share_one_load_and_one_render_per_version():
+    game = Game.create("room1")
+    for pid, role in (("p0", RoleType.WEREWOLF), ("p1", RoleType.SEER)):
+        game.add_player(pid, pid)
+        game.players[pid].role = role
+    game.phase = GamePhase.NIGHT
+    game.players["p0"].night_action_target = "p1"
+    loaded = RoomHandshake(
+        state=game.to_json(), was_online=set(), online={"p0"}, version=3, seq=0, events=[]
+    )
+
+    manager = ConnectionManager()
+    manager._get_pubsub = AsyncMock()
+    sockets = [AsyncMock() for _ in range(50)]
+    with patch(
+        "app.services.websocket_manager.load_for_handshake", AsyncMock(return_value=loaded)
+    ) as load:
+        assert all(
+            await asyncio.gather(*(manager.connect_spectator("room1", ws) for ws in sockets))
+        )
+    stream = manager.spectator_streams["room1"]
+    await stream._sender  # Frames go out on the stream's own task
+
+    load.assert_awaited_once()
+    assert load.await_args.args[1] == []  # Spectators are never marked online
+    assert "room1" in manager.active_connections and not manager.active_connections["room1"]
+    first = {ws.send_text.await_args.args[0] for ws in sockets}
+    assert len(first) == 1
+    view = json.loads(first.pop())
+    assert view["version"] == 3
+    players = view["payload"]["players"]
+    assert [players[pid]["role"] for pid in ("p0", "p1")] == ["WEREWOLF", "SEER"]
+    assert players["p0"]["night_action_target"] is None
+    assert [players[pid]["is_online"] for pid in ("p0", "p1")] == [True, False]
+
+    game.turn_count = 2
+    service = GameService()
+    with (
+        patch("app.services.websocket_manager.GameService", return_value=service),
+        patch.object(service, "get_all_player_presence", AsyncMock(return_value={})),
+        patch.object(service, "get_spectator_view", wraps=service.get_spectator_view) as render,
+    ):
+        await manager._broadcast_state("room1", game, version=4)
+        await manager._broadcast_state("room1", game, version=4)  # Another node's echo
+        await stream._sender
+    render.assert_awaited_once()
+    assert {json.loads(ws.send_text.await_args.args[0])["version"] for ws in sockets} == {4}
+
+    manager._unsubscribe = AsyncMock()
+    for ws in sockets:
+        await manager.disconnect_spectator("room1", ws)
+    manager._unsubscribe.assert_awaited_once_with("room1")
+
+
+@pytest.mark.asyncio
+async def test_spectator_frames_go_out_after_the_delay():
+    stream = SpectatorStream("room1", delay=0.05)
+    early, late = AsyncMock(), AsyncMock()
+    await stream.add(early)
+
+    stream.publish(1, "v1")
+    stream.publish(1, "v1 again")  # Already queued
+    await asyncio.sleep(0.01)
+    early.send_text.assert_not_awaited()
+
+    await asyncio.sleep(0.06)
+    early.send_text.assert_awaited_once_with("v1")
+    # Later spectators start from the frame last sent, not the newest one queued.
+    stream.publish(2, "v2")
+    await stream.add(late)
+    late.send_text.assert_awaited_once_with("v1")
+    await stream.close()
+
+
+@pytest.mark.asyncio
+async def test_reconnects_are_announced_in_one_digest():
+    manager = ConnectionManager()
+    manager.broadcast_to_room = AsyncMock()
+    with patch.object(settings, "WS_PRESENCE_DIGEST_SECONDS", 0):
+        for pid in ("p0", "p1", "p2"):
+            manager.queue_reconnect("room1", pid, f"Player {pid}")
+        await asyncio.gather(*manager._tasks)
+
+    manager.broadcast_to_room.assert_awaited_once()
+    message = manager.broadcast_to_room.await_args.args[1]
+    assert [p.player_id for p in message.payload.reconnected] == ["p0", "p1", "p2"]
+
+
+def test_handshakes_over_the_limit_are_told_to_retry_later():
+    admission = HandshakeAdmission()
+    with patch.multiple(settings, WS_HANDSHAKE_CONCURRENCY=1, WS_RETRY_AFTER_SECONDS=2.0):
+        assert admission.try_acquire()
+        assert not admission.try_acquire()
+        assert 2000 <= admission.retry_after_ms() <= 4000
+        admission.release()
+        assert admission.try_acquire()
+
+
+@pytest.mark.asyncio
+async def test_drain_hints_every_socket_then_closes_the_stragglers():
+    manager = ConnectionManager()
+    leaving, staying = AsyncMock(), AsyncMock()
+    manager.active_connections["room1"] = {"p0": leaving, "p1": staying}
+
+    async def reconnect_elsewhere(_data: str):
+        manager.active_connections["room1"].pop("p0")
+
+    leaving.send_text.side_effect = reconnect_elsewhere
+    with patch("app.services.websocket_manager.RECONNECT_HINT_GRACE", 0.01):
+        await manager.drain(window=0.1)
+
+    assert manager.draining
+    for ws in (leaving, staying):
+        hint = json.loads(ws.send_text.await_args.args[0])
+        assert hint["type"] == "RECONNECT" and 0 <= hint["payload"]["delay_ms"] <= 100
+    leaving.close.assert_not_awaited()
+    staying.close.assert_awaited_once_with(1012)
+
+
+def test_resume_replays_only_buffered_events():
+    snapshot = RoomSnapshot(
+        Game.create("room1"), {}, version=1, seq=12, events=["e10", "e11", "e12"]
+    )
+    assert snapshot.events_after(12) == []
+    assert snapshot.events_after(10) == ["e11", "e12"]
+    assert snapshot.events_after(9) == ["e10", "e11", "e12"]
+    # e9 has left the buffer, and a seq from the future means the room was reset.
+    assert snapshot.events_after(8) is None
+    assert snapshot.events_after(13) is None
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import httpx
+
+from app.services.sse import SSE_QUEUE_SIZE, SSEConnection, parse_event_id
+from app.services.websocket_manager import manager
+from benchmarks.load_test import serve_in_process
+
+
+async def _next_event(lines) -> tuple[str, dict]:
+    """The next (id, data) event on an event stream, skipping comments."""
+    fields: dict[str, str] = {}
+    async for line in lines:
+        if not line:
+            if "data" in fields:
+                return fields.get("id", ""), json.loads(fields["data"])
+            fields = {}
+        elif not line.startswith(":"):
+            name, _, value = line.partition(": ")
+            fields[name] = value
+    raise AssertionError("Stream ended")
+
+
+async def test_event_ids_carry_the_latest_seq_and_version():
+    connection = SSEConnection(seq=4, version=2)
+    assert connection.event('{"type":"STATE_UPDATE","version":3}').startswith("id: 4.3\n")
+    assert connection.event('{"type":"CHAT","seq":5}').startswith("id: 5.3\n")
+    assert connection.event('{"type":"PING","seq":null}').startswith("id: 5.3\n")
+
+    assert parse_event_id("5.3") == (5, 3)
+    assert parse_event_id("garbage") is None
+    assert parse_event_id(None) is None
+
+
+async def test_a_client_too_far_behind_is_dropped():
+    connection = SSEConnection()
+    for i in range(SSE_QUEUE_SIZE + 1):
+        await connection.send_text(f'{{"seq":{i}}}')
+    # Whatever was queued is dropped with it; the client resumes from its Last-Event-ID.
+    assert [event async for event in connection.events(keepalive=1)] == []
+
+
+async def test_event_stream_pushes_updates_and_resumes_from_last_event_id():
+    async with (
+        serve_in_process(fake_redis=True) as url,
+        httpx.AsyncClient(base_url=url, timeout=10) as http,
+    ):
+        room_id = (await http.post("/api/rooms", json={})).json()["room_id"]
+        for pid in ("p0", "p1"):
+            joined = await http.post(
+                f"/api/rooms/{room_id}/join", json={"nickname": pid, "player_id": pid}
+            )
+            joined.raise_for_status()
+        events_url = f"/api/rooms/{room_id}/events"
+
+        async with http.stream("GET", events_url, params={"player_id": "p1"}) as stream:
+            assert stream.headers["content-type"].startswith("text/event-stream")
+            lines = stream.aiter_lines()
+            first_id, first = await _next_event(lines)
+            assert first["type"] == "STATE_UPDATE"
+            assert first_id == f"{first['seq']}.{first['version']}"
+            assert first["payload"]["players"]["p0"]["role"] is None  # p1's own view
+
+            await http.post(
+                f"/api/rooms/{room_id}/join", json={"nickname": "P2", "player_id": "p2"}
+            )
+            last_id, update = await _next_event(lines)
+            assert update["version"] > first["version"] and "p2" in update["payload"]["players"]
+
+        for _ in range(100):  # The stream's cleanup runs once the server sees it closed
+            if "p1" not in manager.active_connections.get(room_id, {}):
+                break
+            await asyncio.sleep(0.02)
+        assert "p1" not in manager.active_connections.get(room_id, {})
+
+        # Up to date: nothing is resent, and the next change is the first event.
+        headers = {"Last-Event-ID": last_id}
+        async with http.stream("GET", events_url, params={"player_id": "p1"}, headers=headers) as s:
+            lines = s.aiter_lines()
+            await http.post(
+                f"/api/rooms/{room_id}/join", json={"nickname": "P3", "player_id": "p3"}
+            )
+            _, resumed = await _next_event(lines)
+            assert resumed["type"] == "STATE_UPDATE"
+            assert resumed["version"] > update["version"]
+            assert "p3" in resumed["payload"]["players"]
+
+        missing = await http.get("/api/rooms/nope/events", params={"player_id": "p1"})
+        assert missing.status_code == 404
@@ -1,5 +1,8 @@
+import pytest
+
 from app.models.game import Game
 from app.schemas.game import GamePhase, GameSettingsSchema, RoleType
+from app.services import mutations
 
 
 class TestGameInitialization:
@@ -25,6 +28,18 @@ class TestGameInitialization:
         assert player.role == RoleType.SPECTATOR
         assert player.nickname == "Alice"
 
+    def test_join_is_refused_while_the_game_runs(self):
+        game = Game.create("room1")
+        game.phase = GamePhase.NIGHT
+        with pytest.raises(ValueError, match="spectate"):
+            mutations.join(game, "id1", "Alice")
+        assert not game.players
+
+        # Between rounds a join still takes a seat for the next one.
+        game.phase = GamePhase.GAME_OVER
+        mutations.join(game, "id1", "Alice")
+        assert "id1" in game.players
+
 
 class TestRoleAssignment:
     def test_assign_roles_correctly(self):
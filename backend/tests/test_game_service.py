@@ -23,7 +23,7 @@ async def test_create_room(mock_redis):
 
     assert result.room_id is not None
     assert len(result.players) == 0  # Empty room now
-    mock_redis.set.assert_called_once()
+    assert mock_redis.evalsha.call_count == 2  # The save, then the lobby listing
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,167 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.core.keys import (
+    game_key,
+    owner_key,
+    presence_key,
+    room_changes_channel,
+    room_channel,
+    version_key,
+)
+from app.models.game import Game
+from app.schemas.game import GamePhase, RoleType
+from app.services.game_service import GameService
+from app.services.game_store import (
+    load_for_handshake,
+    parse_room_changed,
+    publish_room_event,
+    save_and_publish,
+)
+
+
+class CountingRedis(fakeredis.FakeAsyncRedis):
+    """Fake Redis that records the name of every command sent."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands: list[str] = []
+
+    async def execute_command(self, *args, **options):
+        self.commands.append(str(args[0]).upper())
+        return await super().execute_command(*args, **options)
+
+
+@pytest.fixture
+async def redis():
+    client = CountingRedis(decode_responses=True)
+    with patch("app.core.redis.RedisClient.get_client", return_value=client):
+        yield client
+    await client.aclose()
+
+
+async def _next_message(pubsub) -> str:
+    async def poll() -> str:
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1)
+            if message is not None:
+                return message["data"]
+
+    return await asyncio.wait_for(poll(), timeout=2.0)
+
+
+@pytest.mark.asyncio
+async def test_stored_state_and_notification_agree(redis):
+    pubsub = redis.pubsub()
+    await pubsub.ssubscribe(room_changes_channel("room1"))
+
+    game = Game.create("room1")
+    for i in range(3):
+        game.add_player(f"p{i}", f"Player {i}")
+        version = await save_and_publish(redis, "room1", game.to_json())
+
+        changed = parse_room_changed(await _next_message(pubsub))
+        assert changed == (version, "", await redis.get(game_key("room1")))
+        assert int(await redis.get(version_key("room1"))) == version == i + 1
+
+    assert await redis.ttl(game_key("room1")) > 0
+    assert await redis.ttl(version_key("room1")) > 0
+    await pubsub.aclose()
+
+
+@pytest.mark.asyncio
+async def test_full_state_never_reaches_the_relayed_room_channel(redis):
+    pubsub = redis.pubsub()
+    await pubsub.ssubscribe(room_channel("room1"))
+
+    await save_and_publish(redis, "room1", Game.create("room1").to_json())
+
+    assert await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1) is None
+    await pubsub.aclose()
+
+
+@pytest.mark.asyncio
+async def test_fenced_save_writes_and_publishes_nothing(redis):
+    pubsub = redis.pubsub()
+    await pubsub.ssubscribe(room_changes_channel("room1"))
+    await redis.set(owner_key("room1"), "node-a")
+
+    version = await save_and_publish(redis, "room1", "{}", fence_node="node-b")
+
+    assert version == 0
+    assert await redis.get(game_key("room1")) is None
+    assert await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1) is None
+    await pubsub.aclose()
+
+
+@pytest.mark.asyncio
+async def test_vote_persists_and_notifies_in_one_round_trip(redis):
+    game = Game.create("room1")
+    for i in range(4):
+        game.add_player(f"p{i}", f"Player {i}", is_admin=i == 0)
+        game.players[f"p{i}"].role = RoleType.WEREWOLF if i == 0 else RoleType.VILLAGER
+    game.phase = GamePhase.DAY
+    await redis.set(game_key("room1"), game.to_json())
+
+    service = GameService()
+    await service.submit_vote("room1", "p1", "p0")  # Warm the script cache
+
+    redis.commands.clear()
+    await service.submit_vote("room1", "p2", "p0")
+
+    # Lock acquire, state load, save-and-publish, lock release.
+    assert redis.commands == ["SET", "GET", "EVALSHA", "EVALSHA"]
+    stored = json.loads(await redis.get(game_key("room1")))
+    assert stored["players"]["p2"]["vote_target"] == "p0"
+
+
+@pytest.mark.asyncio
+async def test_handshake_loads_state_and_presence_in_one_round_trip(redis):
+    game = Game.create("room1")
+    for i in range(3):
+        game.add_player(f"p{i}", f"Player {i}")
+    await save_and_publish(redis, "room1", game.to_json())
+    await redis.set(presence_key("room1", "p1"), "1")
+
+    handshake = await load_for_handshake("room1", ["p0"], presence_ttl=90)
+    assert handshake is not None
+    assert handshake.state == game.to_json()
+    assert handshake.was_online == set()
+    assert handshake.online == {"p0", "p1"}
+    assert 0 < await redis.ttl(presence_key("room1", "p0")) <= 90
+
+    # A batch with a live and a new client, with the script cached: still one round trip.
+    redis.commands.clear()
+    handshake = await load_for_handshake("room1", ["p0", "p2"], presence_ttl=90)
+    assert redis.commands == ["EVALSHA"]
+    assert handshake is not None
+    assert handshake.was_online == {"p0"}
+    assert handshake.online == {"p0", "p1", "p2"}
+
+    assert await load_for_handshake("missing", ["p0"], presence_ttl=90) is None
+    assert await redis.get(presence_key("missing", "p0")) is None
+
+
+async def test_room_events_are_numbered_and_buffered(redis):
+    game = Game.create("room1")
+    await save_and_publish(redis, "room1", game.to_json())
+
+    with patch.object(settings, "ROOM_EVENT_BUFFER_SIZE", 2):
+        for i in range(3):
+            assert await publish_room_event("room1", json.dumps({"type": "CHAT", "n": i})) == i + 1
+
+    handshake = await load_for_handshake("room1", ["p0"], presence_ttl=90, with_events=True)
+    assert handshake is not None
+    assert (handshake.version, handshake.seq) == (1, 3)
+    assert [json.loads(event) for event in handshake.events] == [
+        {"type": "CHAT", "n": 1, "seq": 2},
+        {"type": "CHAT", "n": 2, "seq": 3},
+    ]
+    # Only resuming handshakes read the buffer.
+    handshake = await load_for_handshake("room1", ["p0"], presence_ttl=90)
+    assert handshake is not None and handshake.events == []
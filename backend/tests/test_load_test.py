@@ -0,0 +1,34 @@
+import random
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from benchmarks.load_test import parse_think, run_load, serve_in_process
+
+
+def test_parse_think():
+    rng = random.Random(0)
+    assert parse_think("const:0.5")(rng) == 0.5
+    assert 1.0 <= parse_think("uniform:1:2")(rng) <= 2.0
+    assert parse_think("exp:0")(rng) == 0.0
+    with pytest.raises(ValueError):
+        parse_think("normal:1")
+
+
+@pytest.mark.asyncio
+async def test_load_run_plays_full_games_in_process():
+    # A handshake limit below the storm's size, so some sockets are told to retry.
+    limits = {"WS_HANDSHAKE_CONCURRENCY": 2, "WS_RETRY_AFTER_SECONDS": 0.01}
+    with patch.multiple(settings, **limits):
+        async with serve_in_process(fake_redis=True) as url:
+            stats = await run_load(
+                url, rooms=2, players=5, think=parse_think("const:0"), reconnect_storm=True
+            )
+
+    report = stats.report()
+    assert report["errors"] == {}
+    assert report["games_completed"] == 2
+    assert report["fanout"]["count"] == report["actions"] > 0
+    assert report["handshake"]["count"] == report["reconnect"]["count"] == 10
+    assert report["retried_handshakes"] > 0
@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.schemas.game import GameSettingsSchema
+from app.services.game_service import GameService
+from app.services.lobby import list_open_rooms
+
+
+@pytest.fixture
+async def redis():
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    with patch("app.core.redis.RedisClient.get_client", return_value=client):
+        yield client
+    await client.aclose()
+
+
+async def _room(service: GameService, players: int) -> str:
+    room_id = (await service.create_room(GameSettingsSchema())).room_id
+    for i in range(players):
+        await service.join_room(room_id, f"P{i}", f"{room_id}-p{i}")
+    return room_id
+
+
+@pytest.mark.usefixtures("redis")
+async def test_lobby_lists_waiting_rooms_by_players_and_recency():
+    service = GameService()
+    small, big, medium = [await _room(service, n) for n in (1, 5, 3)]
+
+    page = await list_open_rooms("players", 0, 20)
+    assert [r.room_id for r in page.rooms] == [big, medium, small]
+    assert [r.player_count for r in page.rooms] == [5, 3, 1]
+    assert page.rooms[0].host == "P0"
+    assert page.total == 3
+
+    await service.join_room(small, "Late", "late")
+    page = await list_open_rooms("recent", 0, 2)
+    assert [r.room_id for r in page.rooms] == [small, medium]
+    page = await list_open_rooms("recent", 2, 2)
+    assert [r.room_id for r in page.rooms] == [big]
+
+
+@pytest.mark.usefixtures("redis")
+async def test_started_rooms_leave_the_lobby_and_restarted_ones_return():
+    service = GameService()
+    room_id = await _room(service, 3)
+    admin = f"{room_id}-p0"
+
+    await service.start_game(room_id, admin)
+    assert (await list_open_rooms("players", 0, 20)).total == 0
+    await service.restart_game(room_id, admin)
+    assert [r.room_id for r in (await list_open_rooms("players", 0, 20)).rooms] == [room_id]
+
+    await service.kick_player(room_id, admin, f"{room_id}-p2")
+    assert (await list_open_rooms("players", 0, 20)).rooms[0].player_count == 2
+
+
+@pytest.mark.usefixtures("redis")
+async def test_expired_rooms_are_pruned_when_listing():
+    service = GameService()
+    await _room(service, 2)
+    with patch.object(settings, "GAME_TTL_SECONDS", -1):
+        page = await list_open_rooms("players", 0, 20)
+    assert page.total == 0 and not page.rooms
@@ -0,0 +1,55 @@
+import io
+import json
+import logging
+from unittest.mock import patch
+
+import pytest
+import structlog
+from asgi_correlation_id import correlation_id
+
+from app.core import logging as app_logging
+from app.core.config import settings
+
+
+@pytest.fixture
+def production_log():
+    stream = io.StringIO()
+    with patch.object(settings, "LOG_HOT_PATH_SAMPLE_RATE", 0.0):
+        app_logging.setup_logging("production", stream)
+    yield stream
+    app_logging.setup_logging()
+
+
+def _records(stream: io.StringIO) -> list[dict]:
+    app_logging.shutdown_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_production_profile_renders_off_thread_with_caller_context(production_log):
+    log = structlog.get_logger("test")
+    token = correlation_id.set("req-7")
+    try:
+        log.info("joined", room_id="r1")
+        logging.getLogger("test.stdlib").warning("slow %s", "save")
+    finally:
+        correlation_id.reset(token)
+
+    info, warning = _records(production_log)
+    assert info["event"] == "joined" and info["correlation_id"] == "req-7"
+    # Callsites are captured for warnings only.
+    assert "func_name" not in info
+    assert warning["event"] == "slow save" and warning["correlation_id"] == "req-7"
+    assert warning["func_name"] == "test_production_profile_renders_off_thread_with_caller_context"
+
+
+def test_hot_path_events_are_sampled(production_log):
+    hot = logging.getLogger("test.hot")
+    assert not app_logging.sample_hot_path(hot)
+
+    app_logging.setup_logging("dev", production_log)
+    assert app_logging.sample_hot_path(hot)
+    hot.setLevel(logging.WARNING)
+    try:
+        assert not app_logging.sample_hot_path(hot)
+    finally:
+        hot.setLevel(logging.NOTSET)
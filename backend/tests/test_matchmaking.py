@@ -0,0 +1,111 @@
+import json
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.services import matchmaking
+from app.services.game_service import GameService
+from app.services.matchmaking import Matchmaker
+from benchmarks.load_test import serve_in_process
+from benchmarks.matchmaking_load import run_matchmaking_load
+
+
+@pytest.fixture
+async def redis():
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    with patch("app.core.redis.RedisClient.get_client", return_value=client):
+        yield client
+    await client.aclose()
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent: list[dict] = []
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+
+@pytest.mark.usefixtures("redis")
+async def test_enqueue_reports_position_and_keeps_it():
+    for i in range(3):
+        ticket = await matchmaking.enqueue(f"p{i}", f"P{i}")
+        assert (ticket.position, ticket.queued) == (i, i + 1)
+
+    again = await matchmaking.enqueue("p0", "Renamed")
+    assert (again.position, again.queued) == (0, 3)
+
+    assert await matchmaking.leave("p1")
+    assert not await matchmaking.leave("p1")
+    assert (await matchmaking.enqueue("p2", "P2")).position == 1
+
+
+@pytest.mark.usefixtures("redis")
+async def test_match_fills_whole_rooms_with_one_save_each():
+    for i in range(2 * settings.MATCHMAKING_ROOM_SIZE + 3):
+        await matchmaking.enqueue(f"p{i}", "Same" if i < 2 else f"P{i}")
+    service = GameService()
+    matchmaker = Matchmaker(lambda: service)
+
+    with patch.object(service, "_save_game", wraps=service._save_game) as save:
+        assert await matchmaker.match() == 2
+    assert save.call_count == 2
+
+    rooms = [call.args[0] for call in save.call_args_list]
+    first = rooms[0]
+    assert list(first.players) == [f"p{i}" for i in range(settings.MATCHMAKING_ROOM_SIZE)]
+    assert first.players["p0"].is_admin
+    assert [first.players[p].nickname for p in ("p0", "p1")] == ["Same", "Same 2"]
+    for game in rooms:
+        assert sum(game.settings.role_distribution.values()) == settings.MATCHMAKING_ROOM_SIZE
+
+    # The three left over wait: too few for a room, and not waiting long enough anyway.
+    assert await matchmaker.match() == 0
+    socket = FakeSocket()
+    assert not await matchmaker.watch("p0", socket)
+    assert socket.sent[-1]["type"] == "MATCH_FOUND"
+    assert socket.sent[-1]["payload"] == {"room_id": first.room_id}
+
+
+@pytest.mark.usefixtures("redis")
+async def test_long_wait_opens_a_smaller_room():
+    for i in range(settings.MATCHMAKING_MIN_ROOM_SIZE):
+        await matchmaking.enqueue(f"p{i}", f"P{i}")
+    matchmaker = Matchmaker(GameService)
+    assert await matchmaker.match() == 0
+
+    with patch.object(settings, "MATCHMAKING_MAX_WAIT_SECONDS", 0.0):
+        assert await matchmaker.match() == 1
+    # Everyone was taken, so the next player is first in line.
+    assert (await matchmaking.enqueue("late", "Late")).position == 0
+
+
+@pytest.mark.usefixtures("redis")
+async def test_waiting_sockets_get_their_position():
+    for i in range(3):
+        await matchmaking.enqueue(f"p{i}", f"P{i}")
+    matchmaker = Matchmaker(GameService)
+    sockets = {pid: FakeSocket() for pid in ("p1", "gone")}
+
+    assert await matchmaker.watch("p1", sockets["p1"])
+    assert not await matchmaker.watch("gone", sockets["gone"])
+    assert matchmaker.waiting == 1
+
+    status = sockets["p1"].sent[-1]
+    assert status["type"] == "QUEUE_STATUS"
+    assert status["payload"] == {"position": 1, "queued": 3, "eta_seconds": None}
+    assert sockets["gone"].sent[-1]["payload"]["code"] == "NOT_QUEUED"
+
+
+async def test_quick_play_load_places_everyone_in_process():
+    with patch.object(settings, "MATCHMAKING_TICK_SECONDS", 0.05):
+        async with serve_in_process(fake_redis=True) as url:
+            stats = await run_matchmaking_load(url, players=2 * settings.MATCHMAKING_ROOM_SIZE)
+
+    report = stats.report()
+    assert report["errors"] == {}
+    assert report["placed"] == 2 * settings.MATCHMAKING_ROOM_SIZE
+    assert report["rooms"] == 2
+    assert report["wait"]["count"] == report["placed"]
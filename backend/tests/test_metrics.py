@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.game import Game
+from app.services.websocket_manager import manager
+
+
+def _sample(body: str, prefix: str) -> float:
+    line = next(line for line in body.splitlines() if line.startswith(prefix))
+    return float(line.rsplit(" ", 1)[1])
+
+
+def test_metrics_endpoint_exports_hot_path_metrics():
+    client = TestClient(app)
+    client.get("/api/version")
+    Game.from_json(Game.create("room1").to_json())
+    manager.active_connections["room1"] = {"p1": object(), "p2": object()}
+    try:
+        body = client.get("/metrics").text
+    finally:
+        del manager.active_connections["room1"]
+
+    route = 'method="GET",route="/api/version",status="200"'
+    assert _sample(body, f"werewolf_http_request_duration_seconds_count{{{route}}}") >= 1
+    assert _sample(body, 'werewolf_game_serialization_seconds_count{op="from_json"}') >= 1
+    assert _sample(body, "werewolf_active_rooms ") == 1
+    assert _sample(body, 'werewolf_room_sockets_bucket{le="2"}') == 1
+    assert 'werewolf_background_tasks{kind="mutation_drainers"}' in body
@@ -0,0 +1,17 @@
+from benchmarks.microbench import CASES, compare, run_suite
+
+
+def test_every_case_runs():
+    results = run_suite(sizes=(5,), min_time=0.0, repeat=1)
+    assert set(results) == {f"{case.name}/5" for case in CASES}
+    assert all(seconds > 0 for seconds in results.values())
+
+
+def test_compare_flags_only_slowdowns_past_threshold():
+    baseline = {"a/5": 1.0, "b/5": 1.0}
+    rows = compare({"a/5": 1.2, "b/5": 1.5, "c/5": 9.0}, baseline, threshold=0.25)
+    assert [(key, regressed) for key, _, _, regressed in rows] == [
+        ("a/5", False),
+        ("b/5", True),
+        ("c/5", False),
+    ]
@@ -0,0 +1,183 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.exceptions import InvalidActionError
+from app.models.game import Game
+from app.schemas.game import GamePhase, GameSettingsSchema, RoleType
+from app.services.game_service import GameService
+from app.services.game_store import _SAVE_AND_PUBLISH_SCRIPT as _SAVE_SCRIPT
+from app.services.mutation_batcher import PendingMutation, apply_batch
+
+
+@pytest.fixture
+def mock_redis():
+    with patch("app.core.redis.RedisClient.get_client") as mock_get_client:
+        mock_redis = AsyncMock()
+        mock_redis.lock = MagicMock(return_value=AsyncMock())
+        mock_get_client.return_value = mock_redis
+        yield mock_redis
+
+
+def _day_game(player_count: int) -> str:
+    game = Game.create("room1")
+    for i in range(player_count):
+        game.add_player(f"p{i}", f"Player {i}", is_admin=i == 0)
+        game.players[f"p{i}"].role = RoleType.WEREWOLF if i == 0 else RoleType.VILLAGER
+    game.phase = GamePhase.DAY
+    return game.to_json()
+
+
+def _saved_state(mock_redis) -> dict:
+    # evalsha(sha, numkeys, game, version, owner, moved, state, ...)
+    return json.loads(mock_redis.evalsha.await_args.args[6])
+
+
+@pytest.mark.asyncio
+async def test_simultaneous_votes_share_one_load_and_save(mock_redis):
+    mock_redis.get.return_value = _day_game(50)
+    service = GameService()
+
+    # Everyone but one villager votes, so the phase stays open and every vote is visible.
+    results = await asyncio.gather(
+        *(service.submit_vote("room1", f"p{i}", "p0") for i in range(49))
+    )
+
+    assert all(r is not None for r in results)
+    assert mock_redis.get.await_count == 1
+    assert mock_redis.evalsha.await_count == 1
+    players = _saved_state(mock_redis)["players"]
+    assert sum(1 for p in players.values() if p["vote_target"] == "p0") == 49
+
+
+@pytest.mark.asyncio
+async def test_rejected_mutation_fails_only_its_caller(mock_redis):
+    mock_redis.get.return_value = _day_game(3)
+    service = GameService()
+
+    results = await asyncio.gather(
+        service.submit_vote("room1", "p1", "p0"),
+        service.kick_player("room1", "p1", "p2"),  # p1 is not admin
+        service.submit_vote("room1", "p2", "p0"),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[1], ValueError)
+    assert results[0] is not None and not isinstance(results[0], Exception)
+    assert results[2] is not None and not isinstance(results[2], Exception)
+    assert mock_redis.evalsha.await_count == 1
+    players = _saved_state(mock_redis)["players"]
+    assert players["p1"]["vote_target"] == "p0"
+    assert players["p2"]["vote_target"] == "p0"
+    assert "p2" in players
+
+
+@pytest.mark.asyncio
+async def test_burst_past_phase_change_is_not_replayed(mock_redis):
+    game = Game.create("room1")
+    for i in range(10):
+        game.add_player(f"p{i}", f"Player {i}")
+        game.players[f"p{i}"].role = RoleType.WEREWOLF if i < 2 else RoleType.VILLAGER
+    game.phase = GamePhase.DAY
+    mock_redis.get.return_value = game.to_json()
+    service = GameService()
+
+    # The tenth vote ends the day; the second round arrives too late and is rejected.
+    votes = [service.submit_vote("room1", f"p{i % 10}", "p2") for i in range(20)]
+    with patch.object(Game, "from_json", wraps=Game.from_json) as from_json:
+        results = await asyncio.gather(*votes, return_exceptions=True)
+
+    assert all(not isinstance(r, Exception) for r in results[:10])
+    assert all(isinstance(r, ValueError) for r in results[10:])
+    assert from_json.call_count == 1  # The load; rejections restore a checkpoint instead
+    saved = _saved_state(mock_redis)
+    assert saved["phase"] == GamePhase.NIGHT
+    assert saved["players"]["p2"]["is_alive"] is False
+
+
+@pytest.mark.asyncio
+async def test_partial_mutation_is_rolled_back(mock_redis):
+    game = Game.create("room1")
+    for pid, role in (("p0", RoleType.WEREWOLF), ("p1", RoleType.SEER), ("p2", RoleType.VILLAGER)):
+        game.add_player(pid, pid.upper())
+        game.players[pid].role = role
+    game.phase = GamePhase.NIGHT
+    mock_redis.get.return_value = game.to_json()
+    service = GameService()
+
+    results = await asyncio.gather(
+        # Flags the action confirmed before the role rejects the unknown target.
+        service.submit_action("room1", "p0", "KILL", "ghost"),
+        service.submit_action("room1", "p1", "CHECK", "p2"),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], InvalidActionError)
+    players = _saved_state(mock_redis)["players"]
+    assert players["p0"]["night_action_confirmed"] is False
+    assert players["p1"]["night_action_target"] == "p2"
+
+
+@pytest.mark.asyncio
+async def test_missing_room_resolves_every_caller_to_none(mock_redis):
+    mock_redis.get.return_value = None
+    mock_redis.evalsha.return_value = None  # No state left behind by an older layout either
+    service = GameService()
+
+    results = await asyncio.gather(
+        service.submit_vote("gone", "p1", "p0"), service.submit_vote("gone", "p2", "p0")
+    )
+
+    assert results == [None, None]
+    saves = [c for c in mock_redis.evalsha.await_args_list if c.args[0] == _SAVE_SCRIPT.sha]
+    assert saves == []
+
+
+@pytest.mark.asyncio
+async def test_join_burst_is_admitted_in_one_write(mock_redis):
+    mock_redis.get.return_value = Game.create("room1").to_json()
+    service = GameService()
+
+    joins = [service.join_room("room1", f"Player {i}", f"p{i}") for i in range(200)]
+    # Nicknames are unique case-insensitively, within the burst as well.
+    joins += [service.join_room("room1", f"PLAYER {i}", f"dup{i}") for i in range(5)]
+    results = await asyncio.gather(*joins, return_exceptions=True)
+
+    assert all(not isinstance(r, Exception) for r in results[:200])
+    assert all(isinstance(r, ValueError) for r in results[200:])
+    saves = [c for c in mock_redis.evalsha.await_args_list if c.args[0] == _SAVE_SCRIPT.sha]
+    assert mock_redis.get.await_count == len(saves) == 1
+    # The save and one lobby refresh for the whole burst.
+    assert mock_redis.evalsha.await_count == 2
+    saved = json.loads(saves[0].args[6])
+    assert len(saved["players"]) == 200
+    assert saved["players"]["p0"]["is_admin"]
+    assert sum(saved["settings"]["role_distribution"].values()) == 200
+
+
+@pytest.mark.asyncio
+async def test_rebalance_runs_before_the_next_kind_of_mutation():
+    game = Game.create("room1")
+    game.add_player("p0", "Admin", is_admin=True)
+    custom = {RoleType.WEREWOLF: 1, RoleType.VILLAGER: 2}
+    settings = GameSettingsSchema(role_distribution=custom).model_dump(mode="json")
+    batch = [
+        PendingMutation("join", {"player_id": "p1", "nickname": "Bob"}),
+        PendingMutation("join", {"player_id": "p2", "nickname": "Carol"}),
+        PendingMutation("update_settings", {"player_id": "p0", "settings": settings}),
+        PendingMutation("kick_player", {"player_id": "p0", "target_id": "p2"}),
+    ]
+
+    balance = Game.auto_balance_roles
+    with patch.object(Game, "auto_balance_roles", autospec=True, side_effect=balance) as rebalance:
+        game, applied = apply_batch(game, batch[:3])
+    # The joins' rebalance comes before the admin's own distribution, not over it.
+    assert len(applied) == 3 and rebalance.call_count == 1
+    assert game.settings.role_distribution == custom
+
+    game, _ = apply_batch(game, batch[3:])
+    assert sum(game.settings.role_distribution.values()) == 2
+    assert game.nickname_owner("carol") is None
+    assert game.nickname_owner("BOB") == "p1"
@@ -0,0 +1,36 @@
+import pytest
+from fastapi.routing import APIWebSocketRoute
+
+from app.api.routers import matchmaking, rooms, websocket
+from benchmarks.redis_budget import measure_round_trips, summarize
+
+
+def _declared_routes() -> dict[str, int | None]:
+    routes = {}
+    for route in rooms.router.routes + matchmaking.router.routes + websocket.router.routes:
+        if isinstance(route, APIWebSocketRoute):
+            routes[f"WS {route.path}"] = getattr(route.endpoint, "redis_budget", None)
+            continue
+        for method in route.methods:
+            routes[f"{method} {route.path}"] = getattr(route.endpoint, "redis_budget", None)
+    return routes
+
+
+def test_every_room_route_declares_a_budget():
+    missing = [route for route, budget in _declared_routes().items() if budget is None]
+    assert not missing
+
+
+@pytest.mark.asyncio
+async def test_routes_stay_within_redis_budgets():
+    report = summarize(await measure_round_trips())
+
+    # The scripted game exercises every declared route...
+    assert set(_declared_routes()) <= set(report)
+    # ...and none makes more round trips than it declares.
+    over = {
+        route: entry["commands"]
+        for route, entry in report.items()
+        if entry["budget"] is not None and entry["max"] > entry["budget"]
+    }
+    assert not over
@@ -0,0 +1,72 @@
+import fakeredis
+import pytest
+from fakeredis.aioredis import FakeAsyncRedisConnection
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.redis import (
+    InstrumentedConnectionPool,
+    InstrumentedRedis,
+    RedisClient,
+    TrafficClass,
+    count_round_trips,
+)
+
+
+@pytest.fixture
+async def pool():
+    pool = InstrumentedConnectionPool(
+        connection_class=FakeAsyncRedisConnection,
+        server=fakeredis.FakeServer(),
+        max_connections=1,
+        timeout=0.05,
+        decode_responses=True,
+    )
+    yield pool
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pool_tracks_checkouts_and_exhaustion(pool):
+    client = Redis.from_pool(pool)
+    await client.set("k", "v")
+    assert pool.stats.acquired == 1
+    assert pool.stats.in_use == 0
+
+    # A subscriber holds its connection, so the one-connection pool is now exhausted.
+    pubsub = client.pubsub()
+    await pubsub.subscribe("chan")
+    assert pool.stats.in_use == 1
+    with pytest.raises(RedisConnectionError):
+        await client.get("k")
+    assert pool.stats.timeouts == 1
+
+    await pubsub.aclose()
+    assert await client.get("k") == "v"
+    assert pool.stats.in_use == 0
+    assert pool.stats.wait_seconds_max >= 0
+
+
+def test_traffic_classes_use_separate_clients():
+    clients = {traffic: fakeredis.FakeAsyncRedis() for traffic in TrafficClass}
+    RedisClient._clients = clients
+    try:
+        assert RedisClient.for_room("r1", TrafficClass.PRESENCE) is clients[TrafficClass.PRESENCE]
+        assert RedisClient.for_room("r1") is clients[TrafficClass.STATE]
+        assert RedisClient.get_client(TrafficClass.PUBSUB) is clients[TrafficClass.PUBSUB]
+    finally:
+        RedisClient._clients = {}
+
+
+@pytest.mark.asyncio
+async def test_round_trips_are_counted_per_context(pool):
+    client = InstrumentedRedis.from_pool(pool)
+    with count_round_trips() as commands:
+        await client.set("k", "v")
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.get("k")
+            pipe.expire("k", 10)
+            await pipe.execute()
+    await client.get("k")
+
+    assert commands == ["SET", "PIPELINE(GET,EXPIRE)"]
@@ -0,0 +1,120 @@
+import json
+import random
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.models.game import Game
+from app.schemas.game import GamePhase, GameSettingsSchema, RoleType
+from app.services.game_service import GameService
+from app.sim.policies import HeuristicPolicy
+from app.sim.replay import ActionLog, replay
+
+ROLES = {RoleType.WEREWOLF: 2, RoleType.SEER: 1, RoleType.DOCTOR: 1, RoleType.VILLAGER: 2}
+
+
+@pytest.fixture
+async def records():
+    """Runs GameService over fakeredis with the action log on, capturing its records."""
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    captured: list[dict] = []
+    with (
+        patch("app.core.redis.RedisClient.get_client", return_value=client),
+        patch.object(settings, "ACTION_LOG_ENABLED", True),
+        patch("app.services.action_log.logger") as logger,
+    ):
+        logger.info.side_effect = lambda event, **fields: captured.append(
+            {"event": event, **fields}
+        )
+        yield captured
+    await client.aclose()
+
+
+def test_role_deal_follows_the_seed():
+    def deal(seed: int) -> list[RoleType | None]:
+        game = Game.create("room", GameSettingsSchema(role_distribution=ROLES), seed=seed)
+        for i in range(6):
+            game.add_player(f"p{i}", f"P{i}")
+        game.start_game()
+        return [p.role for p in game.players.values()]
+
+    assert deal(7) == deal(7)
+    assert len({tuple(deal(seed)) for seed in range(20)}) > 1
+
+
+async def test_recorded_game_replays_to_the_same_state(records):
+    service = GameService()
+    room_id = await _record_game(service)
+
+    log = ActionLog.from_records(records)
+    assert log.room_id == room_id
+    # Each join is committed on its own, so each is followed by the batch's rebalance.
+    assert [(a.op, a.accepted) for a in log.actions[:14]] == [
+        *[("join", True), ("rebalance_roles", True)] * 6,
+        ("join", False),
+        ("start_game", True),
+    ]
+
+    game, report = replay(log, check_every=True)
+    assert report.final_match and report.diverged_at is None
+    assert report.actions == len(log.actions)
+    assert game.digest() == (await service.get_game(room_id)).digest()
+
+
+async def test_divergence_is_located(records, tmp_path):
+    await _record_game(GameService())
+
+    # Raw log lines and a saved fixture load the same log.
+    lines = tmp_path / "server.log"
+    lines.write_text("starting up\n" + "\n".join(json.dumps(r) for r in records) + "\n")
+    log = ActionLog.load(lines)
+    log.save(tmp_path / "fixture.json")
+    assert ActionLog.load(tmp_path / "fixture.json") == log
+
+    # Redirect the first vote to another player, as a changed rule would.
+    vote = next(i for i, a in enumerate(log.actions) if a.op == "submit_vote")
+    args = log.actions[vote].args
+    args["target_id"] = next(
+        f"p{i}" for i in range(6) if f"p{i}" not in (args["player_id"], args["target_id"])
+    )
+    _, report = replay(log, check_every=True)
+    assert not report.final_match
+    assert report.diverged_at == vote
+
+
+async def _record_game(service: GameService) -> str:
+    room_id = (await service.create_room(GameSettingsSchema())).room_id
+    for i in range(6):
+        await service.join_room(room_id, f"P{i}", f"p{i}")
+    with pytest.raises(ValueError, match="Nickname already taken"):
+        await service.join_room(room_id, "P0", "dup")
+    await service.start_game(room_id, "p0", GameSettingsSchema(role_distribution=ROLES))
+    await _play_to_the_end(service, room_id)
+    return room_id
+
+
+async def _play_to_the_end(service: GameService, room_id: str) -> None:
+    policy = HeuristicPolicy(random.Random(0))
+    for _ in range(200):
+        game = await service.get_game(room_id)
+        if game.phase == GamePhase.GAME_OVER:
+            return
+        for pid, player in game.players.items():
+            game = await service.get_game(room_id)
+            player = game.players[pid]
+            if not player.is_alive or game.phase == GamePhase.GAME_OVER:
+                continue
+            if game.phase == GamePhase.NIGHT and player.night_action_target is None:
+                if action := policy.night_action(game, player):
+                    await service.submit_action(
+                        room_id, pid, action["action_type"], action["target_id"] or "SKIP"
+                    )
+            elif (
+                game.phase == GamePhase.DAY
+                and player.vote_target is None
+                and (target := policy.choose_vote(game, player))
+            ):
+                await service.submit_vote(room_id, pid, target)
+    raise AssertionError("game did not finish")
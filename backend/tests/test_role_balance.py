@@ -1,10 +1,21 @@
+import json
+
 import pytest
+from fastapi.testclient import TestClient
 
+from app.main import app
+from app.models import balance
+from app.models.balance import BalanceTable, balance_table, normalize_distribution
 from app.models.game import Game, GameState
 from app.models.roles import RoleType
 from app.schemas.game import GameSettingsSchema
 
 
+@pytest.fixture
+def no_balance_table(monkeypatch):
+    monkeypatch.setattr("app.models.game.balance_table", lambda: None)
+
+
 def create_game_with_players(count: int) -> Game:
     game = Game(GameState(room_id="test", settings=GameSettingsSchema()))
     for i in range(count):
@@ -12,6 +23,7 @@ def create_game_with_players(count: int) -> Game:
     return game
 
 
+@pytest.mark.usefixtures("no_balance_table")
 @pytest.mark.parametrize(
     "player_count,expected_roles",
     [
@@ -76,7 +88,7 @@ def create_game_with_players(count: int) -> Game:
         ),
     ],
 )
-def test_auto_balance_roles(player_count, expected_roles):
+def test_auto_balance_roles_without_table(player_count, expected_roles):
     game = create_game_with_players(player_count)
     game.auto_balance_roles()
 
@@ -92,9 +104,85 @@ def test_auto_balance_roles(player_count, expected_roles):
     assert total_assigned == player_count
 
 
+@pytest.mark.usefixtures("no_balance_table")
 def test_auto_balance_roles_defaults():
     # Test valid defaults exist for standard known ranges
     for i in range(4, 13):
         game = create_game_with_players(i)
         game.auto_balance_roles()
         assert sum(game.settings.role_distribution.values()) == i
+
+
+def test_shipped_table_covers_3_to_40_players():
+    table = balance_table()
+    assert table is not None
+    assert set(table.entries) == set(range(3, 41))
+    for players, entry in table.entries.items():
+        assert sum(entry.roles.values()) == players
+        assert normalize_distribution(players, entry.roles) == entry.roles
+        assert 0 < entry.villager_win < 1
+
+
+@pytest.mark.parametrize("player_count", [3, 9, 24, 40])
+def test_auto_balance_roles_reads_table(player_count):
+    game = create_game_with_players(player_count)
+    game.auto_balance_roles()
+    assert game.settings.role_distribution == balance_table().roles_for(player_count)
+
+
+def test_auto_balance_roles_falls_back_outside_table():
+    game = create_game_with_players(45)
+    game.auto_balance_roles()
+    distribution = game.settings.role_distribution
+    assert distribution[RoleType.WEREWOLF] == 2
+    assert distribution[RoleType.VILLAGER] == 45 - 9
+
+
+def test_missing_or_stale_table_disables_lookup(monkeypatch, tmp_path):
+    path = tmp_path / "balance_table.json"
+    monkeypatch.setattr(balance, "BALANCE_TABLE_PATH", path)
+    balance_table.cache_clear()
+    try:
+        assert balance_table() is None
+        path.write_text(json.dumps({"version": balance.BALANCE_TABLE_VERSION - 1}))
+        balance_table.cache_clear()
+        assert balance_table() is None
+    finally:
+        balance_table.cache_clear()
+
+
+def test_predict_villager_win():
+    table = balance_table()
+    entry = table.entries[9]
+    exact = table.predict_villager_win(9, entry.roles)
+    assert (exact.villager_win, exact.source) == (entry.villager_win, "table")
+
+    few = table.predict_villager_win(12, {RoleType.WEREWOLF: 1, RoleType.SEER: 1})
+    many = table.predict_villager_win(12, {RoleType.WEREWOLF: 4, RoleType.SEER: 1})
+    assert few.source == many.source == "model"
+    assert 0 < many.villager_win < few.villager_win < 1
+
+
+def test_predict_rejects_unplayable_distributions():
+    table = BalanceTable(json.loads(balance.BALANCE_TABLE_PATH.read_text()))
+    with pytest.raises(ValueError):
+        table.predict_villager_win(6, {RoleType.WEREWOLF: 3})
+    with pytest.raises(ValueError):
+        table.predict_villager_win(4, {RoleType.WEREWOLF: 1, RoleType.SEER: 4})
+    with pytest.raises(ValueError):
+        table.predict_villager_win(6, {RoleType.SEER: 1})
+
+
+def test_predict_route():
+    client = TestClient(app)
+    response = client.post(
+        "/api/balance/predict",
+        json={"role_distribution": {"WEREWOLF": 2, "SEER": 1, "VILLAGER": 7}},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["players"] == 10
+    assert 0 < body["villager_win"] < 1
+
+    response = client.post("/api/balance/predict", json={"role_distribution": {"WEREWOLF": 5}})
+    assert response.status_code == 400
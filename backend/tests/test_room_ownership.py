@@ -0,0 +1,160 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import InvalidActionError, RoomUnavailableError
+from app.core.keys import game_key, owner_key
+from app.models.game import Game
+from app.services.room_ownership import RoomOwnership, _decode_reply
+
+
+@pytest.fixture
+async def redis():
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    with (
+        patch("app.core.redis.RedisClient.get_client", return_value=client),
+        patch.object(settings, "ROOM_LEASE_TTL_MS", 400),
+        patch.object(settings, "ROOM_FORWARD_TIMEOUT", 0.2),
+    ):
+        yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def mock_redis():
+    with patch("app.core.redis.RedisClient.get_client") as mock_get_client:
+        mock_redis = AsyncMock()
+        mock_get_client.return_value = mock_redis
+        yield mock_redis
+
+
+def _stored_game() -> str:
+    game = Game.create("room1")
+    game.add_player("p1", "Alice", is_admin=True)
+    return game.to_json()
+
+
+@pytest.mark.asyncio
+async def test_owner_applies_mutations_without_reads(mock_redis):
+    stored = _stored_game()
+    mock_redis.set.return_value = True  # lease acquired
+    mock_redis.get.return_value = stored
+    mock_redis.evalsha.return_value = 1  # fenced write accepted
+
+    ownership = RoomOwnership()
+    result = await ownership.execute("room1", "join", {"player_id": "p2", "nickname": "Bob"})
+    assert result is not None
+    assert set(result.players) == {"p1", "p2"}
+
+    await ownership.execute("room1", "join", {"player_id": "p3", "nickname": "Carol"})
+
+    # The state is loaded once when the lease is taken; later mutations are pure writes.
+    assert mock_redis.get.await_count == 1
+    assert mock_redis.evalsha.await_count == 2
+    game = ownership.local_game("room1")
+    assert game is not None
+    assert set(game.players) == {"p1", "p2", "p3"}
+
+    await ownership.stop()
+
+
+@pytest.mark.asyncio
+async def test_rejected_mutation_rolls_back(mock_redis):
+    mock_redis.set.return_value = True
+    mock_redis.get.return_value = _stored_game()
+    mock_redis.evalsha.return_value = 1
+
+    ownership = RoomOwnership()
+    with pytest.raises(ValueError, match="already taken"):
+        await ownership.execute("room1", "join", {"player_id": "p2", "nickname": "alice"})
+
+    game = ownership.local_game("room1")
+    assert game is not None
+    assert set(game.players) == {"p1"}
+    mock_redis.evalsha.assert_not_awaited()
+
+    await ownership.stop()
+
+
+@pytest.mark.asyncio
+async def test_non_owner_forwards_to_lease_holder(mock_redis):
+    mock_redis.set.return_value = False  # lease held elsewhere
+    mock_redis.get.return_value = "other-node"
+    ownership = RoomOwnership()
+    owner_game = Game.from_json(_stored_game())
+
+    async def fake_publish(channel, data):
+        assert channel == "node:other-node"
+        command = json.loads(data)
+        assert command["op"] == "submit_vote"
+        owner_game.add_player("p2", "Bob")
+        ownership._pending[command["id"]].set_result(
+            {"kind": "reply", "id": command["id"], "result": owner_game.to_schema().model_dump()}
+        )
+        return 1
+
+    mock_redis.publish.side_effect = fake_publish
+
+    result = await ownership.execute("room1", "submit_vote", {"player_id": "p1", "target_id": "x"})
+    assert result is not None
+    assert "p2" in result.players
+    assert ownership.local_game("room1") is None
+
+
+def test_decode_reply_restores_game_errors():
+    with pytest.raises(InvalidActionError, match="Invalid target"):
+        _decode_reply({"error": {"type": "InvalidActionError", "message": "Invalid target"}})
+    assert _decode_reply({"result": None}) is None
+
+
+@pytest.mark.asyncio
+async def test_room_is_taken_over_when_owner_dies(redis):
+    await redis.set(game_key("room1"), _stored_game())
+    # A crashed node's lease: nobody listens on its channel and it is never renewed.
+    await redis.set(owner_key("room1"), "dead-node", px=300)
+
+    ownership = RoomOwnership()
+    result = await ownership.execute("room1", "join", {"player_id": "p2", "nickname": "Bob"})
+
+    assert result is not None
+    assert set(result.players) == {"p1", "p2"}
+    assert await redis.get(owner_key("room1")) == ownership.node_id
+    await ownership.stop()
+
+
+@pytest.mark.asyncio
+async def test_fenced_out_write_is_retried_once_on_the_new_owner(redis):
+    await redis.set(game_key("room1"), _stored_game())
+    ownership = RoomOwnership()
+    await ownership.execute("room1", "join", {"player_id": "p2", "nickname": "Bob"})
+
+    # Another node steals the lease and then dies: the next write is fenced out, nothing
+    # is persisted, and the mutation lands exactly once after the room is taken back.
+    await redis.set(owner_key("room1"), "node-c", px=300)
+    result = await ownership.execute("room1", "join", {"player_id": "p3", "nickname": "Carol"})
+
+    assert result is not None
+    assert set(result.players) == {"p1", "p2", "p3"}
+    stored = Game.from_json(await redis.get(game_key("room1")))
+    assert set(stored.players) == {"p1", "p2", "p3"}
+    await ownership.stop()
+
+
+@pytest.mark.asyncio
+async def test_unanswered_forward_is_not_retried(redis):
+    await redis.set(owner_key("room1"), "slow-node", px=10_000)
+    listener = redis.pubsub()
+    await listener.subscribe("node:slow-node")  # Receives the command but never replies
+
+    ownership = RoomOwnership()
+    with pytest.raises(RoomUnavailableError):
+        await ownership.execute("room1", "kick_player", {"player_id": "p1", "target_id": "p2"})
+
+    messages = [await listener.get_message(timeout=0.05) for _ in range(5)]
+    commands = [m for m in messages if m is not None and m["type"] == "message"]
+    assert len(commands) == 1
+    assert ownership._room_locks == {}
+    await listener.aclose()
@@ -44,7 +44,7 @@ async def test_update_settings_admin(mock_redis):
     assert result is not None
     assert result.settings.phase_duration_seconds == 90
     assert result.settings.role_distribution[RoleType.WEREWOLF] == 2
-    mock_redis.set.assert_called_once()
+    mock_redis.evalsha.assert_called_once()
 
 
 @pytest.mark.asyncio
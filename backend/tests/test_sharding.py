@@ -0,0 +1,128 @@
+import fakeredis
+import pytest
+
+from app.core.exceptions import RoomUnavailableError
+from app.core.keys import (
+    game_key,
+    legacy_game_key,
+    legacy_version_key,
+    lock_key,
+    presence_key,
+    room_channel,
+    room_id_from_tagged,
+    version_key,
+)
+from app.core.redis import HashRing, RedisClient, TrafficClass
+from app.services.game_store import (
+    load_game_state,
+    migrate_room,
+    rebalance_rooms,
+    save_and_publish,
+)
+
+ROOMS = [f"room{i}" for i in range(2000)]
+
+
+@pytest.fixture
+async def shards():
+    """Three fake shards, with the ring moved from ``a, b`` to ``a, b, c``."""
+    clients = {name: fakeredis.FakeAsyncRedis(decode_responses=True) for name in "abc"}
+    RedisClient._clients = dict.fromkeys(TrafficClass, clients["a"])
+    RedisClient._shards = {name: dict.fromkeys(TrafficClass, c) for name, c in clients.items()}
+    RedisClient._ring = HashRing(["a", "b", "c"])
+    RedisClient._previous_ring = HashRing(["a", "b"])
+    yield clients
+    RedisClient._clients = {}
+    RedisClient._shards = {}
+    RedisClient._ring = RedisClient._previous_ring = None
+    for client in clients.values():
+        await client.aclose()
+
+
+def _moved_room(old: str, new: str) -> str:
+    return next(
+        room
+        for room in ROOMS
+        if HashRing(["a", "b"]).get(room) == old and HashRing(["a", "b", "c"]).get(room) == new
+    )
+
+
+def test_ring_spreads_rooms_and_moves_few_on_growth():
+    before = HashRing(["a", "b"])
+    after = HashRing(["a", "b", "c"])
+
+    counts = {shard: 0 for shard in "abc"}
+    for room in ROOMS:
+        counts[after.get(room)] += 1
+    assert all(count > len(ROOMS) / 3 * 0.8 for count in counts.values())
+
+    # Only rooms that land on the new shard move; nothing shuffles between the old ones.
+    moved = [room for room in ROOMS if before.get(room) != after.get(room)]
+    assert all(after.get(room) == "c" for room in moved)
+    assert len(moved) < len(ROOMS) / 2
+
+
+def test_room_keys_share_one_hash_tag():
+    names = [
+        game_key("r1"),
+        lock_key("r1"),
+        version_key("r1"),
+        presence_key("r1", "p1"),
+        room_channel("r1"),
+    ]
+    assert {room_id_from_tagged(name) for name in names} == {"r1"}
+    assert room_id_from_tagged("system:keepalive") is None
+
+
+@pytest.mark.asyncio
+async def test_for_room_follows_ring(shards):
+    room = _moved_room("b", "c")
+    assert RedisClient.for_room(room) is shards["c"]
+    assert RedisClient.previous_for_room(room) is shards["b"]
+
+    stayed = _moved_room("a", "a")
+    assert RedisClient.for_room(stayed) is shards["a"]
+    assert RedisClient.previous_for_room(stayed) is None
+
+
+@pytest.mark.asyncio
+async def test_read_moves_room_and_fences_old_shard(shards):
+    room = _moved_room("b", "c")
+    await save_and_publish(shards["b"], room, '{"v": 1}')
+
+    assert await load_game_state(room) == '{"v": 1}'
+    assert await shards["c"].get(version_key(room)) == "1"
+    assert await shards["b"].get(game_key(room)) is None
+
+    # A node still on the old ring can no longer write to the old shard.
+    with pytest.raises(RoomUnavailableError):
+        await save_and_publish(shards["b"], room, '{"v": 2}')
+    assert await shards["b"].get(game_key(room)) is None
+
+    # Saves on the new shard are unaffected, and a second move finds nothing to do.
+    assert await save_and_publish(shards["c"], room, '{"v": 2}') == 2
+    assert await migrate_room(room) is False
+
+
+@pytest.mark.asyncio
+async def test_read_moves_legacy_untagged_room(shards):
+    room = _moved_room("a", "c")
+    await shards["a"].set(legacy_game_key(room), '{"v": 1}')
+    await shards["a"].set(legacy_version_key(room), "7")
+
+    assert await load_game_state(room) == '{"v": 1}'
+    assert await shards["c"].get(version_key(room)) == "7"
+    assert await shards["a"].get(legacy_game_key(room)) is None
+
+
+@pytest.mark.asyncio
+async def test_rebalance_moves_only_rooms_whose_shard_changed(shards):
+    moving = _moved_room("b", "c")
+    staying = _moved_room("b", "b")
+    for room in (moving, staying):
+        await save_and_publish(shards["b"], room, "{}")
+
+    assert await rebalance_rooms() == 1
+    assert await shards["c"].get(game_key(moving)) == "{}"
+    assert await shards["b"].get(game_key(staying)) == "{}"
+    assert await rebalance_rooms() == 0
@@ -0,0 +1,104 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.models.phases import get_phase_state  # noqa: E402
+from app.schemas.game import GamePhase  # noqa: E402
+from app.sim import kernel  # noqa: E402
+from app.sim.batch import run_batch  # noqa: E402
+from app.sim.policies import seer_claim  # noqa: E402
+from app.sim.simulator import RoleSetup, play_phases  # noqa: E402
+
+SETUPS = [
+    RoleSetup.balanced(5),
+    RoleSetup.balanced(9),
+    RoleSetup.parse("10:werewolf=3,doctor=1,bodyguard=1,witch=1,hunter=2,cupid=1,tanner=1"),
+]
+
+
+def sampled_phases(setup, phase, games=150):
+    """Games of ``setup`` with every action of ``phase`` in, one per (seed, phase)."""
+    sampled = []
+    for seed in range(games):
+        for policy in ("random", "heuristic"):
+            for game in play_phases(setup, seed, village=policy, wolves=policy):
+                if game.phase == phase:
+                    sampled.append(game.copy())
+    return sampled
+
+
+def resolved(games, phase):
+    """Resolve copies with the object model: alive masks, lovers and winners after."""
+    state = get_phase_state(phase)
+    after = []
+    for game in games:
+        game = game.copy()
+        next_phase = state.resolve(game)
+        after.append((game, next_phase))
+    return after
+
+
+@pytest.mark.parametrize("setup", SETUPS, ids=lambda s: s.label)
+def test_night_matches_object_model(setup):
+    games = sampled_phases(setup, GamePhase.NIGHT)
+    arrays = kernel.GameArrays.from_games(games)
+    kernel.resolve_night(arrays, kernel.NightActions.from_games(games))
+
+    expected = [game for game, _ in resolved(games, GamePhase.NIGHT)]
+    want = kernel.GameArrays.from_games(expected)
+    np.testing.assert_array_equal(arrays.alive, want.alive)
+    np.testing.assert_array_equal(arrays.lovers, want.lovers)
+    np.testing.assert_array_equal(arrays.winner, want.winner)
+    assert want.winner.any() and not want.winner.all()
+
+
+@pytest.mark.parametrize("setup", SETUPS, ids=lambda s: s.label)
+def test_day_matches_object_model(setup):
+    games = sampled_phases(setup, GamePhase.DAY)
+    arrays = kernel.GameArrays.from_games(games)
+    voted_out = kernel.resolve_day(arrays, kernel.votes_from_games(games))
+
+    expected = resolved(games, GamePhase.DAY)
+    want = kernel.GameArrays.from_games([game for game, _ in expected])
+    np.testing.assert_array_equal(arrays.alive, want.alive)
+    np.testing.assert_array_equal(arrays.winner, want.winner)
+    seats = [list(game.players) for game, _ in expected]
+    assert [
+        seat.index(game.voted_out_this_round) if game.voted_out_this_round else kernel.NOBODY
+        for seat, (game, _) in zip(seats, expected, strict=True)
+    ] == voted_out.tolist()
+
+
+def test_revenge_matches_object_model():
+    setup = SETUPS[2]
+    games = sampled_phases(setup, GamePhase.HUNTER_REVENGE, games=300)
+    assert games
+    arrays = kernel.GameArrays.from_games(games)
+    targets = kernel.NightActions.from_games(games).targets
+    hunter = np.array([list(g.players).index(g.voted_out_this_round) for g in games])
+    kernel.resolve_revenge(arrays, targets[np.arange(len(games)), hunter])
+
+    want = kernel.GameArrays.from_games([g for g, _ in resolved(games, GamePhase.HUNTER_REVENGE)])
+    np.testing.assert_array_equal(arrays.alive, want.alive)
+    np.testing.assert_array_equal(arrays.winner, want.winner)
+
+
+@pytest.mark.parametrize("bots", ["random", "heuristic"])
+def test_play_matches_simulator_win_rates(bots):
+    setup = RoleSetup.balanced(9)
+    rates = kernel.win_rates(setup, 20_000, seed=1, bots=bots)
+    assert rates.get("STALEMATE", 0.0) < 0.001  # A doctor can shield a claimed seer forever
+    assert sum(rates.values()) == pytest.approx(1.0)
+
+    *_, stats = run_batch([setup], 2_000, workers=0, village=bots, wolves=bots)
+    for team, rate in stats.win_rates().items():
+        assert rates.get(team, 0.0) == pytest.approx(rate, abs=0.04)
+
+
+def test_seer_claims_match_policies():
+    for game in sampled_phases(SETUPS[1], GamePhase.DAY):
+        seer, accused = kernel.seer_claims(kernel.GameArrays.from_games([game]))
+        seer_id, accused_ids = seer_claim(game)
+        seats = list(game.players)
+        assert (seats[seer[0]] if seer[0] != kernel.NOBODY else None) == seer_id
+        assert {seats[i] for i in np.flatnonzero(accused[0])} == accused_ids
@@ -0,0 +1,54 @@
+import pytest
+
+from app.schemas.game import RoleType
+from app.sim.batch import run_batch
+from app.sim.policies import POLICIES
+from app.sim.simulator import STALEMATE, RoleSetup, simulate_game
+
+
+@pytest.mark.parametrize("players", [4, 5, 7, 9, 12])
+@pytest.mark.parametrize("policy", sorted(POLICIES))
+def test_balanced_games_finish(players, policy):
+    setup = RoleSetup.balanced(players)
+    for seed in range(30):
+        result = simulate_game(setup, seed, village=policy, wolves=policy)
+        assert result.winner in {"VILLAGERS", "WEREWOLVES", "LOVERS", "TANNER"}
+        assert result.rounds >= 1
+
+
+def test_same_seed_same_game():
+    setup = RoleSetup.balanced(9)
+    first = [simulate_game(setup, seed) for seed in range(20)]
+    assert [simulate_game(setup, seed) for seed in range(20)] == first
+    assert len({(r.winner, r.rounds) for r in first}) > 1
+
+
+def test_setup_parse_and_label():
+    setup = RoleSetup.parse("8:werewolf=2,seer,doctor=1")
+    assert setup.players == 8
+    assert dict(setup.roles) == {RoleType.WEREWOLF: 2, RoleType.SEER: 1, RoleType.DOCTOR: 1}
+    assert RoleSetup.parse(setup.label) == setup
+
+
+def test_heuristic_village_beats_random_village():
+    setup = RoleSetup.parse("8:werewolf=2,seer=1,doctor=1")
+    wins = {}
+    for village in ("random", "heuristic"):
+        (stats,) = list(run_batch([setup], 400, workers=0, chunk_size=400, village=village))
+        wins[village] = stats.wins["VILLAGERS"]
+    assert wins["heuristic"] > wins["random"]
+
+
+def test_batch_totals_do_not_depend_on_workers_or_chunks():
+    setups = [RoleSetup.balanced(5), RoleSetup.balanced(9)]
+
+    def totals(**kwargs):
+        final = {}
+        for stats in run_batch(setups, 60, seed=7, **kwargs):
+            final[stats.setup] = (stats.games, dict(stats.wins))
+        return final
+
+    inline = totals(workers=0, chunk_size=60)
+    assert totals(workers=2, chunk_size=7) == inline
+    assert all(games == 60 for games, _ in inline.values())
+    assert all(STALEMATE not in wins for _, wins in inline.values())
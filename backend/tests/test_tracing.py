@@ -0,0 +1,77 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from asgi_correlation_id import correlation_id
+
+from app.core.config import settings
+from app.core.tracing import span
+from app.models.game import Game
+from app.schemas.game import GamePhase, RoleType
+from app.services.game_service import GameService
+
+
+@pytest.fixture
+def exported():
+    with patch("app.core.tracing.logger") as logger:
+        yield logger.info
+
+
+def _spans(exported) -> dict[str, dict]:
+    return {s["name"]: s for s in exported.call_args.kwargs["spans"]}
+
+
+def test_fast_unsampled_trace_is_dropped(exported):
+    with patch.object(settings, "TRACE_SAMPLE_RATE", 0.0), span("root"), span("child"):
+        pass
+    exported.assert_not_called()
+
+
+def test_slow_trace_is_exported_with_nested_spans(exported):
+    token = correlation_id.set("req-1")
+    try:
+        with (
+            patch.object(settings, "TRACE_SLOW_MS", 0.0),
+            span("root", room_size=5),
+            span("child") as child,
+        ):
+            child.set(bytes=42)
+    finally:
+        correlation_id.reset(token)
+
+    assert exported.call_args.kwargs["trace_id"] == "req-1"
+    spans = _spans(exported)
+    assert spans["child"]["parent_id"] == spans["root"]["span_id"]
+    assert spans["child"]["bytes"] == 42
+    assert spans["root"]["room_size"] == 5
+
+
+@pytest.mark.asyncio
+async def test_vote_is_traced_stage_by_stage(exported):
+    game = Game.create("room1")
+    for i in range(3):
+        game.add_player(f"p{i}", f"Player {i}")
+        game.players[f"p{i}"].role = RoleType.WEREWOLF if i == 0 else RoleType.VILLAGER
+    game.phase = GamePhase.DAY
+
+    with patch("app.core.redis.RedisClient.get_client") as get_client:
+        redis = AsyncMock()
+        redis.lock = MagicMock(return_value=AsyncMock())
+        redis.get.return_value = game.to_json()
+        redis.evalsha.return_value = 1
+        get_client.return_value = redis
+
+        with patch.object(settings, "TRACE_SLOW_MS", 0.0), span("http.request"):
+            await asyncio.gather(
+                GameService().submit_vote("room1", "p1", "p0"),
+                GameService().submit_vote("room1", "p2", "p0"),
+            )
+
+    spans = _spans(exported)
+    for name in ("room.commit", "room.lock", "room.load", "room.save", "process_action"):
+        assert name in spans
+    assert spans["room.commit"]["batch_size"] == 2
+    assert spans["mutation.submit_vote"]["phase"] == "DAY"
+    assert spans["room.save"]["bytes"] > 0
+    # The trace id rides along on the ROOM_CHANGED event for the broadcast on every node.
+    assert redis.evalsha.await_args.args[-1] == exported.call_args.kwargs["trace_id"]
@@ -1,6 +1,12 @@
 import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query';
 import { API_BASE_URL } from '../config';
-import type { GameState, GameSettings } from '../types';
+import type {
+  GameState,
+  GameSettings,
+  LobbyPage,
+  LobbySort,
+  MatchmakingTicket,
+} from '../types';
 import { getGameStateQueryKey } from '../utils/queryKeys';
 
 // ============================================================================
@@ -50,6 +56,12 @@ export const api = {
         body: JSON.stringify({ nickname, player_id: playerId }),
       }),
 
+    addBots: (roomId: string, playerId: string, count: number) =>
+      fetchApi<GameState>(`/rooms/${roomId}/bots`, {
+        method: 'POST',
+        body: JSON.stringify({ player_id: playerId, count }),
+      }),
+
     updateSettings: (roomId: string, playerId: string, settings: GameSettings) =>
       fetchApi<GameState>(`/rooms/${roomId}/settings?player_id=${encodeURIComponent(playerId)}`, {
         method: 'POST',
@@ -104,6 +116,27 @@ export const api = {
 
     getRoles: () => fetchApi<{ type: string; description: string }[]>('/roles'),
   },
+  lobby: {
+    list: (sort: LobbySort, offset: number, limit: number) =>
+      fetchApi<LobbyPage>(`/lobby?sort=${sort}&offset=${offset}&limit=${limit}`),
+  },
+  matchmaking: {
+    join: (nickname: string, playerId: string) =>
+      fetchApi<MatchmakingTicket>('/matchmaking', {
+        method: 'POST',
+        body: JSON.stringify({ nickname, player_id: playerId }),
+      }),
+
+    leave: (playerId: string) =>
+      fetchApi<{ status: string }>(`/matchmaking/${playerId}`, { method: 'DELETE' }),
+  },
+  balance: {
+    predict: (roleDistribution: Record<string, number>) =>
+      fetchApi<{ players: number; villager_win: number; source: 'table' | 'model' }>(
+        '/balance/predict',
+        { method: 'POST', body: JSON.stringify({ role_distribution: roleDistribution }) },
+      ),
+  },
   getVersion: () => fetchApi<{ version: string; commit_sha: string }>('/version'),
 };
 
@@ -111,6 +144,15 @@ export const api = {
 // React Query Hooks
 // ============================================================================
 
+export function useLobby(sort: LobbySort, page: number, pageSize: number) {
+  return useQuery({
+    queryKey: ['lobby', sort, page, pageSize],
+    queryFn: () => api.lobby.list(sort, (page - 1) * pageSize, pageSize),
+    refetchInterval: 5000,
+    placeholderData: (previous) => previous,
+  });
+}
+
 export function useCreateRoom() {
   const queryClient = useQueryClient();
 
@@ -149,6 +191,18 @@ export function useUpdateSettings(roomId: string) {
   });
 }
 
+export function useAddBots(roomId: string) {
+  const queryClient = useQueryClient();
+
+  return useMutation({
+    mutationFn: ({ playerId, count }: { playerId: string; count: number }) =>
+      api.rooms.addBots(roomId, playerId, count),
+    onSuccess: (data, variables) => {
+      queryClient.setQueryData(getGameStateQueryKey(roomId, variables.playerId), data);
+    },
+  });
+}
+
 export function useStartGame(roomId: string) {
   const queryClient = useQueryClient();
 
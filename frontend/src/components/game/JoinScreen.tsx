@@ -7,10 +7,11 @@ const { useToken } = theme;
 interface JoinScreenProps {
   roomId: string;
   onJoin: (nickname: string) => Promise<boolean>;
+  onWatch: () => void;
   isSpectator?: boolean;
 }
 
-export function JoinScreen({ roomId, onJoin, isSpectator }: JoinScreenProps) {
+export function JoinScreen({ roomId, onJoin, onWatch, isSpectator }: JoinScreenProps) {
   const { token } = useToken();
   const [nickname, setNickname] = useState('');
   const [loading, setLoading] = useState(false);
@@ -36,35 +37,51 @@ export function JoinScreen({ roomId, onJoin, isSpectator }: JoinScreenProps) {
         title={isSpectator ? `Spectate Room: ${roomId}` : `Join Room: ${roomId}`}
         style={{ width: '100%', maxWidth: 400, textAlign: 'center' }}
       >
-        {isSpectator && (
-          <Alert
-            message="Game in progress"
-            description="You'll join as a spectator."
-            type="info"
-            style={{ marginBottom: 16 }}
-          />
+        {isSpectator ? (
+          <>
+            <Alert
+              message="Game in progress"
+              description="You can watch now and join when the next round starts."
+              type="info"
+              style={{ marginBottom: 16 }}
+            />
+            <Button
+              type="primary"
+              block
+              size="large"
+              onClick={onWatch}
+              style={{ height: 56, fontSize: 20 }}
+            >
+              Spectate
+            </Button>
+          </>
+        ) : (
+          <>
+            <Text style={{ display: 'block', marginBottom: 16 }}>
+              Enter your nickname to join.
+            </Text>
+            <Input
+              placeholder="Nickname"
+              aria-label="Nickname"
+              value={nickname}
+              onChange={(e) => setNickname(e.target.value)}
+              size="large"
+              style={{ marginBottom: 16, height: 56, fontSize: 18 }}
+              onPressEnter={handleSubmit}
+              disabled={loading}
+            />
+            <Button
+              type="primary"
+              block
+              size="large"
+              onClick={handleSubmit}
+              loading={loading}
+              style={{ height: 56, fontSize: 20 }}
+            >
+              Join Game
+            </Button>
+          </>
         )}
-        <Text style={{ display: 'block', marginBottom: 16 }}>Enter your nickname to join.</Text>
-        <Input
-          placeholder="Nickname"
-          aria-label="Nickname"
-          value={nickname}
-          onChange={(e) => setNickname(e.target.value)}
-          size="large"
-          style={{ marginBottom: 16, height: 56, fontSize: 18 }}
-          onPressEnter={handleSubmit}
-          disabled={loading}
-        />
-        <Button
-          type="primary"
-          block
-          size="large"
-          onClick={handleSubmit}
-          loading={loading}
-          style={{ height: 56, fontSize: 20 }}
-        >
-          {isSpectator ? 'Spectate' : 'Join Game'}
-        </Button>
       </Card>
     </div>
   );
@@ -0,0 +1,76 @@
+import { useState } from 'react';
+import { Button, Empty, Flex, Pagination, Segmented, Typography, theme } from 'antd';
+import { useLobby } from '../../api/client';
+import type { LobbySort } from '../../types';
+
+const PAGE_SIZE = 5;
+
+interface LobbyBrowserProps {
+  onJoin: (roomId: string) => void;
+}
+
+export default function LobbyBrowser({ onJoin }: LobbyBrowserProps) {
+  const { token } = theme.useToken();
+  const [sort, setSort] = useState<LobbySort>('players');
+  const [page, setPage] = useState(1);
+  const { data, isLoading } = useLobby(sort, page, PAGE_SIZE);
+
+  return (
+    <div>
+      <Flex justify="space-between" align="center" style={{ marginBottom: 12 }}>
+        <Typography.Text type="secondary">Open rooms</Typography.Text>
+        <Segmented<LobbySort>
+          size="small"
+          value={sort}
+          onChange={(value) => {
+            setSort(value);
+            setPage(1);
+          }}
+          options={[
+            { label: 'Most players', value: 'players' },
+            { label: 'Newest', value: 'recent' },
+          ]}
+        />
+      </Flex>
+
+      {!isLoading && !data?.rooms.length ? (
+        <Empty image={Empty.PRESENTED_IMAGE_SIMPLE} description="No open rooms" />
+      ) : (
+        <Flex vertical gap={8}>
+          {data?.rooms.map((room) => (
+            <Flex
+              key={room.room_id}
+              justify="space-between"
+              align="center"
+              style={{
+                padding: `${token.paddingXS}px ${token.paddingSM}px`,
+                border: `1px solid ${token.colorBorder}`,
+                borderRadius: token.borderRadius,
+              }}
+            >
+              <Typography.Text>
+                {room.host ? `${room.host}'s room` : room.room_id}
+                <Typography.Text type="secondary"> · {room.player_count} players</Typography.Text>
+              </Typography.Text>
+              <Button size="small" onClick={() => onJoin(room.room_id)}>
+                Join
+              </Button>
+            </Flex>
+          ))}
+        </Flex>
+      )}
+
+      {(data?.total ?? 0) > PAGE_SIZE && (
+        <Pagination
+          size="small"
+          align="center"
+          style={{ marginTop: 12 }}
+          current={page}
+          pageSize={PAGE_SIZE}
+          total={data?.total}
+          onChange={setPage}
+        />
+      )}
+    </div>
+  );
+}
@@ -3,7 +3,7 @@ import { getRoleNameWithEmoji } from '../../utils/roleUtils';
 import { PlusOutlined, MinusOutlined } from '@ant-design/icons';
 import { Card, Button, Spin, Typography, message, theme, Switch, Tooltip } from 'antd';
 import { useCurrentSession } from '../../store/gameStore';
-import { useUpdateSettings, api } from '../../api/client';
+import { useAddBots, useUpdateSettings, api } from '../../api/client';
 import { useQuery } from '@tanstack/react-query';
 import { RoleType } from '../../types';
 import type { GameSettings } from '../../types';
@@ -42,6 +42,7 @@ export function LobbyPanel({ isAdmin, playerCount, onStartGame, serverSettings }
   const [session] = useCurrentSession();
   const roomId = window.location.pathname.split('/').pop() || '';
   const { mutate: updateSettings } = useUpdateSettings(roomId);
+  const addBots = useAddBots(roomId);
 
   const { data: rolesData } = useQuery({
     queryKey: ['roles'],
@@ -72,6 +73,14 @@ export function LobbyPanel({ isAdmin, playerCount, onStartGame, serverSettings }
   const totalRoles = Object.values(settings.role_distribution).reduce((a, b) => a + b, 0);
   const isValid = totalRoles === playerCount;
 
+  const { data: prediction } = useQuery({
+    queryKey: ['balance', settings.role_distribution],
+    queryFn: () => api.balance.predict(settings.role_distribution),
+    enabled: isValid,
+    staleTime: Infinity,
+    retry: false,
+  });
+
   const handleStart = async () => {
     if (!isValid) {
       message.warning(`Role count (${totalRoles}) must equal player count (${playerCount})`);
@@ -310,6 +319,32 @@ export function LobbyPanel({ isAdmin, playerCount, onStartGame, serverSettings }
           >
             Total: {totalRoles} / {playerCount} players
           </Text>
+          {isValid && prediction && (
+            <Tooltip
+              title={
+                prediction.source === 'table'
+                  ? 'Simulated balance for this player count'
+                  : 'Estimated from simulated games'
+              }
+            >
+              <Text type="secondary">
+                Village wins ~{Math.round(prediction.villager_win * 100)}% of simulated games
+              </Text>
+            </Tooltip>
+          )}
+          {isAdmin && (
+            <div style={{ marginTop: 8 }}>
+              <Button
+                icon={<PlusOutlined />}
+                loading={addBots.isPending}
+                onClick={() =>
+                  session?.playerId && addBots.mutate({ playerId: session.playerId, count: 1 })
+                }
+              >
+                Add bot
+              </Button>
+            </div>
+          )}
         </div>
       </Card>
 
@@ -126,6 +126,11 @@ function PlayerCard({ player, isMe, canKick, onKick }: PlayerCardProps) {
             ADMIN
           </Tag>
         )}
+        {player.is_bot && (
+          <Tag color="blue" style={{ padding: '4px 8px', fontSize: 13 }}>
+            BOT
+          </Tag>
+        )}
       </div>
     </div>
   );
@@ -0,0 +1,85 @@
+import { useEffect, useRef, useState } from 'react';
+import { ReadyState } from './useWebSocket';
+
+interface UseEventSourceOptions {
+  onMessage?: (event: MessageEvent) => void;
+  /** Query parameters added to the URL when (re)opened by `reconnect`, read at that time. */
+  getUrlParams?: () => Record<string, string> | undefined;
+}
+
+interface UseEventSourceReturn {
+  readyState: ReadyState;
+  /** Close the stream after `delayMs` and open a new one straight away. */
+  reconnect: (delayMs: number) => void;
+}
+
+/**
+ * Server-Sent Events counterpart of `useWebSocket`, for networks that block WebSockets.
+ *
+ * The browser reconnects a dropped stream by itself and sends the last event id it saw, so
+ * the server can resume from there. A stream the server refuses (e.g. the room is gone) is
+ * left closed.
+ */
+export function useEventSource(
+  url: string | null,
+  options: UseEventSourceOptions,
+): UseEventSourceReturn {
+  const [connectionState, setConnectionState] = useState<ReadyState>(ReadyState.CONNECTING);
+  const reconnectRef = useRef<(delayMs: number) => void>(() => {});
+  const optionsRef = useRef(options);
+  // eslint-disable-next-line react-hooks/refs
+  optionsRef.current = options;
+
+  useEffect(() => {
+    if (!url) return;
+
+    let cancelled = false;
+    let source: EventSource | null = null;
+    let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+
+    const open = (params?: Record<string, string>) => {
+      if (cancelled) return;
+      setConnectionState(ReadyState.CONNECTING);
+      const separator = url.includes('?') ? '&' : '?';
+      source = new EventSource(params ? `${url}${separator}${new URLSearchParams(params)}` : url);
+
+      source.onopen = () => {
+        if (!cancelled) setConnectionState(ReadyState.OPEN);
+      };
+
+      source.onmessage = (event) => {
+        if (!cancelled) optionsRef.current.onMessage?.(event);
+      };
+
+      source.onerror = () => {
+        if (cancelled || !source) return;
+        // CONNECTING: the browser is already retrying. CLOSED: it gave up.
+        setConnectionState(
+          source.readyState === EventSource.CLOSED ? ReadyState.CLOSED : ReadyState.CONNECTING,
+        );
+      };
+    };
+
+    reconnectRef.current = (delayMs: number) => {
+      if (reconnectTimer) clearTimeout(reconnectTimer);
+      reconnectTimer = setTimeout(() => {
+        source?.close();
+        open(optionsRef.current.getUrlParams?.());
+      }, delayMs);
+    };
+
+    open();
+
+    return () => {
+      cancelled = true;
+      reconnectRef.current = () => {};
+      if (reconnectTimer) clearTimeout(reconnectTimer);
+      source?.close();
+    };
+  }, [url]);
+
+  const readyState: ReadyState = url ? connectionState : ReadyState.CLOSED;
+  const reconnect = (delayMs: number) => reconnectRef.current(delayMs);
+
+  return { readyState, reconnect };
+}
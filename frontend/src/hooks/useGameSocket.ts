@@ -1,4 +1,4 @@
-import { useEffect } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { useQueryClient } from '@tanstack/react-query';
 import { message } from 'antd';
 import { WSMessageType } from '../types';
@@ -6,13 +6,24 @@ import type { SocketMessage, GameState } from '../types';
 import { useCurrentSessionValue } from '../store/gameStore';
 import { useGameState } from './useGameState';
 import { useWebSocket, ReadyState } from './useWebSocket';
+import { useEventSource } from './useEventSource';
 import { getGameStateQueryKey } from '../utils/queryKeys';
-import { WS_BASE_URL } from '../config';
+import { API_BASE_URL, WS_BASE_URL } from '../config';
 
-export function useGameSocket(roomId: string) {
+// Sockets that fail to open this many times in a row are taken to be blocked (corporate
+// proxies, some embedded webviews); the player's updates then come as Server-Sent Events.
+const SOCKET_FAILURES_BEFORE_SSE = 2;
+
+interface UseGameSocketOptions {
+  /** Without a seat in the room, follow its shared spectator stream instead. */
+  spectate?: boolean;
+}
+
+export function useGameSocket(roomId: string, { spectate = false }: UseGameSocketOptions = {}) {
   const session = useCurrentSessionValue();
   const playerId = session?.playerId;
   const queryClient = useQueryClient();
+  const spectating = spectate && !playerId;
 
   const {
     data: gameState,
@@ -20,55 +31,117 @@ export function useGameSocket(roomId: string) {
     isLoading,
   } = useGameState(roomId, playerId, {
     enabled: !!roomId,
-    refetchOnWindowFocus: true,
+    // The spectator stream may run behind on purpose; a refetch would jump ahead of it.
+    refetchOnWindowFocus: !spectating,
   });
 
-  const wsUrl = playerId ? `${WS_BASE_URL}/ws/${roomId}/${playerId}` : null;
+  const [socketBlocked, setSocketBlocked] = useState(false);
+  const wsUrl =
+    playerId && !socketBlocked
+      ? `${WS_BASE_URL}/ws/${roomId}/${playerId}`
+      : spectating
+        ? `${WS_BASE_URL}/ws/spectate/${roomId}`
+        : null;
+  const sseUrl =
+    playerId && socketBlocked
+      ? `${API_BASE_URL}/rooms/${roomId}/events?player_id=${encodeURIComponent(playerId)}`
+      : null;
+  const streamUrl = wsUrl ?? sseUrl;
+  // Last event seq and state version seen on this URL. A reconnect sends them so the server
+  // can replay only what was missed instead of the whole state.
+  const resumeRef = useRef<{ url: string | null; seq?: number; version?: number }>({ url: null });
 
-  const { sendJsonMessage, readyState } = useWebSocket(wsUrl, {
-    shouldReconnect: () => true,
-    reconnectAttempts: 10,
-    reconnectInterval: 3000,
-    onMessage: (event) => {
-      let msg: SocketMessage;
-      try {
-        msg = JSON.parse(event.data);
-      } catch (e) {
-        console.error('WS message parse error:', e);
-        return;
+  const getUrlParams = () => {
+    const { url, seq, version } = resumeRef.current;
+    if (url !== streamUrl || seq === undefined || version === undefined) return undefined;
+    return { seq: String(seq), version: String(version) };
+  };
+
+  const handleMessage = (event: MessageEvent) => {
+    let msg: SocketMessage;
+    try {
+      msg = JSON.parse(event.data);
+    } catch (e) {
+      console.error('WS message parse error:', e);
+      return;
+    }
+
+    if (resumeRef.current.url !== streamUrl) resumeRef.current = { url: streamUrl };
+    const resume = resumeRef.current;
+    if (msg.type === WSMessageType.STATE_UPDATE) {
+      if (msg.version != null) {
+        if (resume.version !== undefined && msg.version < resume.version) return; // Stale
+        resume.version = msg.version;
       }
+      if (msg.seq != null) resume.seq = Math.max(resume.seq ?? 0, msg.seq);
+    } else if (msg.seq != null) {
+      if (resume.seq !== undefined && msg.seq <= resume.seq) return; // Already seen
+      resume.seq = msg.seq;
+    }
+
+    const queryKey = getGameStateQueryKey(roomId, playerId);
+
+    switch (msg.type) {
+      case WSMessageType.STATE_UPDATE:
+        queryClient.setQueryData(queryKey, msg.payload);
+        break;
 
-      const queryKey = getGameStateQueryKey(roomId, playerId);
-
-      switch (msg.type) {
-        case WSMessageType.STATE_UPDATE:
-          queryClient.setQueryData(queryKey, msg.payload);
-          break;
-
-        case WSMessageType.PLAYER_DISCONNECTED:
-          queryClient.setQueryData(queryKey, (old: GameState | undefined) =>
-            patchPlayerOnline(old, msg.payload.player_id, false),
-          );
-          message.warning(`${msg.payload.nickname} disconnected`);
-          break;
-
-        case WSMessageType.PLAYER_RECONNECTED:
-          queryClient.setQueryData(queryKey, (old: GameState | undefined) =>
-            patchPlayerOnline(old, msg.payload.player_id, true),
-          );
-          message.info(`${msg.payload.nickname} reconnected`);
-          break;
-
-        case WSMessageType.PING:
-          sendJsonMessage({ type: 'PONG' });
-          break;
-
-        case WSMessageType.ERROR:
-          message.error(msg.payload.message);
-          break;
+      case WSMessageType.PLAYER_DISCONNECTED:
+        queryClient.setQueryData(queryKey, (old: GameState | undefined) =>
+          patchPlayerOnline(old, msg.payload.player_id, false),
+        );
+        message.warning(`${msg.payload.nickname} disconnected`);
+        break;
+
+      case WSMessageType.PLAYER_RECONNECTED:
+        queryClient.setQueryData(queryKey, (old: GameState | undefined) =>
+          patchPlayerOnline(old, msg.payload.player_id, true),
+        );
+        message.info(`${msg.payload.nickname} reconnected`);
+        break;
+
+      case WSMessageType.PRESENCE_DIGEST: {
+        const { reconnected } = msg.payload;
+        queryClient.setQueryData(queryKey, (old: GameState | undefined) =>
+          reconnected.reduce((state, p) => patchPlayerOnline(state, p.player_id, true), old),
+        );
+        if (reconnected.length === 1) {
+          message.info(`${reconnected[0].nickname} reconnected`);
+        } else if (reconnected.length > 1) {
+          message.info(`${reconnected.length} players reconnected`);
+        }
+        break;
       }
+
+      case WSMessageType.RECONNECT:
+        // The server is draining; the delay spreads its clients over the other instances.
+        (sseUrl ? events : socket).reconnect(msg.payload.delay_ms);
+        break;
+
+      case WSMessageType.PING:
+        // Only sockets answer; an open event stream keeps the player online by itself.
+        socket.sendJsonMessage({ type: 'PONG' });
+        break;
+
+      case WSMessageType.ERROR:
+        message.error(msg.payload.message);
+        break;
+    }
+  };
+
+  const socket = useWebSocket(wsUrl, {
+    shouldReconnect: () => true,
+    reconnectAttempts: 10,
+    reconnectInterval: 3000,
+    getUrlParams,
+    onMessage: handleMessage,
+    onOpenFailed: (failures) => {
+      if (playerId && failures >= SOCKET_FAILURES_BEFORE_SSE) setSocketBlocked(true);
     },
   });
+  const events = useEventSource(sseUrl, { getUrlParams, onMessage: handleMessage });
+  const { sendJsonMessage } = socket;
+  const readyState = sseUrl ? events.readyState : socket.readyState;
 
   // Client-side proactive keepalive
   useEffect(() => {
@@ -0,0 +1,100 @@
+import { useState } from 'react';
+import { useNavigate } from '@tanstack/react-router';
+import { message } from 'antd';
+import { v4 as uuidv4 } from 'uuid';
+import { api } from '../api/client';
+import { WS_BASE_URL } from '../config';
+import { useSetRoomSession } from '../store/gameStore';
+import { WSMessageType } from '../types';
+import type { SocketMessage } from '../types';
+import { useWebSocket } from './useWebSocket';
+
+interface QueueStatus {
+  position: number;
+  queued: number;
+  etaSeconds: number | null;
+}
+
+/**
+ * Quick play: queue for matchmaking and wait on a socket until the server places the player
+ * in a room, then open it.
+ */
+export function useQuickPlay() {
+  const navigate = useNavigate();
+  const setRoomSession = useSetRoomSession();
+  const [ticket, setTicket] = useState<{ playerId: string; nickname: string } | null>(null);
+  const [status, setStatus] = useState<QueueStatus | null>(null);
+  const [isJoining, setIsJoining] = useState(false);
+
+  const stop = () => {
+    setTicket(null);
+    setStatus(null);
+  };
+
+  const wsUrl = ticket ? `${WS_BASE_URL}/ws/matchmaking/${ticket.playerId}` : null;
+
+  const { sendJsonMessage } = useWebSocket(wsUrl, {
+    // The queue lives on the server, so a dropped socket just reconnects to the same place.
+    shouldReconnect: () => true,
+    reconnectAttempts: 10,
+    reconnectInterval: 3000,
+    onMessage: (event) => {
+      let msg: SocketMessage;
+      try {
+        msg = JSON.parse(event.data);
+      } catch (e) {
+        console.error('WS message parse error:', e);
+        return;
+      }
+
+      switch (msg.type) {
+        case WSMessageType.QUEUE_STATUS:
+          setStatus({
+            position: msg.payload.position,
+            queued: msg.payload.queued,
+            etaSeconds: msg.payload.eta_seconds,
+          });
+          break;
+
+        case WSMessageType.MATCH_FOUND:
+          if (ticket) setRoomSession(msg.payload.room_id, ticket);
+          stop();
+          navigate({ to: `/room/${msg.payload.room_id}` });
+          break;
+
+        case WSMessageType.PING:
+          sendJsonMessage({ type: 'PONG' });
+          break;
+
+        case WSMessageType.ERROR:
+          message.error(msg.payload.message);
+          stop();
+          break;
+      }
+    },
+  });
+
+  const join = async (nickname: string) => {
+    const playerId = uuidv4();
+    setIsJoining(true);
+    try {
+      const queued = await api.matchmaking.join(nickname, playerId);
+      setStatus({ position: queued.position, queued: queued.queued, etaSeconds: null });
+      setTicket({ playerId, nickname });
+    } catch (e) {
+      console.error(e);
+      message.error('Failed to join quick play');
+    } finally {
+      setIsJoining(false);
+    }
+  };
+
+  const leave = async () => {
+    if (!ticket) return;
+    stop();
+    // Already placed or gone: nothing to undo.
+    await api.matchmaking.leave(ticket.playerId).catch(() => undefined);
+  };
+
+  return { join, leave, status, isQueued: !!ticket, isJoining };
+}
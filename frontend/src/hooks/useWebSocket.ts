@@ -9,16 +9,26 @@ export const ReadyState = {
 
 export type ReadyState = (typeof ReadyState)[keyof typeof ReadyState];
 
+// Close code the server uses when it is too busy to load the room; the reason is the delay in
+// milliseconds (already jittered) to wait before reconnecting.
+const TRY_AGAIN_LATER = 1013;
+
 interface UseWebSocketOptions {
   onMessage?: (event: MessageEvent) => void;
+  /** Query parameters added to the URL on every (re)connect, read at connect time. */
+  getUrlParams?: () => Record<string, string> | undefined;
   reconnectInterval?: number;
   reconnectAttempts?: number;
   shouldReconnect?: () => boolean;
+  /** Called each time a socket closes without having opened, with how many did in a row. */
+  onOpenFailed?: (failures: number) => void;
 }
 
 interface UseWebSocketReturn {
   readyState: ReadyState;
   sendJsonMessage: (data: unknown) => void;
+  /** Close the socket after `delayMs` and open a new one straight away. */
+  reconnect: (delayMs: number) => void;
 }
 
 /**
@@ -32,6 +42,7 @@ interface UseWebSocketReturn {
 export function useWebSocket(url: string | null, options: UseWebSocketOptions): UseWebSocketReturn {
   const [connectionState, setConnectionState] = useState<ReadyState>(ReadyState.CONNECTING);
   const socketRef = useRef<WebSocket | null>(null);
+  const reconnectRef = useRef<(delayMs: number) => void>(() => {});
   const optionsRef = useRef(options);
   // Keep latest callbacks on a ref so the WebSocket lifecycle effect can call them
   // without depending on options identity (which would tear down the socket each render).
@@ -43,18 +54,25 @@ export function useWebSocket(url: string | null, options: UseWebSocketOptions):
 
     let cancelled = false;
     let attempts = 0;
+    let failedOpens = 0;
     let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+    // Set by a requested reconnect so the close it causes reopens without waiting.
+    let reconnectNow = false;
 
     const connect = () => {
       if (cancelled) return;
 
       setConnectionState(ReadyState.CONNECTING);
-      const ws = new WebSocket(url);
+      const params = optionsRef.current.getUrlParams?.();
+      const ws = new WebSocket(params ? `${url}?${new URLSearchParams(params)}` : url);
       socketRef.current = ws;
+      let opened = false;
 
       ws.onopen = () => {
         if (cancelled) return;
+        opened = true;
         attempts = 0;
+        failedOpens = 0;
         setConnectionState(ReadyState.OPEN);
       };
 
@@ -63,10 +81,14 @@ export function useWebSocket(url: string | null, options: UseWebSocketOptions):
         optionsRef.current.onMessage?.(event);
       };
 
-      ws.onclose = () => {
+      ws.onclose = (event) => {
         if (cancelled) return;
         setConnectionState(ReadyState.CLOSED);
         socketRef.current = null;
+        if (!opened) {
+          failedOpens += 1;
+          optionsRef.current.onOpenFailed?.(failedOpens);
+        }
 
         const {
           shouldReconnect = () => false,
@@ -76,15 +98,27 @@ export function useWebSocket(url: string | null, options: UseWebSocketOptions):
 
         if (shouldReconnect() && attempts < reconnectAttempts) {
           attempts += 1;
-          reconnectTimer = setTimeout(connect, reconnectInterval);
+          const retryAfter = event.code === TRY_AGAIN_LATER ? Number(event.reason) : NaN;
+          const delay = reconnectNow ? 0 : retryAfter > 0 ? retryAfter : reconnectInterval;
+          reconnectNow = false;
+          reconnectTimer = setTimeout(connect, delay);
         }
       };
     };
 
+    reconnectRef.current = (delayMs: number) => {
+      if (reconnectTimer) clearTimeout(reconnectTimer);
+      reconnectTimer = setTimeout(() => {
+        reconnectNow = true;
+        socketRef.current?.close();
+      }, delayMs);
+    };
+
     connect();
 
     return () => {
       cancelled = true;
+      reconnectRef.current = () => {};
       if (reconnectTimer) clearTimeout(reconnectTimer);
       const ws = socketRef.current;
       socketRef.current = null;
@@ -103,5 +137,7 @@ export function useWebSocket(url: string | null, options: UseWebSocketOptions):
     }
   };
 
-  return { readyState, sendJsonMessage };
+  const reconnect = (delayMs: number) => reconnectRef.current(delayMs);
+
+  return { readyState, sendJsonMessage, reconnect };
 }
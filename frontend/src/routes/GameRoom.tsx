@@ -48,7 +48,9 @@ export default function GameRoom() {
     setCurrentRoomId(roomId);
   }, [roomId, setCurrentRoomId]);
 
-  const { gameState, error, isLoading } = useGameSocket(roomId);
+  // Watching a game in progress from outside it, on the room's spectator stream.
+  const [watching, setWatching] = useState(false);
+  const { gameState, error, isLoading } = useGameSocket(roomId, { spectate: watching });
   const [session, setSession] = useCurrentSession();
   const playerId = session?.playerId;
 
@@ -111,6 +113,7 @@ export default function GameRoom() {
   const isDay = activeState?.phase === GamePhase.DAY;
   const isGameOver = activeState?.phase === GamePhase.GAME_OVER;
   const isGameInProgress = !!activeState && activeState.phase !== GamePhase.WAITING;
+  const isSpectating = !isJoined && watching && isGameInProgress;
 
   const handleJoin = async (nickname: string): Promise<boolean> => {
     const newPlayerId = uuidv4();
@@ -179,8 +182,15 @@ export default function GameRoom() {
     );
   }
 
-  if (!isJoined) {
-    return <JoinScreen roomId={roomId} onJoin={handleJoin} isSpectator={isGameInProgress} />;
+  if (!isJoined && !isSpectating) {
+    return (
+      <JoinScreen
+        roomId={roomId}
+        onJoin={handleJoin}
+        onWatch={() => setWatching(true)}
+        isSpectator={isGameInProgress}
+      />
+    );
   }
 
   const players = activeState ? Object.values(activeState.players) : [];
@@ -233,7 +243,7 @@ export default function GameRoom() {
         )}
 
         {/* Spectator Banner */}
-        {isGameInProgress && me && (!me.is_alive || me.is_spectator) && (
+        {(isSpectating || (isGameInProgress && me && (!me.is_alive || me.is_spectator))) && (
           <Card
             style={{
               background: 'rgba(0, 0, 0, 0.4)',
@@ -242,7 +252,7 @@ export default function GameRoom() {
           >
             <div style={{ fontSize: 24, marginBottom: 8 }}>👁️</div>
             <div style={{ color: token.colorTextSecondary, fontSize: 16 }}>
-              You are {me.is_spectator ? 'spectating' : 'dead'}. Watch the game unfold...
+              You are {!me || me.is_spectator ? 'spectating' : 'dead'}. Watch the game unfold...
             </div>
           </Card>
         )}
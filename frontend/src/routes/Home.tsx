@@ -3,6 +3,8 @@ import { useDefaultNickname } from '../store/gameStore';
 import { useState } from 'react';
 import { Button, Input, Card, Typography, Space, message, theme } from 'antd';
 import { useCreateRoom } from '../api/client';
+import LobbyBrowser from '../components/game/LobbyBrowser';
+import { useQuickPlay } from '../hooks/useQuickPlay';
 
 const { Title } = Typography;
 const { useToken } = theme;
@@ -13,6 +15,7 @@ export default function Home() {
   const [nickname, setNickname] = useDefaultNickname();
   const [roomIdInput, setRoomIdInput] = useState('');
   const createRoom = useCreateRoom();
+  const quickPlay = useQuickPlay();
 
   const handleCreateRoom = async () => {
     try {
@@ -28,12 +31,20 @@ export default function Home() {
     }
   };
 
-  const handleJoinRoom = () => {
-    if (!nickname || !roomIdInput) {
+  const handleQuickPlay = () => {
+    if (!nickname) {
+      message.warning('Enter a nickname first');
+      return;
+    }
+    quickPlay.join(nickname);
+  };
+
+  const handleJoinRoom = (roomId: string = roomIdInput) => {
+    if (!nickname || !roomId) {
       message.warning('Enter nickname and room ID');
       return;
     }
-    navigate({ to: `/room/${roomIdInput}` });
+    navigate({ to: `/room/${roomId}` });
   };
 
   return (
@@ -67,6 +78,31 @@ export default function Home() {
             >
               Create New Room
             </Button>
+            {quickPlay.isQueued ? (
+              <Space orientation="vertical" style={{ width: '100%', marginTop: 12 }}>
+                <Typography.Text type="secondary">
+                  {quickPlay.status
+                    ? `Position ${quickPlay.status.position + 1} of ${quickPlay.status.queued}` +
+                      (quickPlay.status.etaSeconds != null
+                        ? ` · about ${Math.ceil(quickPlay.status.etaSeconds)}s`
+                        : '')
+                    : 'Finding a game…'}
+                </Typography.Text>
+                <Button block onClick={quickPlay.leave}>
+                  Cancel Quick Play
+                </Button>
+              </Space>
+            ) : (
+              <Button
+                block
+                size="large"
+                style={{ marginTop: 12 }}
+                onClick={handleQuickPlay}
+                loading={quickPlay.isJoining}
+              >
+                Quick Play
+              </Button>
+            )}
           </div>
 
           <div>
@@ -79,18 +115,20 @@ export default function Home() {
               onChange={(e) => setNickname(e.target.value)}
               size="large"
               style={{ marginBottom: 12 }}
-              onPressEnter={handleJoinRoom}
+              onPressEnter={() => handleJoinRoom()}
             />
             <div style={{ display: 'flex', gap: 8 }}>
               <Input
                 placeholder="Room ID"
                 value={roomIdInput}
                 onChange={(e) => setRoomIdInput(e.target.value)}
-                onPressEnter={handleJoinRoom}
+                onPressEnter={() => handleJoinRoom()}
               />
-              <Button onClick={handleJoinRoom}>Join</Button>
+              <Button onClick={() => handleJoinRoom()}>Join</Button>
             </div>
           </div>
+
+          <LobbyBrowser onJoin={handleJoinRoom} />
         </Space>
       </Card>
     </div>
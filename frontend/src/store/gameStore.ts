@@ -40,6 +40,13 @@ export function useSetCurrentRoomId() {
   return useSetAtom(CURRENT_ROOM_ID_ATOM);
 }
 
+/** Record the session for a room the player was placed in without visiting it first. */
+export function useSetRoomSession() {
+  const setSessions = useSetAtom(ROOM_SESSIONS_ATOM);
+  return (roomId: string, session: RoomSession) =>
+    setSessions((sessions) => ({ ...sessions, [roomId]: session }));
+}
+
 export function useCurrentSession() {
   return useAtom(CURRENT_SESSION_ATOM);
 }
@@ -46,6 +46,7 @@ export interface Player {
   role_description?: string;
   is_alive: boolean;
   is_admin: boolean;
+  is_bot?: boolean;
   is_spectator: boolean;
   is_online: boolean;
   vote_target?: string | null;
@@ -81,14 +82,40 @@ export interface GameState {
   phase_start_time?: number;
 }
 
+export interface LobbyRoom {
+  room_id: string;
+  player_count: number;
+  host: string | null;
+  updated_at: number;
+}
+
+export type LobbySort = 'players' | 'recent';
+
+export interface LobbyPage {
+  rooms: LobbyRoom[];
+  total: number;
+  offset: number;
+  limit: number;
+}
+
+export interface MatchmakingTicket {
+  player_id: string;
+  position: number;
+  queued: number;
+}
+
 export const WSMessageType = {
   STATE_UPDATE: 'STATE_UPDATE',
   ERROR: 'ERROR',
   CHAT: 'CHAT',
   PLAYER_DISCONNECTED: 'PLAYER_DISCONNECTED',
   PLAYER_RECONNECTED: 'PLAYER_RECONNECTED',
+  PRESENCE_DIGEST: 'PRESENCE_DIGEST',
+  RECONNECT: 'RECONNECT',
   PING: 'PING',
   PONG: 'PONG',
+  QUEUE_STATUS: 'QUEUE_STATUS',
+  MATCH_FOUND: 'MATCH_FOUND',
 } as const;
 
 export type WSMessageType = (typeof WSMessageType)[keyof typeof WSMessageType];
@@ -96,11 +123,14 @@ export type WSMessageType = (typeof WSMessageType)[keyof typeof WSMessageType];
 export interface WSBaseMessage {
   type: WSMessageType;
   room_id?: string;
+  /** Position in the room's event stream; sent back as `seq` when resuming. */
+  seq?: number | null;
 }
 
 export interface WSStateUpdateMessage extends WSBaseMessage {
   type: typeof WSMessageType.STATE_UPDATE;
   payload: GameState;
+  version?: number | null;
 }
 
 export interface WSPresenceMessage extends WSBaseMessage {
@@ -111,6 +141,20 @@ export interface WSPresenceMessage extends WSBaseMessage {
   };
 }
 
+export interface WSPresenceDigestMessage extends WSBaseMessage {
+  type: typeof WSMessageType.PRESENCE_DIGEST;
+  payload: {
+    reconnected: { player_id: string; nickname: string }[];
+  };
+}
+
+export interface WSReconnectMessage extends WSBaseMessage {
+  type: typeof WSMessageType.RECONNECT;
+  payload: {
+    delay_ms: number;
+  };
+}
+
 export interface WSPingMessage extends WSBaseMessage {
   type: typeof WSMessageType.PING;
 }
@@ -119,6 +163,24 @@ export interface WSPongMessage extends WSBaseMessage {
   type: typeof WSMessageType.PONG;
 }
 
+export interface WSQueueStatusMessage extends WSBaseMessage {
+  type: typeof WSMessageType.QUEUE_STATUS;
+  payload: {
+    /** Players ahead in the quick-play queue. */
+    position: number;
+    queued: number;
+    /** From the recent matching rate; null until known. */
+    eta_seconds: number | null;
+  };
+}
+
+export interface WSMatchFoundMessage extends WSBaseMessage {
+  type: typeof WSMessageType.MATCH_FOUND;
+  payload: {
+    room_id: string;
+  };
+}
+
 export interface WSErrorMessage extends WSBaseMessage {
   type: typeof WSMessageType.ERROR;
   payload: {
@@ -130,6 +192,10 @@ export interface WSErrorMessage extends WSBaseMessage {
 export type SocketMessage =
   | WSStateUpdateMessage
   | WSPresenceMessage
+  | WSPresenceDigestMessage
+  | WSReconnectMessage
   | WSPingMessage
   | WSPongMessage
+  | WSQueueStatusMessage
+  | WSMatchFoundMessage
   | WSErrorMessage;